@@ -0,0 +1,105 @@
+# jobs/api.py
+"""
+Read-only JSON API: GET /api/jobs/
+
+Query parameters:
+- keyword, location, category: the same filters as the job listings
+- fields: comma-separated subset of API_FIELDS (default: all of them)
+- limit: page size, 1..API_MAX_LIMIT (default API_DEFAULT_LIMIT)
+- after: the `next_cursor` of the previous page
+
+Pages are keyset-paginated newest first (JOB_LIST_ORDERING), so deep pages
+cost the same as the first. Rows come from .values().iterator() and are
+encoded one at a time into a gzip-compressed streaming response; no Job
+instances are built.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from .models import Job
+from .pagination import KeysetPaginator, decode_cursor
+from .search import filter_jobs
+from .searchcache import normalize_params
+
+API_FIELDS = (
+    "id", "title", "company", "location", "category", "source", "url",
+    "date_posted", "is_paid", "snippet", "description",
+)
+ORDERING = ("-date_posted", "-id")
+
+_encoder = DjangoJSONEncoder()
+
+
+def _error(message):
+    return JsonResponse({"error": message}, status=400)
+
+
+def parse_fields(value):
+    """Requested fields in API_FIELDS order, or None if any is unknown."""
+    if not value:
+        return list(API_FIELDS)
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    if requested - set(API_FIELDS):
+        return None
+    return [name for name in API_FIELDS if name in requested]
+
+
+def parse_limit(value):
+    default = getattr(settings, "API_DEFAULT_LIMIT", 20)
+    if not value:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        return None
+    return limit if 1 <= limit <= getattr(settings, "API_MAX_LIMIT", 100) else None
+
+
+def next_url(request, cursor):
+    params = request.GET.copy()
+    params["after"] = cursor
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+
+def stream_page(request, paginator, after, fields):
+    """Yield the JSON document chunk by chunk; the cursor is only known after the last row."""
+    yield '{"results": ['
+    rows = paginator.window(after).iterator(chunk_size=paginator.per_page + 1)
+    last = None
+    for count, row in enumerate(rows):
+        if count == paginator.per_page:
+            # One row past the page: there is a next page, and `last` is its boundary
+            cursor = paginator.cursor_for(last)
+            yield "], " + _encoder.encode({"next_cursor": cursor, "next": next_url(request, cursor)})[1:]
+            return
+        yield ("," if count else "") + _encoder.encode({name: row[name] for name in fields})
+        last = row
+    yield '], "next_cursor": null, "next": null}'
+
+
+@require_GET
+@gzip_page
+def job_api(request):
+    fields = parse_fields(request.GET.get("fields"))
+    if fields is None:
+        return _error(f"fields must be a comma-separated subset of: {', '.join(API_FIELDS)}")
+    limit = parse_limit(request.GET.get("limit"))
+    if limit is None:
+        return _error(f"limit must be an integer between 1 and {getattr(settings, 'API_MAX_LIMIT', 100)}")
+    after = decode_cursor(request.GET.get("after"), len(ORDERING))
+    if request.GET.get("after") and after is None:
+        return _error("after is not a valid cursor")
+
+    # The ordering columns are always selected so the next cursor can be built
+    columns = list(dict.fromkeys(fields + [name.lstrip("-") for name in ORDERING]))
+    queryset = filter_jobs(Job.objects.all(), *normalize_params(request.GET)).values(*columns)
+    paginator = KeysetPaginator(queryset, ORDERING, per_page=limit)
+    return StreamingHttpResponse(
+        stream_page(request, paginator, after, fields),
+        content_type="application/json",
+    )
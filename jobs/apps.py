@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import restore_triggers_after_migrate
+
+        post_migrate.connect(restore_triggers_after_migrate, sender=self)
@@ -0,0 +1,169 @@
+# jobs/autocomplete.py
+"""
+Prefix index behind /autocomplete/ for the keyword, location and category
+search boxes.
+
+Each field has a PrefixIndex built from {key: (display name, frequency)}
+counts ("keyword" covers job titles and companies). Every word start of a
+value is a sorted key, so "dev" finds "Python Developer"; lookups bisect to
+the matching range and take the most frequent values. Prefixes up to
+SHORT_PREFIX characters, whose ranges are the largest, have their answers
+precomputed.
+
+The counts are snapshotted to AUTOCOMPLETE_SNAPSHOT together with the
+highest Job id they include. `update_snapshot()` (run after fetch_jobs)
+adds only newer jobs; web workers load the snapshot instead of scanning
+jobs_job, reload it when the file changes and suggest nothing until the
+first snapshot exists. Deleted jobs are only dropped
+by a full `manage.py rebuild_autocomplete`.
+"""
+import heapq
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Max
+
+from .facets import display_name, facet_key
+from .models import Job
+
+FIELDS = ("keyword", "location", "category")
+# Job column -> the search box it feeds
+COLUMNS = {"title": "keyword", "company": "keyword", "location": "location", "category": "category"}
+SHORT_PREFIX = 3
+SNAPSHOT_VERSION = 1
+
+_state = {"indexes": None, "mtime": None, "checked": 0.0}
+
+
+class PrefixIndex:
+    def __init__(self, counts, limit=None):
+        """`counts` is {key: [display name, frequency]}."""
+        self.limit = limit or getattr(settings, "AUTOCOMPLETE_LIMIT", 8)
+        # Most frequent first; an entry's position is its rank
+        ranked = sorted(counts.values(), key=lambda item: (-item[1], item[0]))
+        self.names = [name for name, _ in ranked]
+        suffixes = []
+        short = defaultdict(list)
+        for rank, name in enumerate(self.names):
+            words = facet_key(name).split(" ")
+            for i in range(len(words)):
+                suffix = " ".join(words[i:])
+                suffixes.append((suffix, rank))
+                for n in range(1, min(SHORT_PREFIX, len(suffix)) + 1):
+                    matches = short[suffix[:n]]
+                    # Ranks arrive in order, so the first `limit` distinct ones are the top
+                    if len(matches) < self.limit and (not matches or matches[-1] != rank):
+                        matches.append(rank)
+        suffixes.sort()
+        self.keys = [key for key, _ in suffixes]
+        self.ranks = [rank for _, rank in suffixes]
+        self.short = dict(short)
+
+    def __len__(self):
+        return len(self.names)
+
+    def complete(self, prefix, limit=None):
+        limit = min(limit or self.limit, self.limit)
+        prefix = facet_key(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX:
+            ranks = self.short.get(prefix, [])
+        else:
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + "\uffff", lo)
+            ranks = heapq.nsmallest(limit, set(self.ranks[lo:hi]))
+        return [self.names[rank] for rank in ranks[:limit]]
+
+
+def add_counts(counts, rows):
+    """Fold (field, value) rows into {field: {key: [display name, frequency]}}."""
+    for field, value in rows:
+        key = facet_key(value)
+        if key:
+            entry = counts[field].setdefault(key, [display_name(value), 0])
+            entry[1] += 1
+
+
+def _job_rows(queryset):
+    for values in queryset.values_list(*COLUMNS).iterator(chunk_size=2000):
+        yield from zip(COLUMNS.values(), values)
+
+
+def snapshot_path():
+    return str(getattr(settings, "AUTOCOMPLETE_SNAPSHOT", settings.BASE_DIR / ".cache" / "autocomplete.json"))
+
+
+def read_snapshot():
+    try:
+        with open(snapshot_path(), encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return data if data.get("version") == SNAPSHOT_VERSION else None
+
+
+def write_snapshot(counts, last_id):
+    path = snapshot_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": SNAPSHOT_VERSION, "last_id": last_id, "counts": counts}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def update_snapshot(full=False):
+    """Add jobs newer than the snapshot (every job if `full`); returns (jobs added, values indexed)."""
+    data = None if full else read_snapshot()
+    counts = {field: {} for field in FIELDS}
+    last_id = 0
+    if data is not None:
+        counts.update(data["counts"])
+        last_id = data["last_id"]
+
+    newest = Job.objects.aggregate(newest=Max("id"))["newest"] or 0
+    added = 0
+    if newest > last_id:
+        # Bounded by `newest`, so jobs inserted meanwhile are picked up next time
+        jobs = Job.objects.filter(id__gt=last_id, id__lte=newest)
+        added = jobs.count()
+        add_counts(counts, _job_rows(jobs))
+    # An unchanged snapshot keeps its mtime, so workers don't reload it
+    if data is None or added:
+        write_snapshot(counts, max(newest, last_id))
+    return added, sum(len(values) for values in counts.values())
+
+
+def _load():
+    # Without a snapshot there are no suggestions until update_snapshot() runs;
+    # building one here would scan jobs_job inside a request, in every worker
+    data = read_snapshot() or {"counts": {}}
+    return {field: PrefixIndex(data["counts"].get(field, {})) for field in FIELDS}
+
+
+def get_indexes():
+    """The per-field indexes, reloaded at most every AUTOCOMPLETE_RELOAD_SECONDS if the snapshot changed."""
+    now = time.monotonic()
+    if _state["indexes"] is not None and now - _state["checked"] < getattr(settings, "AUTOCOMPLETE_RELOAD_SECONDS", 30):
+        return _state["indexes"]
+    _state["checked"] = now
+    try:
+        mtime = os.stat(snapshot_path()).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _state["indexes"] is None or mtime != _state["mtime"]:
+        _state["indexes"] = _load()
+        try:
+            _state["mtime"] = os.stat(snapshot_path()).st_mtime_ns
+        except FileNotFoundError:
+            _state["mtime"] = None
+    return _state["indexes"]
+
+
+def suggest(field, prefix, limit=None):
+    index = get_indexes().get(field)
+    return index.complete(prefix, limit) if index is not None else []
@@ -0,0 +1,12 @@
+# jobs/context_processors.py
+from .pagecache import normalized_query
+
+
+def canonical_url(request):
+    """
+    `canonical_url`: the page's absolute URL with the query normalized the way
+    pagecache keys it, so a cached page names the same URL whichever visitor's
+    link (tracking parameters, parameter order) rendered it.
+    """
+    query = normalized_query(request)
+    return {"canonical_url": request.build_absolute_uri(f"{request.path}?{query}" if query else request.path)}
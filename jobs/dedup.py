@@ -0,0 +1,120 @@
+# jobs/dedup.py
+"""
+Near-duplicate detection for job postings.
+
+Each posting is reduced to a set of shingles (title and company character
+trigrams, location words, and word pairs from the start of the description)
+and a MinHash signature of that set. The signature is cut into LSH bands that
+are stored in JobMinhashBand, so finding candidates is a handful of indexed
+equality lookups rather than a scan of the Job table. Candidates are then
+confirmed on title and company similarity, since two different roles at the
+same company can share most of a description. Postings without a real company
+name (feed defaults such as "Unknown") are never confirmed this way; only an
+exact dedup key or canonical URL match removes them.
+"""
+import hashlib
+import random
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+NUM_BANDS = 10
+ROWS_PER_BAND = 3
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+# Postings sharing a band are confirmed only above these similarities
+TITLE_THRESHOLD = 0.5
+COMPANY_THRESHOLD = 0.5
+DESCRIPTION_WORDS = 30
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)  # fixed seed: signatures must be stable across processes
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Feed defaults and stand-ins that name no employer; two postings "at" one of
+# these are not the same company, however alike their titles
+PLACEHOLDER_COMPANIES = {"", "unknown", "n a", "na", "none", "not specified", "confidential", "anonymous"}
+COMPANY_SUFFIXES = {"ltd", "limited", "plc", "inc", "llc", "co", "company", "nigeria", "ng"}
+TRACKING_PARAMS = {"ref", "source", "src", "fbclid", "gclid", "mc_cid", "mc_eid"}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text):
+    """Lowercase, strip HTML tags and collapse everything but letters/digits."""
+    text = _TAG_RE.sub(" ", text or "").lower()
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def normalize_company(company):
+    return " ".join(w for w in normalize_text(company).split() if w not in COMPANY_SUFFIXES)
+
+
+def canonicalize_url(url):
+    """Drop scheme/www/fragment/tracking params so mirrors of a URL compare equal."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, urlencode(query), ""))[2:][:500]
+
+
+def trigrams(normalized):
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if normalized else set()
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def shingles(title, company=None, location=None, description=None):
+    out = {f"t:{g}" for g in trigrams(normalize_text(title))}
+    out |= {f"c:{g}" for g in trigrams(normalize_company(company))}
+    out |= {f"l:{w}" for w in normalize_text(location).split()}
+    words = normalize_text(description).split()[:DESCRIPTION_WORDS]
+    out |= {f"d:{a} {b}" for a, b in zip(words, words[1:])}
+    return out
+
+
+def _base_hash(value, bytes_=8):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=bytes_).digest(), "big")
+
+
+def minhash(shingle_set):
+    """NUM_PERM-long MinHash signature (empty set -> all max values)."""
+    bases = [_base_hash(s) for s in shingle_set]
+    if not bases:
+        return [_PRIME] * NUM_PERM
+    return [min((a * x + b) % _PRIME for x in bases) for a, b in _PERMUTATIONS]
+
+
+def lsh_bands(signature):
+    """[(band index, signed 63-bit band hash), ...] for a signature."""
+    out = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        out.append((band, _base_hash(",".join(map(str, rows))) >> 1))
+    return out
+
+
+def posting_bands(title, company=None, location=None, description=None):
+    return lsh_bands(minhash(shingles(title, company, location, description)))
+
+
+def is_same_posting(title_a, company_a, title_b, company_b):
+    """Confirm an LSH candidate: similar titles at (roughly) the same, named company."""
+    company_a, company_b = normalize_company(company_a), normalize_company(company_b)
+    if company_a in PLACEHOLDER_COMPANIES or company_b in PLACEHOLDER_COMPANIES:
+        return False
+    if jaccard(trigrams(normalize_text(title_a)), trigrams(normalize_text(title_b))) < TITLE_THRESHOLD:
+        return False
+    return jaccard(trigrams(company_a), trigrams(company_b)) >= COMPANY_THRESHOLD
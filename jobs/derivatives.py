@@ -0,0 +1,107 @@
+# jobs/derivatives.py
+"""
+Responsive variants of BlogPost.featured_image.
+
+Each source image is resized with Pillow to IMAGE_VARIANT_WIDTHS (never
+upscaled) and encoded once per format in IMAGE_VARIANT_FORMATS. Variant names
+carry a hash of their own bytes (`blog/derived/<stem>-<width>w-<hash>.webp`),
+so a URL never changes meaning and can be served with far-future cache headers.
+The result is stored on the post as
+`{"source": <featured_image name>, "variants": [{"width", "format", "name"}, ...]}`.
+
+`build_variants` takes and returns plain values so the backfill command can
+run it in a process pool.
+"""
+import hashlib
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+DERIVED_DIR = "blog/derived"
+DEFAULT_WIDTHS = (320, 640, 1024)
+DEFAULT_FORMATS = ("webp", "jpeg")
+EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+QUALITY = {"webp": 80, "jpeg": 82}
+
+
+def variant_widths():
+    return tuple(getattr(settings, "IMAGE_VARIANT_WIDTHS", DEFAULT_WIDTHS))
+
+
+def variant_formats():
+    return tuple(getattr(settings, "IMAGE_VARIANT_FORMATS", DEFAULT_FORMATS))
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "jpeg":
+        image = image.convert("RGB")
+        image.save(buffer, "JPEG", quality=QUALITY[fmt], optimize=True, progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=QUALITY[fmt], method=4)
+    return buffer.getvalue()
+
+
+def build_variants(name, widths=None, formats=None):
+    """Write the variants for a stored image; returns the `image_variants` value."""
+    widths = widths or variant_widths()
+    formats = formats or variant_formats()
+    with default_storage.open(name, "rb") as fh:
+        original = ImageOps.exif_transpose(Image.open(fh))
+        original.load()
+    if original.mode not in ("RGB", "RGBA"):
+        original = original.convert("RGBA" if "transparency" in original.info else "RGB")
+
+    # Never upscale: widths past the original collapse into one full-size variant
+    targets = sorted({min(width, original.width) for width in widths})
+    stem = os.path.splitext(os.path.basename(name))[0]
+    variants = []
+    for width in targets:
+        height = max(1, round(original.height * width / original.width))
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            data = _encode(resized, fmt)
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            path = f"{DERIVED_DIR}/{stem}-{width}w-{digest}{EXTENSIONS[fmt]}"
+            if not default_storage.exists(path):
+                path = default_storage.save(path, ContentFile(data))
+            variants.append({"width": width, "format": fmt, "name": path})
+    return {"source": name, "variants": variants}
+
+
+def refresh_variants(post):
+    """Regenerate `post.image_variants` if they don't match its current featured image."""
+    name = post.featured_image.name if post.featured_image else ""
+    if (post.image_variants or {}).get("source", "") == name:
+        return False
+    model = type(post)
+    # Images are shared between posts (see jobs.images), so reuse another post's variants
+    shared = model.objects.filter(image_variants__source=name).exclude(pk=post.pk)
+    existing = shared.values_list("image_variants", flat=True).first() if name else None
+    if existing:
+        post.image_variants = existing
+    elif name:
+        try:
+            post.image_variants = build_variants(name)
+        except Exception as e:
+            print(f"⚠️ Could not build image variants for {name}: {e}")
+            # Recorded as done so every save doesn't retry a broken image
+            post.image_variants = {"source": name, "variants": []}
+    else:
+        post.image_variants = {}
+    model.objects.filter(pk=post.pk).update(image_variants=post.image_variants)
+    return True
+
+
+def variant_urls(post, fmt):
+    """[(url, width), ...] for one format, narrowest first."""
+    variants = (post.image_variants or {}).get("variants", [])
+    return [(default_storage.url(v["name"]), v["width"]) for v in variants if v["format"] == fmt]
+
+
+def srcset(post, fmt="jpeg"):
+    return ", ".join(f"{url} {width}w" for url, width in variant_urls(post, fmt))
@@ -0,0 +1,126 @@
+# jobs/facets.py
+"""
+Category and location facets for the job listings.
+
+Job.category / Job.location are free text, so listing their distinct values
+would mean a DISTINCT scan of jobs_job per request. Instead JobCategory and
+JobLocation hold one row per normalized value with a job count, adjusted as
+jobs come and go: by signals for save()/delete() (jobs/signals.py) and by
+JobIngestor for bulk_create, which sends no signals.
+
+A job counts toward its category and toward every location whose filter
+returns it: its canonical place (Job.location_key), each place containing it
+and, for remote jobs, "Remote" (jobs/gazetteer.py). So "Lagos" is one row
+whether jobs say "Lagos" or "Lagos, Nigeria", and its count includes Ikeja.
+Only locations the gazetteer doesn't know are keyed on their own text.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .gazetteer import containing_places, get_gazetteer
+from .models import Job, JobCategory, JobLocation
+
+FACETS = ((JobCategory, ("category",)), (JobLocation, ("location", "location_key")))
+# Job fields the facets are computed from
+FACET_FIELDS = [field for _, fields in FACETS for field in fields]
+MAX_LENGTH = 200
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def display_name(value):
+    return _SPACE_RE.sub(" ", value or "").strip()[:MAX_LENGTH]
+
+
+def facet_key(value):
+    return display_name(value).casefold()
+
+
+def category_facets(category):
+    key = facet_key(category)
+    return [(key, display_name(category))] if key else []
+
+
+def location_facets(location, location_key=""):
+    """[(key, display name)] of the location facets a job at `location` belongs to."""
+    if not location_key:
+        key = facet_key(location)
+        return [(key, display_name(location))] if key else []
+    # Place names resolve back to their ids, so the facet's filter link finds the same jobs
+    gazetteer = get_gazetteer()
+    return [(place_id, gazetteer.name(place_id) or place_id) for place_id in containing_places(location_key)]
+
+
+def _facets(model, values):
+    """Facets of one job for `model`; `values` is {field: value}."""
+    if model is JobLocation:
+        return location_facets(values.get("location"), values.get("location_key"))
+    return category_facets(values.get("category"))
+
+
+def _deltas(model, changes):
+    """{key: (display name, delta)} for [(job field values, sign), ...]."""
+    counts = Counter()
+    names = {}
+    for values, sign in changes:
+        for key, name in _facets(model, values):
+            counts[key] += sign
+            names.setdefault(key, name)
+    return {key: (names[key], delta) for key, delta in counts.items() if delta}
+
+
+def apply_deltas(model, deltas):
+    """Create missing facet rows and shift counts; one UPDATE per distinct delta."""
+    if not deltas:
+        return
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [model(key=key, name=name) for key, (name, delta) in deltas.items() if delta > 0],
+            ignore_conflicts=True,
+        )
+        by_delta = {}
+        for key, (_, delta) in deltas.items():
+            by_delta.setdefault(delta, []).append(key)
+        for delta, keys in by_delta.items():
+            model.objects.filter(key__in=keys).update(job_count=Greatest(F("job_count") + delta, Value(0)))
+
+
+def record_jobs(jobs, sign=1):
+    """Count `jobs` into (sign=1) or out of (sign=-1) both facet tables."""
+    changes = [({field: getattr(job, field) for field in FACET_FIELDS}, sign) for job in jobs]
+    for model, _ in FACETS:
+        apply_deltas(model, _deltas(model, changes))
+
+
+def record_change(before, after):
+    """Move one job between facets after an edit; before/after are {field: value}."""
+    for model, _ in FACETS:
+        # Moves within a region leave the region's own count alone
+        apply_deltas(model, _deltas(model, [(before, -1), (after, 1)]))
+
+
+def rebuild_facets():
+    """Recount every facet from jobs_job (one GROUP BY per facet)."""
+    totals = {}
+    with transaction.atomic():
+        for model, fields in FACETS:
+            counts = Counter()
+            names = {}
+            for *values, n in Job.objects.values_list(*fields).annotate(n=Count("id")).order_by():
+                for key, name in _facets(model, dict(zip(fields, values))):
+                    counts[key] += n
+                    names.setdefault(key, name)
+            model.objects.all().delete()
+            model.objects.bulk_create([model(key=key, name=names[key], job_count=n) for key, n in counts.items()])
+            totals[model._meta.verbose_name_plural] = len(counts)
+    return totals
+
+
+def top_facets(model, limit=None):
+    """Facets with jobs, most jobs first (served by the (-job_count, name) index)."""
+    queryset = model.objects.filter(job_count__gt=0).only("name", "job_count").order_by("-job_count", "name")
+    return queryset[:limit] if limit else queryset
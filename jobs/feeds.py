@@ -0,0 +1,117 @@
+# jobs/feeds.py
+"""
+Conditional-GET and watermark helpers shared by fetch_jobs and fetch_job_news.
+
+Each source keeps a FeedState row with the last ETag / Last-Modified
+validators and the newest entry (GUID and publish date) already ingested,
+plus the GUIDs of every entry sharing that publish date.
+"""
+from django.utils import timezone
+
+from .models import FeedState
+
+
+def get_state(source):
+    state, _ = FeedState.objects.get_or_create(source=source)
+    return state
+
+
+def conditional_headers(state):
+    """If-None-Match / If-Modified-Since headers for the stored validators."""
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+    return headers
+
+
+class Watermark:
+    """
+    Tracks where the previous run stopped. Feeds list newest entries first, so
+    the caller stops as soon as `reached()` returns True, and skips entries
+    for which `seen()` is True: those published at the very timestamp of the
+    watermark that the previous run already ingested.
+    """
+
+    # Cap on the GUIDs remembered for one timestamp (e.g. a feed stamping a whole batch alike)
+    MAX_GUIDS = 500
+
+    def __init__(self, state):
+        self.state = state
+        # Frozen at start so saving mid-run (multi-page sources) doesn't move the goalposts
+        self.last_guid = state.last_guid
+        self.last_published = state.last_published
+        self.last_published_guids = set(state.last_published_guids or ())
+        self.newest_guid = None
+        self.newest_published = None
+        self.newest_guids = set()
+        # Set by pause(): this run hasn't got back to last_published yet
+        self.resume_page = None
+
+    def reached(self, guid=None, published=None):
+        if guid and self.last_guid and guid == self.last_guid:
+            return True
+        # Entries sharing the watermark's timestamp may be new; see seen()
+        if published and self.last_published and published < self.last_published:
+            return True
+        return False
+
+    def seen(self, guid=None, published=None):
+        """True for an entry at the watermark's timestamp that the previous run ingested."""
+        return bool(
+            guid and published and self.last_published
+            and published == self.last_published
+            and guid[:500] in self.last_published_guids
+        )
+
+    def observe(self, guid=None, published=None):
+        """Record an ingested entry; the first (newest) GUID wins."""
+        if guid and self.newest_guid is None:
+            self.newest_guid = guid[:500]
+        if published and (self.newest_published is None or published > self.newest_published):
+            self.newest_published = published
+            self.newest_guids = set()
+        if guid and published and published == self.newest_published and len(self.newest_guids) < self.MAX_GUIDS:
+            self.newest_guids.add(guid[:500])
+
+    def pause(self, page):
+        """
+        The run stopped before reaching last_published (page budget spent or a
+        page failed): keep the watermark and resume at `page` next time.
+        """
+        self.resume_page = page
+
+    def finish(self):
+        """The run got back to last_published; the watermark may advance."""
+        self.resume_page = None
+
+    def save(self, status=200, etag=None, last_modified=None):
+        """Persist validators and the advanced watermark after a successful run."""
+        state = self.state
+        state.last_status = status
+        state.last_checked = timezone.now()
+        if status != 304:
+            state.etag = etag or None
+            state.last_modified = last_modified or None
+        if self.resume_page is not None:
+            # Entries between last_published and the resume page are still missing
+            state.resume_page = self.resume_page
+            if self.newest_published and (state.resume_published is None or self.newest_published > state.resume_published):
+                state.resume_published = self.newest_published
+            state.save()
+            return
+        if state.resume_published and (self.newest_published is None or state.resume_published > self.newest_published):
+            # A resumed run: the newest entry came from the runs before it
+            self.newest_published, self.newest_guids = state.resume_published, set()
+        state.resume_page = state.resume_published = None
+        if self.newest_guid:
+            state.last_guid = self.newest_guid
+        if self.newest_published:
+            if state.last_published is None or self.newest_published > state.last_published:
+                state.last_published = self.newest_published
+                state.last_published_guids = sorted(self.newest_guids)
+            elif self.newest_published == state.last_published:
+                guids = set(state.last_published_guids or ()) | self.newest_guids
+                state.last_published_guids = sorted(guids)[:self.MAX_GUIDS]
+        state.save()
@@ -0,0 +1,237 @@
+# jobs/fetcher.py
+"""
+Concurrent download engine for the ingestion commands.
+
+Sources are fetched on a bounded thread pool with per-host and per-source
+concurrency limits. Finished downloads are handed back to the caller one at a
+time, so parsing and DB writes stay on a single (writer) thread and SQLite is
+never hit by concurrent writers.
+"""
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+CHUNK_SIZE = 64 * 1024
+# Bodies bigger than this spill from memory to a temp file
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+class FetchTask:
+    """One HTTP GET belonging to a named source."""
+
+    def __init__(self, source, url, timeout=20, headers=None, max_concurrency=1, rate_limiter=None,
+                 max_bytes=None, meta=None):
+        self.source = source
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.max_bytes = max_bytes
+        self.meta = meta or {}
+
+    @property
+    def host(self):
+        return urlsplit(self.url).netloc.lower()
+
+
+class FetchResult:
+    """
+    Outcome of a FetchTask: either `body` or `error` is set. `body` is a
+    rewound file object so large feeds can be parsed incrementally.
+    """
+
+    def __init__(self, task, status_code=None, headers=None, body=None, error=None, elapsed=0.0):
+        self.task = task
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def content(self):
+        """Whole body as bytes, for small payloads such as JSON APIs."""
+        if self.body is None:
+            return b""
+        self.body.seek(0)
+        return self.body.read()
+
+    def close(self):
+        if self.body is not None:
+            self.body.close()
+
+    @property
+    def source(self):
+        return self.task.source
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class KeyedLimiter:
+    """Lazily created semaphores, one per key (host name, source name...)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def get(self, key, limit):
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[key]
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to
+    `capacity`. `acquire()` blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def build_session(pool_size=10):
+    """requests.Session with connect retries and a pool big enough for the workers."""
+    session = requests.Session()
+    retry = Retry(connect=3, backoff_factor=2)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _download(session, task, host_limiter, source_limiter, per_host, host_pacer=None):
+    started = time.monotonic()
+    headers = dict(DEFAULT_HEADERS, **task.headers)
+    try:
+        with host_limiter.get(task.host, per_host), source_limiter.get(task.source, task.max_concurrency):
+            if host_pacer is not None:
+                host_pacer.get(task.host).acquire()
+            if task.rate_limiter is not None:
+                task.rate_limiter.acquire()
+            deadline = time.monotonic() + task.timeout
+            with session.get(task.url, headers=headers, timeout=task.timeout, stream=True) as response:
+                response.raise_for_status()
+                declared = response.headers.get("Content-Length")
+                if task.max_bytes and declared and declared.isdigit() and int(declared) > task.max_bytes:
+                    raise ResponseTooLarge(f"{declared} bytes exceeds the {task.max_bytes} byte cap")
+                body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+                size = 0
+                try:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        # `timeout` only bounds each socket read; enforce a total budget too
+                        if time.monotonic() > deadline:
+                            raise TimeoutError(f"exceeded {task.timeout}s total download time")
+                        size += len(chunk)
+                        if task.max_bytes and size > task.max_bytes:
+                            raise ResponseTooLarge(f"body exceeds the {task.max_bytes} byte cap")
+                        body.write(chunk)
+                except Exception:
+                    body.close()
+                    raise
+                body.seek(0)
+                return FetchResult(
+                    task,
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    body=body,
+                    elapsed=time.monotonic() - started,
+                )
+    except Exception as e:
+        return FetchResult(task, error=e, elapsed=time.monotonic() - started)
+
+
+class HostPacer:
+    """One single-token bucket per host: at most one request every `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def get(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(rate=1 / self.interval, capacity=1)
+            return self._buckets[host]
+
+
+class FetchEngine:
+    """
+    Bounded thread pool for FetchTasks. Tasks can be submitted while results
+    are being consumed, so a source can queue follow-up pages mid-run.
+    `host_interval` spaces out requests to the same host (politeness).
+    """
+
+    def __init__(self, session=None, max_workers=8, per_host=2, host_interval=None):
+        self.session = session or build_session(pool_size=max_workers)
+        self.per_host = per_host
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._host_limiter = KeyedLimiter()
+        self._source_limiter = KeyedLimiter()
+        self._host_pacer = HostPacer(host_interval) if host_interval else None
+        self._pending = set()
+
+    def submit(self, task):
+        self._pending.add(self._pool.submit(
+            _download, self.session, task, self._host_limiter, self._source_limiter, self.per_host,
+            self._host_pacer,
+        ))
+
+    def results(self):
+        """Yield results as they finish until nothing is pending (including late submissions)."""
+        while self._pending:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fetch_all(tasks, session=None, max_workers=8, per_host=2):
+    """
+    Download `tasks` concurrently and yield a FetchResult for each one as soon
+    as it finishes. Errors are returned on the result, never raised.
+    """
+    with FetchEngine(session=session, max_workers=max_workers, per_host=per_host) as engine:
+        for task in tasks:
+            engine.submit(task)
+        yield from engine.results()
@@ -0,0 +1,146 @@
+# jobs/gazetteer.py
+"""
+Canonical locations for Job.location.
+
+The gazetteer (jobs/data/locations.json, or settings.LOCATION_GAZETTEER) lists
+places with path-style ids: continent/country/state/city, e.g. "af/ng/la"
+(Lagos State) and "af/ng/la/ikeja". `resolve()` maps free text such as
+"Ikeja, Lagos, Nigeria" or "Remote - Nigeria" to the most specific id it
+names. Remote jobs get ids under "remote" ("remote", "remote/af/ng").
+
+Job.location_key stores that id (set on save and at ingest), so the
+location filter is an indexed IN lookup over the place and its descendants
+instead of a substring scan of jobs_job.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+REMOTE = "remote"
+DEFAULT_PATH = Path(__file__).resolve().parent / "data" / "locations.json"
+
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize(text):
+    return " ".join(_NON_WORD_RE.sub(" ", (text or "").casefold()).replace("_", " ").split())
+
+
+def parent(place_id):
+    return place_id.rpartition("/")[0] or None
+
+
+def ancestors(place_id):
+    """The id and all its ancestors, most specific first."""
+    out = []
+    while place_id:
+        out.append(place_id)
+        place_id = parent(place_id)
+    return out
+
+
+class Gazetteer:
+    def __init__(self, places, remote_aliases=()):
+        self.names = {}
+        self.aliases = {}
+        self.children = {}
+        for place in places:
+            place_id = place["id"]
+            self.names[place_id] = place["name"]
+            self.children.setdefault(parent(place_id), []).append(place_id)
+            for alias in [place["name"], *place.get("aliases", [])]:
+                # First listed wins, so list the intended meaning of a shared name first
+                self.aliases.setdefault(normalize(alias), place_id)
+        for alias in remote_aliases:
+            self.aliases[normalize(alias)] = REMOTE
+        self.max_words = max((len(alias.split()) for alias in self.aliases), default=1)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["places"], data.get("remote_aliases", ()))
+
+    def matches(self, text):
+        """Ids named in `text`, longest phrases first, in order of appearance."""
+        words = normalize(text).split()
+        found = []
+        used = [False] * len(words)
+        for size in range(min(self.max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                place_id = self.aliases.get(" ".join(words[start:start + size]))
+                if place_id:
+                    found.append((start, place_id))
+                    used[start:start + size] = [True] * size
+        return [place_id for _, place_id in sorted(found)]
+
+    def resolve(self, text):
+        """The canonical id for a free-text location, or "" if it names no known place."""
+        found = self.matches(text)
+        remote = REMOTE in found
+        places = [place_id for place_id in found if place_id != REMOTE]
+        place = ""
+        if places:
+            deepest = max(places, key=lambda place_id: place_id.count("/"))
+            chain = set(ancestors(deepest))
+            if all(place_id in chain for place_id in places):
+                place = deepest
+            else:
+                # "Lagos or Abuja" -> Nigeria; places in different continents -> nothing
+                common = set(ancestors(places[0]))
+                for place_id in places[1:]:
+                    common &= set(ancestors(place_id))
+                place = max(common, key=lambda place_id: place_id.count("/"), default="")
+        if remote:
+            # Remote jobs are scoped by country at most, e.g. "remote/af/ng"
+            return f"{REMOTE}/{'/'.join(place.split('/')[:2])}" if place else REMOTE
+        return place
+
+    def descendants(self, place_id):
+        """`place_id` and every id below it, including its remote variants for countries/continents."""
+        if place_id == REMOTE:
+            return [REMOTE] + [f"{REMOTE}/{p}" for p in self.names if p.count("/") <= 1]
+        if place_id.startswith(f"{REMOTE}/"):
+            return [place_id]
+        out = []
+        stack = [place_id]
+        while stack:
+            current = stack.pop()
+            out.append(current)
+            stack.extend(self.children.get(current, ()))
+        # "Remote - Nigeria" jobs are open to people in Nigeria
+        return out + [f"{REMOTE}/{p}" for p in out if p.count("/") <= 1]
+
+    def name(self, place_id):
+        if place_id == REMOTE:
+            return "Remote"
+        if place_id.startswith(f"{REMOTE}/"):
+            return f"Remote ({self.names.get(place_id[len(REMOTE) + 1:], place_id)})"
+        return self.names.get(place_id, "")
+
+
+def containing_places(place_id):
+    """Ids whose location filter matches `place_id` (the inverse of descendants), most specific first."""
+    if place_id.startswith(f"{REMOTE}/"):
+        return [place_id, *ancestors(place_id[len(REMOTE) + 1:]), REMOTE]
+    return ancestors(place_id)
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    return Gazetteer.from_file(getattr(settings, "LOCATION_GAZETTEER", DEFAULT_PATH))
+
+
+def resolve(text):
+    return get_gazetteer().resolve(text)
+
+
+def location_ids(text):
+    """Ids a location filter should match (the place and everything in it), or None if unknown."""
+    place_id = resolve(text)
+    return get_gazetteer().descendants(place_id) if place_id else None
@@ -0,0 +1,134 @@
+# jobs/images.py
+"""
+Featured-image downloads for fetch_job_news.
+
+Images are fetched in parallel through the FetchEngine, with a per-host
+concurrency limit and a minimum interval between requests to the same host.
+Bodies are streamed to a spooled temp file under IMAGE_MAX_BYTES and hashed;
+StoredImage maps each sha256 to the stored file, so an image shared by several
+posts (or seen again on a later run) is stored once.
+"""
+import hashlib
+import os
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .fetcher import CHUNK_SIZE, FetchEngine, FetchTask, build_session
+from .models import StoredImage
+
+UPLOAD_DIR = "blog"
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+URL_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+
+def image_extension(url, content_type):
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in CONTENT_TYPE_EXTENSIONS:
+        return CONTENT_TYPE_EXTENSIONS[content_type]
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    if ext in URL_EXTENSIONS:
+        return ".jpg" if ext == ".jpeg" else ext
+    return None
+
+
+def hash_file(fileobj):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def store_image(result):
+    """StoredImage for a downloaded body, reusing the existing file when the hash is known."""
+    ext = image_extension(result.task.url, result.headers.get("Content-Type"))
+    if ext is None:
+        raise ValueError(f"not an image ({result.headers.get('Content-Type') or 'no content type'})")
+
+    sha256 = hash_file(result.body)
+    stored = StoredImage.objects.filter(sha256=sha256).first()
+    if stored is not None:
+        return stored, False
+
+    size = result.body.seek(0, os.SEEK_END)
+    result.body.seek(0)
+    # Content-addressed name: the same bytes always land at the same path
+    path = default_storage.save(f"{UPLOAD_DIR}/blog_{sha256[:20]}{ext}", File(result.body))
+    stored, created = StoredImage.objects.get_or_create(
+        sha256=sha256,
+        defaults={"path": path, "source_url": result.task.url[:1000], "size": size},
+    )
+    if not created:
+        # Lost a race with another run; keep theirs
+        default_storage.delete(path)
+    return stored, created
+
+
+def download_images(posts, workers=None, per_host=None, host_interval=None, max_bytes=None, timeout=None):
+    """
+    Attach featured images to saved posts. `posts` is a list of (post, image_url);
+    returns a dict of counts (downloaded, reused, failed).
+    """
+    workers = workers or getattr(settings, "IMAGE_FETCH_WORKERS", 4)
+    per_host = per_host or getattr(settings, "IMAGE_FETCH_PER_HOST", 1)
+    host_interval = host_interval if host_interval is not None else getattr(settings, "IMAGE_FETCH_HOST_INTERVAL", 1.0)
+    max_bytes = max_bytes or getattr(settings, "IMAGE_MAX_BYTES", 5 * 1024 * 1024)
+    timeout = timeout or getattr(settings, "FETCH_TIMEOUT", 20)
+    counts = {"downloaded": 0, "reused": 0, "failed": 0}
+
+    def attach(post, stored):
+        post.featured_image.name = stored.path
+        post.save(update_fields=["featured_image"])
+
+    # url -> posts waiting on it; URLs we already stored are attached without a request
+    by_url = {}
+    for post, url in posts:
+        if url:
+            by_url.setdefault(url, []).append(post)
+    known = {s.source_url: s for s in StoredImage.objects.filter(source_url__in=list(by_url))}
+    for url in list(by_url):
+        if url in known:
+            for post in by_url.pop(url):
+                attach(post, known[url])
+                counts["reused"] += 1
+
+    if not by_url:
+        return counts
+
+    engine = FetchEngine(
+        session=build_session(pool_size=workers),
+        max_workers=workers,
+        per_host=per_host,
+        host_interval=host_interval,
+    )
+    with engine:
+        for url in by_url:
+            engine.submit(FetchTask("images", url, timeout=timeout, max_concurrency=workers, max_bytes=max_bytes))
+
+        for result in engine.results():
+            url = result.task.url
+            try:
+                if not result.ok:
+                    raise result.error
+                stored, created = store_image(result)
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"⚠️ Image download failed for {url}: {e}")
+                continue
+            finally:
+                result.close()
+
+            for post in by_url[url]:
+                attach(post, stored)
+            counts["downloaded" if created else "reused"] += len(by_url[url])
+            print(f"✅ {'Saved' if created else 'Reused'} image: {stored.path}")
+    return counts
@@ -0,0 +1,157 @@
+# jobs/ingest.py
+"""
+Batched job ingestion.
+
+Candidates are buffered and flushed in batches: one query loads the dedup keys
+that already exist, two more find near-duplicates (same canonical URL, or a
+shared MinHash band confirmed on title/company, see jobs/dedup.py), and the
+new rows go in with a single bulk_create. The unique `Job.dedup_key` column
+makes overlapping runs safe: rows are inserted and given their MinHash bands
+in one transaction, so a run only claims the band-less rows it inserted. bulk_create sends no signals, so the category /
+location facet counts, search cache, page cache and prerendered facet pages
+are updated here too.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import prerender
+from .dedup import canonicalize_url, is_same_posting, posting_bands
+from .facets import record_jobs
+from .gazetteer import resolve as resolve_location
+from .models import Job, JobMinhashBand
+from .pagecache import invalidate
+from .searchcache import bump_search_version
+from .text import make_snippet
+
+
+def make_aware(dt):
+    """Convert naive datetimes to timezone-aware."""
+    if dt is None:
+        return timezone.now()
+    if timezone.is_naive(dt):
+        return timezone.make_aware(dt, timezone=timezone.get_current_timezone())
+    return dt
+
+
+def fingerprint(job):
+    """Set `canonical_url` and attach the LSH bands (`job._bands`) to a Job."""
+    job.canonical_url = canonicalize_url(job.url)
+    job._bands = posting_bands(job.title, job.company, job.location, job.description)
+    return job
+
+
+def index_bands(jobs):
+    """Store the LSH bands of saved jobs."""
+    JobMinhashBand.objects.bulk_create([
+        JobMinhashBand(job=job, band=band, value=value)
+        for job in jobs
+        for band, value in getattr(job, "_bands", None) or fingerprint(job)._bands
+    ])
+
+
+def _stored_band_index(jobs):
+    """{(band, value): [(title, company), ...]} for stored jobs sharing a band with `jobs`."""
+    wanted = defaultdict(set)
+    for job in jobs:
+        for band, value in job._bands:
+            wanted[band].add(value)
+    index = defaultdict(list)
+    if not wanted:
+        return index
+    query = Q()
+    for band, values in wanted.items():
+        query |= Q(band=band, value__in=values)
+    rows = JobMinhashBand.objects.filter(query).values_list("band", "value", "job__title", "job__company")
+    for band, value, title, company in rows:
+        index[(band, value)].append((title, company))
+    return index
+
+
+def _is_near_duplicate(job, index):
+    return any(
+        is_same_posting(job.title, job.company, title, company)
+        for key in job._bands
+        for title, company in index.get(key, ())
+    )
+
+
+class JobIngestor:
+    """Collect job candidates and write the new ones in batches."""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, "JOB_INGEST_BATCH_SIZE", 200)
+        self.new_jobs = []
+        self.near_duplicates = 0
+        self._pending = {}
+
+    def add(self, **kwargs):
+        """Queue a job candidate; duplicates within the batch are dropped."""
+        if not kwargs.get("title"):
+            return
+        key = Job.make_dedup_key(kwargs["title"], kwargs.get("company"))
+        if key in self._pending:
+            return
+        kwargs["date_posted"] = make_aware(kwargs.get("date_posted"))
+        # bulk_create skips Job.save(), so derive the snippet and location key here
+        kwargs["snippet"] = make_snippet(kwargs.get("description"))
+        kwargs["location_key"] = resolve_location(kwargs.get("location"))
+        self._pending[key] = fingerprint(Job(dedup_key=key, **kwargs))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert pending candidates that are not in the table yet."""
+        if not self._pending:
+            return []
+        pending, self._pending = self._pending, {}
+
+        existing = set(
+            Job.objects.filter(dedup_key__in=list(pending)).values_list("dedup_key", flat=True)
+        )
+        fresh = self._drop_near_duplicates([job for key, job in pending.items() if key not in existing])
+        if not fresh:
+            return []
+
+        by_key = {job.dedup_key: job for job in fresh}
+        with transaction.atomic():
+            # ignore_conflicts covers rows a concurrent run inserted after our lookup
+            Job.objects.bulk_create(fresh, batch_size=self.batch_size, ignore_conflicts=True)
+            # Re-read so the newsletter gets saved instances with primary keys. A run
+            # commits its rows together with their bands, so rows without bands are ours.
+            created = list(Job.objects.filter(dedup_key__in=list(by_key), minhash_bands__isnull=True))
+            for job in created:
+                # The re-read rows lack the fingerprints computed in add()
+                job._bands = by_key[job.dedup_key]._bands
+            index_bands(created)
+            record_jobs(created)
+        if not created:
+            return []
+        bump_search_version()
+        invalidate("jobs")
+        prerender.invalidate(*prerender.FACET_PAGES)
+        self.new_jobs.extend(created)
+        return created
+
+    def _drop_near_duplicates(self, candidates):
+        """Filter out candidates matching a stored (or earlier in-batch) posting's URL or MinHash band."""
+        if not candidates:
+            return candidates
+        urls = {job.canonical_url for job in candidates if job.canonical_url}
+        seen_urls = set(Job.objects.filter(canonical_url__in=urls).values_list("canonical_url", flat=True))
+        index = _stored_band_index(candidates)
+
+        kept = []
+        for job in candidates:
+            if (job.canonical_url and job.canonical_url in seen_urls) or _is_near_duplicate(job, index):
+                self.near_duplicates += 1
+                continue
+            kept.append(job)
+            if job.canonical_url:
+                seen_urls.add(job.canonical_url)
+            for key in job._bands:
+                index[key].append((job.title, job.company))
+        return kept
@@ -0,0 +1,108 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from jobs.facets import top_facets
+from jobs.models import BlogPost, Job, JobCategory, JobLocation, JobMinhashBand
+from jobs.pagination import KeysetPaginator
+from jobs.search import filter_jobs, index_available, search_jobs
+from jobs.views import HOME_ORDERING, JOB_LIST_FIELDS, JOB_LIST_ORDERING
+
+# SQLite: "SCAN jobs_job" (no index) or a sort the index should have provided
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (\w+)(?! USING| VIRTUAL TABLE)(\s|$)")
+SQLITE_SORT = "USE TEMP B-TREE FOR ORDER BY"
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+POSTGRES_SORT = re.compile(r"->\s+Sort\b|^Sort\b", re.MULTILINE)
+
+
+# Ordered queries whose sort no index can serve; the plan may sort, but only
+# the rows an index search found (a full scan is still a failure)
+SORT_EXPECTED = {
+    "job_list: region filter": "a region is an IN list of location_keys, each its own index range, so their rows are sorted by date",
+    "search: keyword": "FTS5 yields matches in rowid order; only the matches are sorted by date",
+}
+
+
+def hot_queries():
+    """
+    (name, queryset, ordered) for every query on a request or fetch hot path.
+    Ordered queries must be served in index order unless SORT_EXPECTED says why not.
+    """
+    now = timezone.now()
+    jobs = Job.objects.only(*JOB_LIST_FIELDS)
+    home = KeysetPaginator(jobs, HOME_ORDERING)
+    job_list = KeysetPaginator(jobs, JOB_LIST_ORDERING)
+    queries = [
+        ("home: first page", home.window(), True),
+        ("home: next page", home.window([False, now, 10 ** 9]), True),
+        ("home: previous page", home.window([True, now, 1], reverse=True), True),
+        ("job_list: first page", job_list.window(), True),
+        ("job_list: next page", job_list.window([now, 10 ** 9]), True),
+        ("job_list: next page after undated", job_list.window([None, 10 ** 9]), True),
+        # A place without sub-places is one location_key, read in index order
+        ("job_list: place filter", KeysetPaginator(filter_jobs(jobs, location="ikeja"), JOB_LIST_ORDERING).window(), True),
+        ("job_list: region filter", KeysetPaginator(filter_jobs(jobs, location="lagos"), JOB_LIST_ORDERING).window(), True),
+        ("newsletter: last 24h", Job.objects.filter(created_at__gte=now - timedelta(hours=24)).order_by("-created_at"), True),
+        ("ingest: dedup keys", Job.objects.filter(dedup_key__in=["a" * 64, "b" * 64]), False),
+        ("ingest: canonical urls", Job.objects.filter(canonical_url__in=["example.com/job/1"]), False),
+        ("ingest: minhash bands", JobMinhashBand.objects.filter(Q(band=0, value__in=[1, 2]) | Q(band=1, value__in=[3])), False),
+        ("payment: reference", Job.objects.filter(paystack_reference="1_job"), False),
+        ("news: post exists", BlogPost.objects.filter(title="Title", source="TechCrunch - Jobs").order_by()[:1], False),
+        ("blog_detail: slug", BlogPost.objects.filter(slug="some-post", is_published=True), False),
+        ("blog_list: page", BlogPost.objects.filter(is_published=True).order_by("-date_posted")[10:20], True),
+        ("blog_list: count", BlogPost.objects.filter(is_published=True), False),
+        ("facets: categories", top_facets(JobCategory), True),
+        ("facets: home sidebar locations", top_facets(JobLocation, limit=8), True),
+        ("facets: count update", JobLocation.objects.filter(key__in=["lagos", "remote"]), False),
+    ]
+    if index_available():
+        queries.append(("search: keyword", search_jobs(jobs, "python developer").order_by("-date_posted", "-id")[:11], True))
+    return queries
+
+
+def problems(plan, ordered):
+    """Full scans (and, if `ordered`, explicit sorts) in an EXPLAIN output."""
+    found = []
+    if connection.vendor == "postgresql":
+        found += [f"sequential scan on {table}" for table in POSTGRES_FULL_SCAN.findall(plan)]
+        if ordered and POSTGRES_SORT.search(plan):
+            found.append("sort not served by an index")
+    else:
+        found += [f"full scan of {table}" for table, _ in SQLITE_FULL_SCAN.findall(plan)]
+        if ordered and SQLITE_SORT in plan:
+            found.append("sort not served by an index")
+    return found
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN each hot listing/lookup/dedup query and fail if any falls back to a full scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--show-plans", action="store_true", help="Print the plan of every query")
+
+    def handle(self, *args, **options):
+        failures = 0
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Small tables make seq scans look cheap; we want to know an index *can* be used
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for name, queryset, ordered in hot_queries():
+                plan = queryset.explain()
+                found = problems(plan, ordered and name not in SORT_EXPECTED)
+                if found:
+                    failures += 1
+                    self.stdout.write(f"❌ {name}: {', '.join(found)}")
+                elif name in SORT_EXPECTED and problems(plan, ordered):
+                    self.stdout.write(f"✅ {name} (sorted: {SORT_EXPECTED[name]})")
+                else:
+                    self.stdout.write(f"✅ {name}")
+                if found or options["show_plans"]:
+                    self.stdout.write("    " + plan.replace("\n", "\n    "))
+
+        if failures:
+            raise CommandError(f"{failures} hot queries regressed to full scans.")
+        self.stdout.write(self.style.SUCCESS("🎯 All hot queries use indexes."))
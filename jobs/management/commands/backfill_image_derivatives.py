@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from jobs.derivatives import build_variants
+from jobs.models import BlogPost
+from jobs.pagecache import invalidate
+
+
+class Command(BaseCommand):
+    help = "Generate responsive WebP/JPEG variants for existing blog featured images"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+        parser.add_argument("--all", action="store_true", help="Rebuild variants even where they are up to date")
+
+    def handle(self, *args, **options):
+        # featured image -> posts using it; shared images are resized once
+        by_image = {}
+        posts = BlogPost.objects.exclude(featured_image="").exclude(featured_image__isnull=True)
+        for pk, name, variants in posts.values_list("id", "featured_image", "image_variants"):
+            if options["all"] or (variants or {}).get("source") != name:
+                by_image.setdefault(name, []).append(pk)
+
+        if not by_image:
+            self.stdout.write("ℹ️ All featured images already have variants.")
+            return
+
+        self.stdout.write(f"🖼️ Building variants for {len(by_image)} images ({options['workers']} processes)...")
+        done = failed = 0
+        # django.setup() in each worker so storage/settings work under any start method
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup) as pool:
+            futures = {pool.submit(build_variants, name): name for name in by_image}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    variants = future.result()
+                except Exception as e:
+                    failed += 1
+                    variants = {"source": name, "variants": []}
+                    self.stderr.write(f"⚠️ {name}: {e}")
+                else:
+                    done += 1
+                BlogPost.objects.filter(id__in=by_image[name]).update(image_variants=variants)
+
+        # update() sends no signals; drop the cached pages rendered without the variants
+        slugs = BlogPost.objects.filter(id__in=[pk for pks in by_image.values() for pk in pks]).values_list("slug", flat=True)
+        invalidate("blogs", *(f"blog:{slug}" for slug in slugs if slug))
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Built variants for {done} images ({failed} failed)."))
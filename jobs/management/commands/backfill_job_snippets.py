@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from jobs.models import Job
+from jobs.pagecache import invalidate
+from jobs.searchcache import bump_search_version
+from jobs.text import make_snippet
+
+
+class Command(BaseCommand):
+    help = "Compute the plain-text snippet for jobs that don't have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--all", action="store_true", help="Recompute snippets for every job")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Job.objects.only("id", "description")
+        if not options["all"]:
+            # An empty snippet is a computed one (no text in the description)
+            queryset = queryset.filter(snippet__isnull=True)
+
+        updated = 0
+        batch = []
+        for job in queryset.order_by("id").iterator(chunk_size=batch_size):
+            job.snippet = make_snippet(job.description)
+            batch.append(job)
+            if len(batch) >= batch_size:
+                Job.objects.bulk_update(batch, ["snippet"])
+                updated += len(batch)
+                batch = []
+        if batch:
+            Job.objects.bulk_update(batch, ["snippet"])
+            updated += len(batch)
+
+        if updated:
+            # bulk_update sends no signals; drop the listings showing the old excerpts
+            bump_search_version()
+            invalidate("jobs")
+        self.stdout.write(self.style.SUCCESS(f"✅ Updated snippets for {updated} jobs."))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.sitemaps import sitemap_root, write_sitemaps
+
+
+class Command(BaseCommand):
+    help = "Write the sitemap index and parts (plain and .gz) to SITEMAP_ROOT, rewriting only changed parts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default=None, help="Site URL for <loc> entries (default: SITEMAP_BASE_URL)")
+        parser.add_argument("--force", action="store_true", help="Rewrite every part")
+
+    def handle(self, *args, **options):
+        base_url = (options["base_url"] or settings.SITEMAP_BASE_URL).rstrip("/")
+        written, unchanged, removed = write_sitemaps(base_url, force=options["force"])
+        self.stdout.write(self.style.SUCCESS(
+            f"🗺️ Sitemaps in {sitemap_root()}: {written} parts written, {unchanged} unchanged, {removed} removed."
+        ))
@@ -1,101 +1,83 @@
 import feedparser
-import time
-import requests
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.conf import settings
 from django.utils import timezone
-from django.core.files.base import ContentFile
-from django.utils.text import Truncator
 from jobs.models import BlogPost
-
-# 🔹 Optional summarizer (safe for Windows)
-try:
-    import torch
-    from transformers import pipeline
-
-    summarizer = pipeline(
-        "summarization",
-        model="facebook/bart-large-cnn",
-        device=-1,
-        framework="pt"
-    )
-    SUMMARIZER_AVAILABLE = True
-    print("✅ Summarizer ready (CPU mode)")
-except Exception as e:
-    print(f"⚠️ Summarizer disabled: {e}")
-    SUMMARIZER_AVAILABLE = False
-
-
-def auto_summary(text):
-    """Generate summary safely, fallback to truncation."""
-    if len(text) < 100:
-        return text
-    if not SUMMARIZER_AVAILABLE:
-        return Truncator(text).words(25)
-    try:
-        result = summarizer(
-            text[:1024],
-            max_length=100,
-            min_length=30,
-            do_sample=False
-        )
-        return result[0]["summary_text"]
-    except Exception as e:
-        print(f"Summarization failed: {e}")
-        return Truncator(text).words(25)
-
-
-def download_image_to_post(post, image_url):
-    """Download remote image into BlogPost.featured_image"""
-    if not image_url:
-        return
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; WorkBankBot/1.0)'}
-        response = requests.get(image_url, timeout=10, headers=headers)
-        if response.status_code == 200:
-            ext = '.jpg' if 'jpg' in image_url.lower() else '.png'
-            filename = f"blog_{post.id}_{int(time.time())}{ext}"
-            post.featured_image.save(filename, ContentFile(response.content), save=True)
-            print(f"✅ Saved image: {filename}")
-    except Exception as e:
-        print(f"⚠️ Image download failed for {image_url}: {e}")
-
-
-# 🔹 RSS sources
-SOURCES = [
-    {'name': 'TechCrunch - Jobs', 'url': 'https://techcrunch.com/category/jobs/feed/', 'category': 'Tech Jobs'},
-    {'name': 'The Guardian - Careers', 'url': 'https://www.theguardian.com/careers/rss', 'category': 'Career Advice'},
-    {'name': 'Glassdoor Blog', 'url': 'https://www.glassdoor.com/blog/feed/', 'category': 'Job Market'},
-    {'name': 'Nairaland - Jobs', 'url': 'https://www.nairaland.com/jobs/feed', 'category': 'Nigeria Jobs'},
-    {'name': 'Remote OK - Jobs', 'url': 'https://remoteok.com/feeds/remote-jobs.rss', 'category': 'Remote Jobs'},
-]
+from jobs.images import download_images
+from jobs.summarizer import SummaryStats, summarize_texts
+from jobs.feeds import Watermark, get_state
+from jobs.sources import get_adapters
+from datetime import datetime, timezone as dt_timezone
 
 
 class Command(BaseCommand):
     help = 'Fetch job & career news from RSS feeds and save as BlogPosts'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--source', action='append', dest='sources', help='Only fetch this source (repeatable)')
+        parser.add_argument('--force', action='store_true', help="Fetch sources even if they aren't due yet")
+        parser.add_argument('--batch-size', type=int, default=None, help='Texts per summarizer call (default: SUMMARIZER_BATCH_SIZE)')
+        parser.add_argument('--image-workers', type=int, default=getattr(settings, 'IMAGE_FETCH_WORKERS', 4), help='Parallel featured-image downloads')
+        parser.add_argument('--skip-images', action='store_true', help="Don't download featured images")
+        parser.add_argument('--skip-sitemaps', action='store_true', help="Don't rebuild the pre-generated sitemap files")
+
     def handle(self, *args, **options):
         created_count = 0
+        now = timezone.now()
+        # Posts are summarized together once every feed is read: (post, image_url)
+        pending = []
+        # Watermarks advance only after their posts are saved
+        finished = []
+
+        for adapter in get_adapters(kind='news', names=options['sources']):
+            # Legacy dict shape used throughout the entry loop below
+            source = {'name': adapter.name, 'url': adapter.url, 'category': adapter.category}
+            state = get_state(adapter.name)
+            if not options['force'] and not adapter.is_due(state, now):
+                self.stdout.write(f"\n⏸️ {adapter.name} not due yet")
+                continue
 
-        for source in SOURCES:
             self.stdout.write(f"\n📡 Fetching from: {source['name']}")
             try:
-                feed = feedparser.parse(source['url'])
+                watermark = Watermark(state)
+                feed = feedparser.parse(source['url'], etag=state.etag, modified=state.last_modified)
+                status = feed.get('status')
+                if status == 304:
+                    watermark.save(status=304)
+                    self.stdout.write("⏭️ Not modified since last run")
+                    continue
+                # Like fetch_jobs, a failed fetch leaves the state (and its validators) alone
+                if status is None or status >= 400:
+                    self.stderr.write(f"❌ Error fetching {source['name']}: {feed.get('bozo_exception') or f'HTTP {status}'}")
+                    continue
+                if feed.get('bozo') and not feed.entries:
+                    self.stderr.write(f"⚠️ {source['name']} feed parse error - skipped: {feed.get('bozo_exception')}")
+                    continue
                 self.stdout.write(f"✅ Got {len(feed.entries)} entries")
 
-                for entry in feed.entries[:5]:  # limit to 5 latest per source
+                for entry in feed.entries[:adapter.max_entries]:  # latest N per source
+                    guid = entry.get('id') or entry.get('link')
+                    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+                    published = datetime(*parsed[:6], tzinfo=dt_timezone.utc) if parsed else None
+                    if watermark.reached(guid, published):
+                        self.stdout.write("  ⏹ Reached entries seen last run")
+                        break
+                    if watermark.seen(guid, published):
+                        continue
+                    watermark.observe(guid, published)
+
                     title = entry.get('title', '').strip()[:200]
                     if not title or BlogPost.objects.filter(title=title, source=source['name']).exists():
                         self.stdout.write(f"  ⚠ Skipped existing post: {title[:50]}...")
                         continue
 
                     content = entry.get('content', [{}])[0].get('value', '') or entry.get('summary', '')
-                    summary = auto_summary(content)
 
                     url = entry.get('link', '').strip()  # optional, store if you add field
 
                     post = BlogPost(
                         title=title or url,
-                        summary=summary,
                         content=content,
                         source=source['name'],
                         category=source['category'],
@@ -117,18 +99,42 @@ class Command(BaseCommand):
                         image_url = entry.enclosures[0].get('href')
 
                     post.featured_image_url = image_url if image_url else None  # store temporarily if needed
-                    post.save()
-                    created_count += 1
-                    self.stdout.write(f"  ➕ Created: {title[:50]}...")
-
-                    if image_url:
-                        download_image_to_post(post, image_url)
+                    pending.append((post, image_url))
 
-                    time.sleep(1)  # prevent overloading servers
+                finished.append((watermark, {
+                    'status': status,
+                    'etag': feed.get('etag'),
+                    'last_modified': feed.get('modified'),
+                }))
 
             except Exception as e:
                 self.stderr.write(f"❌ Error fetching {source['name']}: {e}")
 
+        # --- Batched summarization (cached by content hash) ---
+        stats = SummaryStats()
+        summaries = summarize_texts([post.content for post, _ in pending], batch_size=options['batch_size'], stats=stats)
+        self.stdout.write(f"\n🧠 Summaries: {stats}")
+
+        for (post, image_url), summary in zip(pending, summaries):
+            post.summary = summary
+            post.save()
+            created_count += 1
+            self.stdout.write(f"  ➕ Created: {post.title[:50]}...")
+
+        # --- Parallel image stage (per-host politeness, stored once per content hash) ---
+        if not options['skip_images']:
+            images = download_images(pending, workers=options['image_workers'])
+            self.stdout.write(
+                f"🖼️ Images: {images['downloaded']} downloaded, {images['reused']} reused, {images['failed']} failed"
+            )
+
+        for watermark, validators in finished:
+            watermark.save(**validators)
+
         self.stdout.write(
             self.style.SUCCESS(f'\n🎉 Successfully fetched {created_count} blog posts!')
         )
+
+        # --- Pre-generated sitemaps (only changed parts are rewritten) ---
+        if not options['skip_sitemaps']:
+            call_command('build_sitemaps', stdout=self.stdout)
@@ -1,145 +1,176 @@
-import requests
-from django.core.management.base import BaseCommand
+import time
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from jobs.models import Job
-from jobs.utils import send_job_newsletter
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from datetime import datetime
 from django.utils import timezone
+from jobs.autocomplete import update_snapshot
+from jobs.search import update_speller
+from jobs.ingest import JobIngestor
+from jobs.utils import send_job_newsletter
+from jobs.fetcher import FetchEngine, build_session
+from jobs.feeds import Watermark, conditional_headers, get_state
+from jobs.sources import get_adapters
 import xml.etree.ElementTree as ET
 
 
 class Command(BaseCommand):
-    help = "Fetch latest jobs from multiple job sources and notify subscribers"
+    help = "Fetch latest jobs from the sources that are due and notify subscribers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "FETCH_MAX_WORKERS", 8),
+            help="Maximum number of sources downloaded in parallel",
+        )
+        parser.add_argument(
+            "--per-host",
+            type=int,
+            default=getattr(settings, "FETCH_PER_HOST_LIMIT", 2),
+            help="Maximum concurrent requests to a single host",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=getattr(settings, "FETCH_TIMEOUT", 20),
+            help="Per-source download budget in seconds",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "JOB_INGEST_BATCH_SIZE", 200),
+            help="Number of new jobs inserted per bulk_create",
+        )
+        parser.add_argument(
+            "--source",
+            action="append",
+            dest="sources",
+            help="Only fetch this source (repeatable)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Fetch sources even if their refresh interval hasn't passed",
+        )
+        parser.add_argument(
+            "--skip-newsletter",
+            action="store_true",
+            help="Don't email subscribers about the new jobs",
+        )
+        parser.add_argument(
+            "--skip-sitemaps",
+            action="store_true",
+            help="Don't rebuild the pre-generated sitemap files",
+        )
 
     def handle(self, *args, **options):
-        session = requests.Session()
-        retry = Retry(connect=3, backoff_factor=2)
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-        headers = {'User-Agent': 'Mozilla/5.0'}
-
-        # ✅ Collect newly created jobs for newsletter
-        new_jobs = []
-
-        def make_aware(dt):
-            """Convert naive datetimes to timezone-aware."""
-            if dt is None:
-                return timezone.now()
-            if timezone.is_naive(dt):
-                return timezone.make_aware(dt, timezone=timezone.get_current_timezone())
-            return dt
-
-        def safe_create_job(**kwargs):
-            """Create job if it doesn't exist; return instance if created."""
-            if not Job.objects.filter(title=kwargs['title'], company=kwargs['company']).exists():
-                kwargs['date_posted'] = make_aware(kwargs.get('date_posted'))
-                job_obj = Job.objects.create(**kwargs)
-                new_jobs.append(job_obj)
-                return job_obj
-            return None
-
-        def fetch_rss(url, source, company_default="Unknown", location="Nigeria"):
+        run_started = time.monotonic()
+
+        adapters = get_adapters(kind="jobs", names=options["sources"])
+        if options["sources"] and not adapters:
+            raise CommandError(f"Unknown source(s): {', '.join(options['sources'])}")
+
+        # --- Only sources whose refresh interval has passed ---
+        now = timezone.now()
+        states = {}
+        tasks = []
+        for adapter in adapters:
+            state = get_state(adapter.name)
+            if not options["force"] and not adapter.is_due(state, now):
+                print(f"⏸️ {adapter.name} not due until {state.last_checked + adapter.refresh_interval:%Y-%m-%d %H:%M}")
+                continue
+            states[adapter.name] = state
+            tasks += adapter.tasks(headers=conditional_headers(state), timeout=options["timeout"], state=state)
+
+        if not tasks:
+            print("ℹ️ No sources due, nothing to fetch.")
+            return
+
+        # ✅ Buffered ingest; new_jobs is filled for the newsletter
+        ingestor = JobIngestor(batch_size=options["batch_size"])
+        new_jobs = ingestor.new_jobs
+
+        print(f"Fetching {len(states)} sources ({options['workers']} workers, {options['per_host']} per host)...")
+        session = build_session(pool_size=options["workers"])
+
+        watermarks = {source: Watermark(state) for source, state in states.items()}
+        # source -> {"fetch": s, "write": s, "requests": n, "new": n, "status": str}
+        report = {}
+
+        # --- Single writer stage: results arrive as downloads finish ---
+        engine = FetchEngine(session=session, max_workers=options["workers"], per_host=options["per_host"])
+        for task in tasks:
+            engine.submit(task)
+
+        for result in engine.results():
+            source = result.source
+            adapter = result.task.meta["adapter"]
+            row = report.setdefault(source, {"fetch": 0.0, "write": 0.0, "requests": 0, "new": 0, "status": ""})
+            row["fetch"] += result.elapsed
+            row["requests"] += 1
+            if not result.ok:
+                print(f"❌ Error fetching from {source}: {result.error}")
+                row["status"] = "error"
+                continue
+
+            watermark = watermarks[source]
+            if result.status_code == 304:
+                watermark.save(status=304)
+                print(f"⏭️ {source} not modified since last run.")
+                row["status"] = "not modified"
+                continue
+
+            before = len(new_jobs)
+            write_started = time.monotonic()
             try:
-                response = session.get(url, headers=headers, timeout=20)
-                response.raise_for_status()
-                root = ET.fromstring(response.content)
-
-                for item in root.findall(".//item"):
-                    title = item.findtext("title", default="").strip()
-                    company = item.findtext("author", default=company_default).strip()
-                    description = item.findtext("description", default="")
-                    link = item.findtext("link", default="")
-                    pub_date = item.findtext("pubDate", default=None)
-
-                    try:
-                        date_posted = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %z") if pub_date else timezone.now()
-                    except Exception:
-                        date_posted = timezone.now()
-
-                    safe_create_job(
-                        title=title,
-                        company=company,
-                        location=location,
-                        description=description,
-                        url=link,
-                        source=source,
-                        category="",
-                        date_posted=date_posted
-                    )
-
+                adapter.parse(result, ingestor.add, watermark)
+                for follow_up in adapter.next_tasks(result):
+                    engine.submit(follow_up)
+                ingestor.flush()
+                watermark.save(
+                    status=result.status_code,
+                    etag=result.headers.get("ETag"),
+                    last_modified=result.headers.get("Last-Modified"),
+                )
+                row["new"] += len(new_jobs) - before
+                row["status"] = row["status"] or "ok"
                 print(f"✅ {source} jobs fetched successfully!")
-            except ET.ParseError:
-                print(f"⚠️ {source} RSS parse error - skipped.")
+            except (ET.ParseError, ValueError):
+                row["status"] = "parse error"
+                print(f"⚠️ {source} feed parse error - skipped.")
             except Exception as e:
-                print(f"❌ Error fetching from {source}: {e}")
-
-        # --- REMOTIVE ---
-        print("Fetching from Remotive...")
-        try:
-            response = session.get("https://remotive.com/api/remote-jobs", timeout=20)
-            data = response.json()
-            for job in data.get("jobs", []):
-                pub_date = job.get("publication_date")
-                date_posted = datetime.fromisoformat(pub_date.replace('Z', '+00:00')) if pub_date else timezone.now()
-                safe_create_job(
-                    title=job.get("title"),
-                    company=job.get("company_name"),
-                    location=job.get("candidate_required_location", "Remote"),
-                    description=job.get("description", ""),
-                    url=job.get("url"),
-                    source="Remotive",
-                    category=job.get("category", ""),
-                    date_posted=date_posted
-                )
-            print("✅ Remotive jobs fetched successfully!")
-        except Exception as e:
-            print(f"❌ Remotive error: {e}")
-
-        # --- ADZUNA ---
-        print("Fetching from Adzuna...")
-        try:
-            url = (
-                f"https://api.adzuna.com/v1/api/jobs/gb/search/1?"
-                f"app_id={settings.ADZUNA_APP_ID}&app_key={settings.ADZUNA_APP_KEY}"
-                f"&results_per_page=50&what=remote&where=Nigeria"
-            )
-            response = session.get(url, timeout=20)
-            data = response.json()
-            for job in data.get("results", []):
-                created = job.get("created")
-                date_posted = datetime.strptime(created, "%Y-%m-%dT%H:%M:%SZ") if created else timezone.now()
-                safe_create_job(
-                    title=job.get("title"),
-                    company=job.get("company", {}).get("display_name", "Unknown"),
-                    location=job.get("location", {}).get("display_name", "Nigeria"),
-                    description=job.get("description", ""),
-                    url=job.get("redirect_url"),
-                    source="Adzuna",
-                    category=job.get("category", {}).get("label", ""),
-                    date_posted=date_posted
-                )
-            print("✅ Adzuna jobs fetched successfully!")
-        except Exception as e:
-            print(f"❌ Adzuna error: {e}")
-
-        # --- RSS Sources ---
-        fetch_rss("https://reliefweb.int/jobs/rss.xml?country=175", "ReliefWeb")
-        fetch_rss("http://www.hotnigerianjobs.com/feed/rss.xml", "HotNigerianJobs")
-        fetch_rss("https://ngojobsinafrica.com/job-location/nigeria/feed/", "NGOJobsInAfrica")
-        fetch_rss("https://www.jobzilla.ng/feed/", "Jobzilla")
-        fetch_rss("https://www.careerjet.com.ng/rss/", "Careerjet")
-        fetch_rss("https://unjobs.org/themes/development.rss", "UN Jobs")
-        fetch_rss("https://www.devex.com/jobs/search.rss", "Devex")
-
+                row["status"] = "error"
+                print(f"❌ Error processing {source}: {e}")
+            finally:
+                result.close()
+            row["write"] += time.monotonic() - write_started
+
+        engine.close()
+        ingestor.flush()
+        total = time.monotonic() - run_started
         print("🎯 All job sources processed successfully!")
+        print(f"\n{'Source':<20} {'Fetch':>8} {'Write':>8} {'Reqs':>5} {'New':>5}  Result")
+        for source, row in sorted(report.items(), key=lambda r: -r[1]["fetch"]):
+            print(f"{source:<20} {row['fetch']:>7.2f}s {row['write']:>7.2f}s {row['requests']:>5} {row['new']:>5}  {row['status']}")
+        print(f"{'Total wall time':<20} {total:>7.2f}s")
+        if ingestor.near_duplicates:
+            print(f"🧬 Skipped {ingestor.near_duplicates} near-duplicate postings.")
+
+        # --- Autocomplete snapshot: fold in this run's jobs ---
+        added, indexed = update_snapshot()
+        print(f"🔤 Autocomplete index: {added} new jobs, {indexed} values.")
+        print(f"🔡 Spelling index: {update_speller()} words.")
 
         # --- ✅ SEND NEWSLETTER TO SUBSCRIBERS ---
-        if new_jobs:
+        if options["skip_newsletter"]:
+            print("ℹ️ Newsletter skipped (--skip-newsletter).")
+        elif new_jobs:
             print(f"📬 Sending newsletter for {len(new_jobs)} new jobs...")
             send_job_newsletter(new_jobs)
             print("✅ Newsletter sent successfully!")
         else:
             print("ℹ️ No new jobs, skipping newsletter.")
+
+        # --- Pre-generated sitemaps (only changed parts are rewritten) ---
+        if not options["skip_sitemaps"]:
+            call_command("build_sitemaps")
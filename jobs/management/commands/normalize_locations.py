@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from jobs.gazetteer import get_gazetteer
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Re-resolve Job.location_key from the location gazetteer (run after editing the data file)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--show-unmatched", type=int, default=0, metavar="N",
+                            help="List the N most common locations the gazetteer doesn't recognize")
+
+    def handle(self, *args, **options):
+        gazetteer = get_gazetteer()
+        changed = 0
+        unmatched = []
+        # One UPDATE per distinct location string whose key changed
+        rows = Job.objects.values_list("location", "location_key").distinct().order_by()
+        for location, current in rows:
+            key = gazetteer.resolve(location)
+            if not key and location:
+                unmatched.append(location)
+            if key != current:
+                changed += Job.objects.filter(location=location, location_key=current).update(location_key=key)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Location keys updated for {changed} jobs."))
+        if options["show_unmatched"] and unmatched:
+            counts = Job.objects.filter(location__in=unmatched).values_list("location").annotate(n=Count("id")).order_by("-n")
+            for location, count in counts[:options["show_unmatched"]]:
+                self.stdout.write(f"❓ {count:>6}  {location}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs import prerender
+# Importing the views registers every @prerendered page
+from jobs import views  # noqa: F401
+
+
+class Command(BaseCommand):
+    help = "Render the static informational pages to stored bytes (run on every deploy)"
+
+    def handle(self, *args, **options):
+        failed = 0
+        for name in prerender.PAGES:
+            try:
+                page = prerender.render_page(name)
+            except prerender.RenderError as e:
+                failed += 1
+                self.stderr.write(f"❌ {e}; not stored")
+                continue
+            self.stdout.write(f"📄 {name}: {len(page.content)} bytes, {len(page.compressed)} gzipped, ETag {page.etag}")
+        if failed:
+            raise CommandError(f"{failed} pages did not render.")
+        self.stdout.write(self.style.SUCCESS(f"✅ Prerendered {len(prerender.PAGES)} pages into {prerender.prerender_root()}."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from jobs.autocomplete import snapshot_path, update_snapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuild the autocomplete snapshot from every job (drops values of deleted jobs)"
+
+    def handle(self, *args, **options):
+        added, indexed = update_snapshot(full=True)
+        self.stdout.write(self.style.SUCCESS(f"✅ Autocomplete rebuilt from {added} jobs: {indexed} values in {snapshot_path()}."))
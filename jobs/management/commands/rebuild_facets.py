@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from jobs import prerender
+from jobs.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = "Recount the category and location facet tables from the Job table"
+
+    def handle(self, *args, **options):
+        totals = rebuild_facets()
+        prerender.invalidate(*prerender.FACET_PAGES)
+        summary = ", ".join(f"{count} {name}" for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"✅ Facets rebuilt: {summary}."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from jobs.ingest import fingerprint, index_bands
+from jobs.models import Job, JobMinhashBand
+
+
+class Command(BaseCommand):
+    help = "Recompute canonical URLs and the MinHash band index for existing jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fields = ["id", "title", "company", "location", "description", "url"]
+        total = 0
+
+        JobMinhashBand.objects.all().delete()
+        batch = []
+        for job in Job.objects.only(*fields).order_by("id").iterator(chunk_size=batch_size):
+            batch.append(fingerprint(job))
+            if len(batch) >= batch_size:
+                total += self._save(batch)
+                batch = []
+        if batch:
+            total += self._save(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Fingerprinted {total} jobs."))
+
+    @staticmethod
+    @transaction.atomic
+    def _save(batch):
+        Job.objects.bulk_update(batch, ["canonical_url"])
+        index_bands(batch)
+        return len(batch)
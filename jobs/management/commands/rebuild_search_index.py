@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from jobs.models import Job
+from jobs.search import drop_index, rebuild_index, update_speller
+
+
+class Command(BaseCommand):
+    help = "Create (if missing) and repopulate the full-text index used by job keyword search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recreate", action="store_true", help="Drop the index objects first")
+
+    def handle(self, *args, **options):
+        if options["recreate"]:
+            drop_index()
+        if not rebuild_index():
+            raise CommandError(f"No full-text index support for the {connection.vendor} backend.")
+        self.stdout.write(f"🔡 Spelling index: {update_speller()} words.")
+        self.stdout.write(self.style.SUCCESS(f"✅ Search index rebuilt for {Job.objects.count()} jobs ({connection.vendor})."))
@@ -0,0 +1,104 @@
+import socket
+import threading
+from multiprocessing.connection import AuthenticationError, Listener, answer_challenge, deliver_challenge
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.summarizer import get_pipeline, summarize_locally, worker_address, worker_authkey
+
+# One model call at a time; connections are handled on their own threads
+_model_lock = threading.Lock()
+
+
+def _hang_up(conn):
+    """Wake a thread blocked reading `conn` by shutting the socket down."""
+    try:
+        with socket.socket(fileno=socket.dup(conn.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class Command(BaseCommand):
+    help = "Keep the BART summarizer loaded and serve fetch_job_news over a local socket"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            default="127.0.0.1",
+            help="Interface to listen on (the port comes from SUMMARIZER_WORKER_ADDRESS)",
+        )
+        parser.add_argument(
+            "--idle-timeout",
+            type=float,
+            default=getattr(settings, "SUMMARIZER_WORKER_IDLE_TIMEOUT", 30),
+            help="Seconds a client gets to authenticate and send its request",
+        )
+        parser.add_argument(
+            "--max-clients",
+            type=int,
+            default=getattr(settings, "SUMMARIZER_WORKER_MAX_CLIENTS", 8),
+            help="Connections served at once; extra ones are closed",
+        )
+
+    def handle(self, *args, **options):
+        address = worker_address()
+        if not address:
+            raise CommandError("Set SUMMARIZER_WORKER_ADDRESS (e.g. ('127.0.0.1', 6011)) to run the worker.")
+        authkey = worker_authkey()
+        if not authkey:
+            # Requests are unpickled, so anyone who can authenticate can run code here
+            raise CommandError("Set the SUMMARIZER_WORKER_AUTHKEY environment variable to a long random secret.")
+        if isinstance(address, (tuple, list)):
+            address = (options["host"], address[1])
+
+        # Load once up front so the first client doesn't pay for it
+        if get_pipeline() is None:
+            self.stderr.write("⚠️ Model unavailable; the worker will answer with truncated text.")
+
+        slots = threading.BoundedSemaphore(options["max_clients"])
+        # No authkey here: Listener.accept() would run the handshake on this thread,
+        # where one silent client blocks everyone. serve() does it instead.
+        with Listener(address) as listener:
+            self.stdout.write(self.style.SUCCESS(f"✅ Summarizer worker listening on {address}"))
+            while True:
+                try:
+                    conn = listener.accept()
+                except OSError as e:
+                    self.stderr.write(f"❌ Accept failed: {e}")
+                    continue
+                if not slots.acquire(blocking=False):
+                    self.stderr.write("⚠️ Too many clients; connection closed.")
+                    conn.close()
+                    continue
+                threading.Thread(
+                    target=self.serve, args=(conn, authkey, options["idle_timeout"], slots), daemon=True,
+                ).start()
+
+    def serve(self, conn, authkey, idle_timeout, slots):
+        # Covers the handshake and the request; cancelled once the request is in
+        watchdog = threading.Timer(idle_timeout, _hang_up, [conn])
+        watchdog.start()
+        try:
+            with conn:
+                deliver_challenge(conn, authkey)
+                answer_challenge(conn, authkey)
+                if not conn.poll(idle_timeout):
+                    self.stderr.write(f"⚠️ Client sent nothing for {idle_timeout}s; closed.")
+                    return
+                command, payload = conn.recv()
+                watchdog.cancel()
+                if command == "summarize":
+                    texts, batch_size = payload
+                    with _model_lock:
+                        summaries = summarize_locally(texts, batch_size=batch_size)
+                    conn.send(summaries)
+                else:
+                    conn.send(None)
+        except AuthenticationError as e:
+            self.stderr.write(f"❌ Rejected connection: {e}")
+        except (EOFError, OSError) as e:
+            self.stderr.write(f"⚠️ Client went away: {e}")
+        finally:
+            watchdog.cancel()
+            slots.release()
@@ -10,7 +10,9 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         now = timezone.now()
         since = now - timedelta(hours=24)
-        new_jobs = Job.objects.filter(date_posted__gte=since).order_by('-date_posted')
+        # Jobs added in the last day, whatever their source's own posting date: feeds
+        # often carry an older pubDate, and fetch_jobs no longer emails per run
+        new_jobs = Job.objects.filter(created_at__gte=since).order_by('-created_at')
 
         if new_jobs.exists():
             self.stdout.write(f"📨 Sending newsletter for {new_jobs.count()} new jobs...")
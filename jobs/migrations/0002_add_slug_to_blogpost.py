@@ -7,9 +7,9 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.AddField(
+        migrations.SeparateDatabaseAndState(state_operations=[migrations.AddField(
             model_name='blogpost',
             name='slug',
             field=models.SlugField(max_length=200, unique=False, blank=True, null=True),
-        ),
+        )]),
     ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:33
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_dedup_keys(apps, schema_editor):
+    """Key existing rows; later duplicates of a (title, company) pair stay NULL."""
+    Job = apps.get_model("jobs", "Job")
+    seen = set()
+    batch = []
+    for job in Job.objects.order_by("id").only("id", "title", "company").iterator():
+        raw = f"{(job.title or '').strip().lower()}\x1f{(job.company or '').strip().lower()}"
+        key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        if key in seen:
+            continue
+        seen.add(key)
+        job.dedup_key = key
+        batch.append(job)
+        if len(batch) >= 500:
+            Job.objects.bulk_update(batch, ["dedup_key"])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ["dedup_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_blogpost_category_blogpost_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='dedup_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_dedup_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_feedstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='canonical_url',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=500, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobMinhashBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('value', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='minhash_bands', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'value'], name='jobs_minhash_band_idx')],
+            },
+        ),
+    ]
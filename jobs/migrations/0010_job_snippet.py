@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_near_duplicate_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='snippet',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+    ]
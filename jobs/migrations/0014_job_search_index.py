@@ -0,0 +1,71 @@
+from django.db import OperationalError, migrations
+
+# The full-text index as of this migration; jobs/search.py holds the current definition
+SQLITE_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5(
+        title, description,
+        content='jobs_job', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ai AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ad AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_au AFTER UPDATE OF title, description ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO jobs_job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO jobs_job_fts(jobs_job_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS jobs_job_fts_ai",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_ad",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_au",
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+POSTGRES_SCHEMA = [
+    """ALTER TABLE jobs_job ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS jobs_job_search_idx ON jobs_job USING GIN (search_vector)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS jobs_job_search_idx",
+    "ALTER TABLE jobs_job DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 table + triggers (SQLite) or tsvector column + GIN index (Postgres),
+    # indexing the jobs already in the table
+    connection = schema_editor.connection
+    statements = {'sqlite': SQLITE_SCHEMA, 'postgresql': POSTGRES_SCHEMA}.get(connection.vendor, [])
+    try:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    except OperationalError as e:
+        # e.g. "no such module: fts5"; search falls back to icontains
+        print(f"⚠️ Full-text index not created: {e}")
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(connection.vendor, []):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_blogpost_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
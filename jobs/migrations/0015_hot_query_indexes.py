@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+# Listing order is `date_posted DESC NULLS LAST`. Postgres puts NULLs first in a
+# DESC index, so it gets matching indexes; SQLite's DESC already sorts NULLs last
+# (and rejects NULLS LAST in CREATE INDEX), so the Meta indexes cover it there.
+POSTGRES_LISTING_INDEXES = [
+    ("job_home_listing_pg_idx", "is_paid DESC, date_posted DESC NULLS LAST, id DESC"),
+    ("job_date_listing_pg_idx", "date_posted DESC NULLS LAST, id DESC"),
+]
+
+
+def create_postgres_listing_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, columns in POSTGRES_LISTING_INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON jobs_job ({columns})")
+
+
+def drop_postgres_listing_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in POSTGRES_LISTING_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['title', 'source'], name='blogpost_title_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-date_posted'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-is_paid', '-date_posted', '-id'], name='job_home_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-date_posted', '-id'], name='job_date_listing_idx'),
+        ),
+        migrations.RunPython(create_postgres_listing_indexes, drop_postgres_listing_indexes),
+    ]
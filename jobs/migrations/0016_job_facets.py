@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:49
+
+import re
+
+from django.db import migrations, models
+from django.db.models import Count
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def display_name(value):
+    return _SPACE_RE.sub(' ', value or '').strip()[:200]
+
+
+def facet_key(value):
+    return display_name(value).casefold()
+
+
+def backfill_facets(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    for model_name, field in (('JobCategory', 'category'), ('JobLocation', 'location')):
+        model = apps.get_model('jobs', model_name)
+        facets = {}
+        for value, count in Job.objects.values_list(field).annotate(n=Count('id')).order_by():
+            key = facet_key(value)
+            if key:
+                name, total = facets.get(key, (display_name(value), 0))
+                facets[key] = (name, total + count)
+        model.objects.bulk_create([model(key=key, name=name, job_count=n) for key, (name, n) in facets.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Job categories',
+                'ordering': ['-job_count', 'name'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['-job_count', 'name'], name='jobcategory_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobLocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-job_count', 'name'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['-job_count', 'name'], name='joblocation_count_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def create_vocabulary(apps, schema_editor):
+    # Read-only view of the index's terms and document counts, for spelling suggestions
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or 'jobs_job_fts' not in connection.introspection.table_names():
+        return
+    schema_editor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts_vocab USING fts5vocab(jobs_job_fts, 'row')")
+
+
+def drop_vocabulary(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS jobs_job_fts_vocab')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_job_facets'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_vocabulary, drop_vocabulary),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:03
+
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations, models
+
+REMOTE = 'remote'
+_NON_WORD_RE = re.compile(r'[^\w]+', re.UNICODE)
+
+# The full-text sync triggers as of this migration (see 0014)
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ai AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ad AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_au AFTER UPDATE OF title, description ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO jobs_job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def normalize(text):
+    return ' '.join(_NON_WORD_RE.sub(' ', (text or '').casefold()).replace('_', ' ').split())
+
+
+def ancestors(place_id):
+    out = []
+    while place_id:
+        out.append(place_id)
+        place_id = place_id.rpartition('/')[0]
+    return out
+
+
+def load_aliases():
+    """{normalized alias: place id} from the gazetteer, as jobs/gazetteer.py read it at this migration."""
+    path = getattr(settings, 'LOCATION_GAZETTEER', Path(__file__).resolve().parent.parent / 'data' / 'locations.json')
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    aliases = {}
+    for place in data['places']:
+        for alias in [place['name'], *place.get('aliases', [])]:
+            aliases.setdefault(normalize(alias), place['id'])
+    for alias in data.get('remote_aliases', ()):
+        aliases[normalize(alias)] = REMOTE
+    return aliases
+
+
+def resolve(text, aliases, max_words):
+    """The most specific place id `text` names, or "" (see Gazetteer.resolve)."""
+    words = normalize(text).split()
+    found = []
+    used = [False] * len(words)
+    for size in range(min(max_words, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            if any(used[start:start + size]):
+                continue
+            place_id = aliases.get(' '.join(words[start:start + size]))
+            if place_id:
+                found.append((start, place_id))
+                used[start:start + size] = [True] * size
+    found = [place_id for _, place_id in sorted(found)]
+    places = [place_id for place_id in found if place_id != REMOTE]
+    place = ''
+    if places:
+        deepest = max(places, key=lambda place_id: place_id.count('/'))
+        chain = set(ancestors(deepest))
+        if all(place_id in chain for place_id in places):
+            place = deepest
+        else:
+            # "Lagos or Abuja" -> Nigeria; places in different continents -> nothing
+            common = set(ancestors(places[0]))
+            for place_id in places[1:]:
+                common &= set(ancestors(place_id))
+            place = max(common, key=lambda place_id: place_id.count('/'), default='')
+    if REMOTE in found:
+        return f"{REMOTE}/{'/'.join(place.split('/')[:2])}" if place else REMOTE
+    return place
+
+
+def backfill_location_keys(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    aliases = load_aliases()
+    max_words = max((len(alias.split()) for alias in aliases), default=1)
+    # One UPDATE per distinct location string
+    for location in Job.objects.values_list('location', flat=True).distinct().order_by():
+        key = resolve(location, aliases, max_words)
+        if key:
+            Job.objects.filter(location=location).update(location_key=key)
+
+
+def restore_search_index(apps, schema_editor):
+    # On SQLite, AddField rebuilds jobs_job and drops the FTS triggers from 0014;
+    # recreate them and re-index the rows
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or 'jobs_job_fts' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+        cursor.execute("INSERT INTO jobs_job_fts(jobs_job_fts) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_job_search_vocabulary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='location_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['location_key', '-date_posted', '-id'], name='job_location_listing_idx'),
+        ),
+        migrations.RunPython(backfill_location_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_job_location_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedstate',
+            name='last_published_guids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_feedstate_last_published_guids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedstate',
+            name='resume_page',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feedstate',
+            name='resume_published',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+import json
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+REMOTE = 'remote'
+
+
+def containing_places(place_id):
+    """The place, every place containing it and, for remote ids, "remote" (as of this migration)."""
+    remote = place_id.startswith(f'{REMOTE}/')
+    place = place_id[len(REMOTE) + 1:] if remote else place_id
+    out = [place_id] if remote else []
+    while place:
+        out.append(place)
+        place = place.rpartition('/')[0]
+    return out + [REMOTE] if remote else out
+
+
+def place_names():
+    path = getattr(settings, 'LOCATION_GAZETTEER', Path(__file__).resolve().parent.parent / 'data' / 'locations.json')
+    with open(path, encoding='utf-8') as f:
+        names = {place['id']: place['name'] for place in json.load(f)['places']}
+    names[REMOTE] = 'Remote'
+    for place_id in list(names):
+        if place_id != REMOTE and place_id.count('/') <= 1:
+            names[f'{REMOTE}/{place_id}'] = f'Remote ({names[place_id]})'
+    return names
+
+
+def recount_locations(apps, schema_editor):
+    """Re-key JobLocation on Job.location_key: each job counts toward its place and the places containing it."""
+    Job = apps.get_model('jobs', 'Job')
+    JobLocation = apps.get_model('jobs', 'JobLocation')
+    names = place_names()
+    counts = Counter()
+    display = {}
+    rows = Job.objects.values_list('location', 'location_key').annotate(n=Count('id')).order_by()
+    for location, location_key, n in rows:
+        if location_key:
+            facets = [(place_id, names.get(place_id, place_id)) for place_id in containing_places(location_key)]
+        else:
+            name = ' '.join((location or '').split())[:200]
+            facets = [(name.casefold(), name)] if name else []
+        for key, name in facets:
+            counts[key] += n
+            display.setdefault(key, name)
+    JobLocation.objects.all().delete()
+    JobLocation.objects.bulk_create([JobLocation(key=key, name=display[key], job_count=n) for key, n in counts.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_job_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+# The full-text sync triggers as of this migration (see 0014)
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ai AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ad AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_job_fts_au AFTER UPDATE OF title, description ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO jobs_job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    # On SQLite, AlterField rebuilds jobs_job and drops the FTS triggers
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or 'jobs_job_fts' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+
+
+def mark_unprocessed(apps, schema_editor):
+    # Empty snippets predate the field or were never computed; the backfill picks up NULLs
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.filter(snippet='').update(snippet=None)
+
+
+def unmark_unprocessed(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.filter(snippet__isnull=True).update(snippet='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0022_location_facets_by_place'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='snippet',
+            field=models.CharField(blank=True, editable=False, max_length=500, null=True),
+        ),
+        migrations.RunPython(restore_search_triggers, restore_search_triggers),
+        migrations.RunPython(mark_unprocessed, unmark_unprocessed),
+    ]
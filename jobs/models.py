@@ -1,10 +1,18 @@
 # jobs/models.py
 
+import hashlib
+
 from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 from django.contrib.auth.models import User
 
+from .dedup import canonicalize_url
+from .derivatives import refresh_variants
+from .gazetteer import resolve as resolve_location
+from .pagecache import invalidate as invalidate_pages
+from .text import make_snippet
+
 
 class Subscriber(models.Model):
     email = models.EmailField(unique=True)
@@ -37,12 +45,137 @@ class Job(models.Model):
         help_text="Paystack transaction reference (e.g., 123_job)"
     )
 
+    # Hash of normalized (title, company); unique so concurrent fetch runs can't double-insert
+    dedup_key = models.CharField(max_length=64, unique=True, blank=True, null=True, editable=False)
+    # Plain-text preview for list pages, derived from `description` on save/ingest;
+    # NULL until computed (see backfill_job_snippets)
+    snippet = models.CharField(max_length=500, blank=True, null=True, editable=False)
+    # Near-duplicate detection (see jobs/dedup.py)
+    canonical_url = models.CharField(max_length=500, blank=True, null=True, db_index=True, editable=False)
+    # Gazetteer id for `location`, e.g. "af/ng/la/ikeja" (see jobs/gazetteer.py); "" if unrecognized
+    location_key = models.CharField(max_length=100, blank=True, default='', editable=False)
+
+    @staticmethod
+    def make_dedup_key(title, company):
+        """Stable key for the (title, company) pair used to skip duplicate postings."""
+        raw = f"{(title or '').strip().lower()}\x1f{(company or '').strip().lower()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
     def __str__(self):
         return f"{self.title} at {self.company or 'Unknown'}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            # Jobs from submit_job / the admin get the keys the feed ingestor sets, so
+            # later feed runs see them; a key another row already holds is left empty
+            if not self.dedup_key:
+                key = Job.make_dedup_key(self.title, self.company)
+                if not Job.objects.filter(dedup_key=key).exclude(pk=self.pk).exists():
+                    self.dedup_key = key
+            if not self.canonical_url:
+                self.canonical_url = canonicalize_url(self.url)
+        if update_fields is None or 'description' in update_fields:
+            self.snippet = make_snippet(self.description)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'snippet'}
+        if update_fields is None or 'location' in update_fields:
+            self.location_key = resolve_location(self.location)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'location_key'}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse('job_detail', kwargs={'job_id': self.id})
 
+    class Meta:
+        # Keyset pagination keys of home / job_list (see views.HOME_ORDERING) and the
+        # newsletter's created_at range; `manage.py audit_query_plans` checks they're used
+        indexes = [
+            models.Index(fields=['-is_paid', '-date_posted', '-id'], name='job_home_listing_idx'),
+            models.Index(fields=['-date_posted', '-id'], name='job_date_listing_idx'),
+            models.Index(fields=['-created_at'], name='job_created_idx'),
+            # Location filter: location_key IN (place and its descendants)
+            models.Index(fields=['location_key', '-date_posted', '-id'], name='job_location_listing_idx'),
+        ]
+
+class Facet(models.Model):
+    """A distinct Job.category / Job.location value and how many jobs use it (see jobs/facets.py)."""
+    key = models.CharField(max_length=200, unique=True)  # gazetteer place id, else casefolded text
+    name = models.CharField(max_length=200)              # display form, as first seen
+    job_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ['-job_count', 'name']
+
+    def __str__(self):
+        return self.name
+
+
+class JobCategory(Facet):
+    class Meta(Facet.Meta):
+        verbose_name_plural = 'Job categories'
+        indexes = [models.Index(fields=['-job_count', 'name'], name='jobcategory_count_idx')]
+
+
+class JobLocation(Facet):
+    class Meta(Facet.Meta):
+        indexes = [models.Index(fields=['-job_count', 'name'], name='joblocation_count_idx')]
+
+
+class JobMinhashBand(models.Model):
+    """One LSH band of a Job's MinHash signature; indexed so near-duplicate lookups stay sub-linear."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='minhash_bands')
+    band = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['band', 'value'], name='jobs_minhash_band_idx')]
+
+
+class StoredImage(models.Model):
+    """Content-addressed index of downloaded images, so a picture shared by several posts is stored once."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    path = models.CharField(max_length=255)
+    source_url = models.URLField(max_length=1000, blank=True, null=True, db_index=True)
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.path
+
+
+class SummaryCache(models.Model):
+    """BART summaries keyed by a hash of the normalized input text (LRU-trimmed, see jobs/summarizer.py)."""
+    text_hash = models.CharField(max_length=64, unique=True)
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.text_hash
+
+
+class FeedState(models.Model):
+    """Per-source HTTP validators and newest-entry watermark for feed ingestion."""
+    source = models.CharField(max_length=100, unique=True)
+    etag = models.CharField(max_length=255, blank=True, null=True)
+    last_modified = models.CharField(max_length=100, blank=True, null=True)
+    last_guid = models.CharField(max_length=500, blank=True, null=True)
+    last_published = models.DateTimeField(blank=True, null=True)
+    # GUIDs/links of the entries published exactly at last_published, skipped next run
+    last_published_guids = models.JSONField(default=list, blank=True)
+    # Multi-page sources whose last run stopped short of last_published: the page the
+    # next run starts from and the newest entry ingested so far
+    resume_page = models.PositiveIntegerField(blank=True, null=True)
+    resume_published = models.DateTimeField(blank=True, null=True)
+    last_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    last_checked = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.source
+
 # jobs/models.py
 
 class BlogPost(models.Model):
@@ -75,6 +208,8 @@ class BlogPost(models.Model):
         blank=True,
         null=True
     )
+    # Resized WebP/JPEG copies of featured_image, see jobs/derivatives.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     meta_description = models.CharField(
         max_length=160,
@@ -131,6 +266,12 @@ class BlogPost(models.Model):
         
         super().save(*args, **kwargs)
 
+        # Uploaded files are only in storage after save(), so variants come last. They
+        # are written with update(), after post_save cleared the cached pages, so a
+        # request in between may have cached the page without them: clear it again.
+        if refresh_variants(self):
+            invalidate_pages("blogs", f"blog:{self.slug}")
+
     def get_absolute_url(self):
         return reverse('blog_detail', kwargs={'slug': self.slug})
 
@@ -140,4 +281,11 @@ class BlogPost(models.Model):
     class Meta:
         ordering = ['-date_posted']
         verbose_name = 'Blog Post'
-        verbose_name_plural = 'Blog Posts'
\ No newline at end of file
+        verbose_name_plural = 'Blog Posts'
+        indexes = [
+            # fetch_job_news "already imported?" check (title alone serves utils' topic check)
+            models.Index(fields=['title', 'source'], name='blogpost_title_source_idx'),
+            # Partial: SQLite renders is_published=True as a bare `WHERE is_published`, which a
+            # composite (is_published, date_posted) index can't match as an equality
+            models.Index(fields=['-date_posted'], condition=models.Q(is_published=True), name='blogpost_published_idx'),
+        ]
\ No newline at end of file
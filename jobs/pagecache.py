@@ -0,0 +1,141 @@
+# jobs/pagecache.py
+"""
+Whole-response cache for the anonymous listing and detail pages.
+
+`cached_page("jobs")` caches a view's HTML per host + path + normalized query
+string (sorted, blank and tracking parameters dropped). Each entry is tied to
+one or more invalidation groups ("jobs", "job:<id>", "blogs", "blog:<slug>");
+`invalidate()` bumps a group's generation, which changes the keys of every
+page in it. Generations live in their own cache (counter_cache()), out of
+reach of the page cache's culling. Job/BlogPost signals and JobIngestor call it (jobs/signals.py).
+
+Per-visitor fragments are kept out of the cache:
+- the CSRF token is stored as a placeholder and replaced with the visitor's
+  own token on every hit;
+- requests from logged-in users or with pending flash messages, non-GET
+  requests and responses that set cookies bypass the cache entirely.
+"""
+import hashlib
+import re
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import InvalidCacheBackendError, caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+CSRF_PLACEHOLDER = "__workbank_csrf_token__"
+TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def page_cache():
+    try:
+        return caches[getattr(settings, "PAGE_CACHE_ALIAS", "pages")]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def counter_cache():
+    """Where invalidation counters live: a cache that holds nothing else, so none is evicted."""
+    try:
+        return caches[getattr(settings, "COUNTER_CACHE_ALIAS", "counters")]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def _generation_key(group):
+    return f"pagecache:gen:{group}"
+
+
+def invalidate(*groups):
+    """Drop every cached page in `groups` (their old keys simply expire)."""
+    cache = counter_cache()
+    for group in groups:
+        key = _generation_key(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def normalized_query(request):
+    params = sorted(
+        (name, value.strip())
+        for name, values in request.GET.lists()
+        for value in values
+        if value.strip() and not name.startswith("utm_") and name not in TRACKING_PARAMS
+    )
+    return urlencode(params)
+
+
+def page_key(request, groups):
+    generations = counter_cache().get_many([_generation_key(group) for group in groups])
+    version = ".".join(str(generations.get(_generation_key(group), 0)) for group in groups)
+    # Host and scheme matter: templates render absolute canonical URLs
+    raw = f"{request.scheme}://{request.get_host()}{request.path}?{normalized_query(request)}"
+    return f"pagecache:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}:{version}"
+
+
+def _cacheable_request(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return False
+    # A flash message waiting to be shown must be rendered live
+    return not (hasattr(request, "_messages") and len(get_messages(request)))
+
+
+def _entry_for(request, response):
+    """Cache entry for a fresh response, or None if it mustn't be shared."""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return None
+    content = response.content.decode(response.charset)
+    csrf = bool(request.META.get("CSRF_COOKIE_NEEDS_UPDATE"))
+    if csrf:
+        # The token is rendered once per response, so every occurrence is the same string
+        match = CSRF_INPUT_RE.search(content)
+        if not match:
+            return None
+        content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+    return {"content": content, "content_type": response["Content-Type"], "csrf": csrf}
+
+
+def _response_for(request, entry):
+    content = entry["content"]
+    if entry["csrf"]:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    return HttpResponse(content, content_type=entry["content_type"])
+
+
+def cached_page(*groups):
+    """
+    Cache a view's response; `groups` may use the view's URL kwargs,
+    e.g. cached_page("job:{job_id}").
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            cache = page_cache()
+            key = page_key(request, [group.format(**kwargs) for group in groups])
+            entry = cache.get(key)
+            if entry is not None:
+                response = _response_for(request, entry)
+                response["X-Page-Cache"] = "hit"
+                return response
+
+            response = view(request, *args, **kwargs)
+            entry = _entry_for(request, response)
+            if entry is not None:
+                cache.set(key, entry, getattr(settings, "PAGE_CACHE_SECONDS", 3600))
+                response["X-Page-Cache"] = "miss"
+            return response
+        return wrapper
+    return decorator
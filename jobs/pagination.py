@@ -0,0 +1,186 @@
+# jobs/pagination.py
+"""
+Pagination without COUNT(*) or OFFSET for the job listings.
+
+KeysetPaginator orders by a fixed key (e.g. -is_paid, -date_posted, -id; the
+last column must be unique) and seeks past the boundary row of the previous
+page with a WHERE clause, so page 500 costs the same as page 1. Cursors are
+signed, opaque tokens holding that row's key values.
+
+CachedCountPaginator is the classic numbered Paginator with its COUNT(*)
+cached, for pages that really show "Page X of Y".
+"""
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import F, Q
+
+CURSOR_SALT = "jobs.pagination.cursor"
+
+
+def encode_cursor(values):
+    return signing.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(token, size):
+    """Key values from a cursor, or None if it is missing, tampered with or malformed."""
+    if not token:
+        return None
+    try:
+        values = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator; iterates like a Paginator page."""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_query = ""
+        self.previous_query = ""
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    `ordering` is a sequence like ("-is_paid", "-date_posted", "-id"). NULLs
+    sort after every value in both directions of travel, matching
+    `F(...).desc(nulls_last=True)`.
+    """
+
+    def __init__(self, queryset, ordering, per_page=10):
+        self.queryset = queryset
+        self.keys = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+        self.per_page = per_page
+
+    def order_by(self, reverse=False):
+        out = []
+        for field, descending in self.keys:
+            if descending != reverse:
+                out.append(F(field).desc(nulls_last=not reverse))
+            else:
+                out.append(F(field).asc(nulls_first=reverse))
+        return out
+
+    def _beyond(self, field, descending, value, reverse):
+        """Rows strictly after `value` in the direction of travel."""
+        if reverse:
+            if value is None:
+                return Q(**{f"{field}__isnull": False})
+            return Q(**{f"{field}__gt" if descending else f"{field}__lt": value})
+        if value is None:
+            return None  # NULLs come last, nothing is beyond them
+        return Q(**{f"{field}__lt" if descending else f"{field}__gt": value}) | Q(**{f"{field}__isnull": True})
+
+    def _seek(self, values, reverse=False):
+        """(k1 beyond v1) OR (k1 = v1 AND k2 beyond v2) OR ..."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(self.keys, values):
+            beyond = self._beyond(field, descending, value, reverse)
+            if beyond is not None:
+                condition |= equal & beyond
+            equal &= Q(**{f"{field}__isnull": True}) if value is None else Q(**{field: value})
+        return condition
+
+    def _key(self, obj):
+        # Model instances or .values() dicts
+        if isinstance(obj, dict):
+            return [obj[field] for field, _ in self.keys]
+        return [getattr(obj, field) for field, _ in self.keys]
+
+    def cursor_for(self, obj):
+        return encode_cursor(self._key(obj))
+
+    def make_page(self, rows, has_next, has_previous):
+        return KeysetPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self.cursor_for(rows[-1]) if rows else None,
+            previous_cursor=self.cursor_for(rows[0]) if rows else None,
+        )
+
+    def window(self, values=None, reverse=False):
+        """The per_page + 1 rows after (or, reversed, before) the row with key `values`."""
+        queryset = self.queryset
+        if values:
+            queryset = queryset.filter(self._seek(values, reverse=reverse))
+        return queryset.order_by(*self.order_by(reverse=reverse))[:self.per_page + 1]
+
+    def page(self, after=None, before=None):
+        size = len(self.keys)
+        after_values = decode_cursor(after, size)
+        before_values = None if after_values else decode_cursor(before, size)
+
+        if before_values:
+            rows = list(self.window(before_values, reverse=True))
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            rows = list(self.window(after_values))
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = after_values is not None
+
+        return self.make_page(rows, has_next, has_previous)
+
+
+def paginate_keyset(request, queryset, ordering, per_page=10):
+    """Keyset page for `?after=` / `?before=`, with query strings for its Next/Previous links."""
+    page = KeysetPaginator(queryset, ordering, per_page).page(
+        after=request.GET.get("after"), before=request.GET.get("before")
+    )
+    return add_link_queries(request, page)
+
+
+def add_link_queries(request, page):
+    """Set page.next_query / previous_query: the current query string with the cursor swapped."""
+    for attr, param, cursor in (("next_query", "after", page.next_cursor), ("previous_query", "before", page.previous_cursor)):
+        params = request.GET.copy()
+        for key in ("after", "before", "page"):
+            params.pop(key, None)
+        params[param] = cursor or ""
+        setattr(page, attr, params.urlencode())
+    return page
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose COUNT(*) is cached per query for PAGINATION_COUNT_CACHE_SECONDS."""
+
+    @property
+    def count(self):
+        if not hasattr(self, "_cached_count"):
+            sql, params = self.object_list.query.sql_with_params()
+            key = "paginator-count:" + hashlib.sha256(f"{sql}|{params}".encode("utf-8")).hexdigest()
+            timeout = getattr(settings, "PAGINATION_COUNT_CACHE_SECONDS", 300)
+            self._cached_count = cache.get_or_set(key, self.object_list.count, timeout)
+        return self._cached_count
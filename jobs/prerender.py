@@ -0,0 +1,212 @@
+# jobs/prerender.py
+"""
+Prerendered informational pages (about, privacy, terms, ...).
+
+These pages only change on deploy (templates) or, for categories/locations,
+when facet counts move. `@prerendered("about")` registers a view whose output
+is rendered once into PRERENDER_ROOT as `about.html` plus `about.html.gz`;
+later requests are answered from those bytes with a strong ETag and a 304 for
+a matching If-None-Match, without touching the template engine.
+
+`manage.py prerender_pages` renders every page (run it on deploy);
+`invalidate()` deletes a page's files and the next request renders it again.
+Only a 200 is stored: if the view answers anything else, the request gets the
+live view and the next one tries again.
+
+The stored bytes are identical for every visitor, so the CSRF input is left
+empty (marked data-csrf-cookie) and base.html fills it from the csrftoken
+cookie, which the view makes sure is set. Requests with pending flash
+messages or from logged-in users get the live view.
+"""
+import gzip
+import hashlib
+import io
+import os
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import get_messages
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponse
+from django.http.request import split_domain_port, validate_host
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from .pagecache import CSRF_INPUT_RE
+
+PAGES = {}
+# Pages listing facet counts; re-rendered whenever jobs come and go
+FACET_PAGES = ("categories", "locations")
+CONTENT_TYPE = "text/html; charset=utf-8"
+
+_loaded = {}
+
+
+class RenderError(Exception):
+    """The view answered with something other than a 200; nothing was stored."""
+
+
+class PrerenderedPage:
+    def __init__(self, content, compressed):
+        self.content = content
+        self.compressed = compressed
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+def prerender_root():
+    return str(getattr(settings, "PRERENDER_ROOT", settings.BASE_DIR / ".cache" / "prerendered"))
+
+
+def _path(name, suffix=""):
+    return os.path.join(prerender_root(), f"{name}.html{suffix}")
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render_request(name):
+    """A bare anonymous GET for the page, on the site's public host."""
+    base_url = getattr(settings, "PRERENDER_BASE_URL", f"https://{settings.ALLOWED_HOSTS[0]}")
+    scheme, _, host = base_url.partition("://")
+    domain, port = split_domain_port(host)
+    # request.get_host() would reject it and the page would render as a 400
+    if not validate_host(domain, settings.ALLOWED_HOSTS):
+        raise ImproperlyConfigured(f"PRERENDER_BASE_URL host {host!r} is not in ALLOWED_HOSTS.")
+    request = WSGIRequest({
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": reverse(name),
+        "SCRIPT_NAME": "",
+        "HTTP_HOST": host,
+        "SERVER_NAME": domain,
+        "SERVER_PORT": port or ("443" if scheme == "https" else "80"),
+        "wsgi.url_scheme": scheme,
+        "wsgi.input": io.BytesIO(),
+    })
+    request.user = AnonymousUser()
+    return request
+
+
+def render_page(name):
+    """
+    Render `name` through its view and store the result; returns the
+    PrerenderedPage. Raises RenderError, storing nothing, unless the view
+    answers 200.
+    """
+    response = PAGES[name](_render_request(name))
+    if response.status_code != 200:
+        raise RenderError(f"{name} rendered with status {response.status_code}")
+    content = CSRF_INPUT_RE.sub('name="csrfmiddlewaretoken" value="" data-csrf-cookie', response.content.decode(response.charset))
+    page = PrerenderedPage(content.encode("utf-8"), gzip.compress(content.encode("utf-8"), compresslevel=9, mtime=0))
+    os.makedirs(prerender_root(), exist_ok=True)
+    # The .gz goes first: the .html file's presence and mtime mark a complete page
+    _write(_path(name, ".gz"), page.compressed)
+    _write(_path(name), page.content)
+    _loaded.pop(name, None)
+    return page
+
+
+def invalidate(*names):
+    for name in names:
+        for suffix in ("", ".gz"):
+            try:
+                os.remove(_path(name, suffix))
+            except FileNotFoundError:
+                pass
+        _loaded.pop(name, None)
+
+
+def load_page(name):
+    """The stored page (re-read only when its file changed), rendering it if missing."""
+    try:
+        mtime = os.stat(_path(name)).st_mtime_ns
+    except FileNotFoundError:
+        return render_page(name)
+    cached = _loaded.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(_path(name), "rb") as f:
+            content = f.read()
+        with open(_path(name, ".gz"), "rb") as f:
+            compressed = f.read()
+    except FileNotFoundError:
+        return render_page(name)
+    page = PrerenderedPage(content, compressed)
+    _loaded[name] = (mtime, page)
+    return page
+
+
+def _live_request(request):
+    if request.method not in ("GET", "HEAD"):
+        return True
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return True
+    return hasattr(request, "_messages") and len(get_messages(request))
+
+
+def accepts_gzip(request):
+    """Whether Accept-Encoding allows gzip, honouring q-values ("gzip;q=0" refuses it)."""
+    qualities = {}
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def serve(request, page):
+    gzipped = accepts_gzip(request)
+    etag = page.gzip_etag if gzipped else page.etag
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(page.compressed if gzipped else page.content, content_type=CONTENT_TYPE)
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+    response["ETag"] = etag
+    # On the 304 too: caches must not answer another encoding's request with it
+    patch_vary_headers(response, ("Accept-Encoding",))
+    response["Cache-Control"] = "no-cache"
+    # The page's forms read their CSRF token from the cookie
+    if settings.CSRF_COOKIE_NAME not in request.COOKIES:
+        get_token(request)
+    return response
+
+
+def prerendered(name):
+    """Serve the view registered as URL `name` from its prerendered bytes."""
+    def decorator(view):
+        PAGES[name] = view
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if _live_request(request):
+                return view(request, *args, **kwargs)
+            try:
+                page = load_page(name)
+            except RenderError:
+                # Let the live view answer; its error is not kept
+                return view(request, *args, **kwargs)
+            return serve(request, page)
+        return wrapper
+    return decorator
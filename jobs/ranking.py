@@ -0,0 +1,79 @@
+# jobs/ranking.py
+"""
+Relevance ranking for keyword searches.
+
+The full-text index scores at most SEARCH_RANK_CANDIDATES matches (FTS5
+bm25 with the title weighted SEARCH_TITLE_WEIGHT times the description;
+ts_rank on Postgres), and only those are re-ranked in Python with recency
+and the paid boost.
+"""
+import math
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import Job
+from .search import FTS_TABLE, expand_terms, filter_jobs, fts5_query, index_available, query_terms, tsquery
+
+
+def relevance_candidates(keyword, location="", category="", limit=None):
+    """
+    [(job id, relevance)] for the best `limit` (SEARCH_RANK_CANDIDATES)
+    matches, higher is better; None when there's no usable index.
+    """
+    terms = query_terms(keyword)
+    if not terms or not index_available():
+        return None
+    groups = expand_terms(terms)
+    limit = limit or getattr(settings, "SEARCH_RANK_CANDIDATES", 200)
+    restrict, restrict_params = "", []
+    if location or category:
+        sql, restrict_params = filter_jobs(Job.objects.all(), "", location, category).values("id").query.sql_with_params()
+        restrict = f" IN ({sql})"
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            bm25 = f"bm25({FTS_TABLE}, {float(getattr(settings, 'SEARCH_TITLE_WEIGHT', 5.0))}, 1.0)"
+            # bm25() is lower-is-better, so it is negated
+            cursor.execute(
+                f"SELECT rowid, -{bm25} FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+                f"{' AND rowid' + restrict if restrict else ''} ORDER BY {bm25} LIMIT %s",
+                [fts5_query(groups), *restrict_params, limit],
+            )
+        else:
+            # Normalization 1 divides by 1 + log(document length), like BM25's length penalty
+            cursor.execute(
+                "SELECT id, ts_rank(search_vector, query, 1) AS score"
+                " FROM jobs_job, to_tsquery('english', %s) query WHERE search_vector @@ query"
+                f"{' AND id' + restrict if restrict else ''} ORDER BY score DESC LIMIT %s",
+                [tsquery(groups), *restrict_params, limit],
+            )
+        return cursor.fetchall()
+
+
+def rank_jobs(candidates, now=None):
+    """
+    Job ids from relevance_candidates(), best first: relevance (scaled to
+    0..1 across the candidates) plus a recency bonus halving every
+    SEARCH_RECENCY_HALF_LIFE_DAYS and SEARCH_PAID_BOOST for paid listings.
+    """
+    if not candidates:
+        return []
+    relevance = dict(candidates)
+    low, high = min(relevance.values()), max(relevance.values())
+    spread = (high - low) or 1.0
+    recency_weight = getattr(settings, "SEARCH_RECENCY_WEIGHT", 0.2)
+    half_life = getattr(settings, "SEARCH_RECENCY_HALF_LIFE_DAYS", 14)
+    paid_boost = getattr(settings, "SEARCH_PAID_BOOST", 0.1)
+    now = now or timezone.now()
+    scores = []
+    for job_id, date_posted, is_paid in Job.objects.filter(id__in=relevance).values_list("id", "date_posted", "is_paid"):
+        score = (relevance[job_id] - low) / spread
+        if date_posted is not None:
+            age_days = max((now - date_posted).total_seconds(), 0) / 86400
+            score += recency_weight * math.pow(0.5, age_days / half_life)
+        if is_paid:
+            score += paid_boost
+        scores.append((-score, -job_id))
+    scores.sort()
+    return [-job_id for _, job_id in scores]
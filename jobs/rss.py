@@ -0,0 +1,51 @@
+# jobs/rss.py
+"""
+Incremental RSS parsing.
+
+`iter_rss_items` walks a feed with iterparse and yields one dict per <item>
+as soon as it is complete. Finished items are detached from the tree, so peak
+memory stays flat however large the feed is.
+"""
+import xml.etree.ElementTree as ET
+
+ITEM_FIELDS = ("title", "author", "description", "link", "guid", "pubDate")
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_rss_items(source):
+    """
+    Yield {field: text or None} dicts for each <item> in `source` (a path or
+    binary file object). A malformed tail ends the iteration quietly once at least one
+    item was read; a feed that is broken from the start raises ET.ParseError.
+    """
+    stack = []
+    yielded = 0
+    try:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            if _local(elem.tag) != "item":
+                continue
+
+            fields = {name: None for name in ITEM_FIELDS}
+            for child in elem:
+                name = _local(child.tag)
+                # First non-empty match wins (e.g. <link> before <atom:link/>)
+                if name in fields and fields[name] is None and child.text:
+                    fields[name] = child.text
+            # Drop the finished item so the tree never grows
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+            yielded += 1
+            yield fields
+    except ET.ParseError as e:
+        if not yielded:
+            raise
+        print(f"⚠️ Feed truncated after {yielded} items ({e}); keeping parsed items.")
@@ -19,13 +19,23 @@ from django.core.management import call_command
 
 def run_fetch_jobs():
     print("⏰ Running scheduled job: fetch_jobs")
-    call_command('fetch_jobs')
+    call_command('fetch_jobs', skip_newsletter=True)
 
-# Run every 24 hours
-schedule.every(24).hours.do(run_fetch_jobs)
+def run_fetch_job_news():
+    print("⏰ Running scheduled job: fetch_job_news")
+    call_command('fetch_job_news')
 
-print("✅ Scheduler started — will run every 24 hours.")
+def run_daily_newsletter():
+    print("⏰ Running scheduled job: send_daily_newsletter")
+    call_command('send_daily_newsletter')
+
+# Each tick only fetches the sources that are due (per-source refresh intervals
+# live on the adapters in jobs/sources.py), so ticking often is cheap.
+schedule.every(15).minutes.do(run_fetch_jobs)
+schedule.every(30).minutes.do(run_fetch_job_news)
+schedule.every().day.at("09:00").do(run_daily_newsletter)
+
+print("✅ Scheduler started — fetching due sources every 15 minutes.")
 while True:
     schedule.run_pending()
     time.sleep(60)
-
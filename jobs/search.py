@@ -0,0 +1,333 @@
+# jobs/search.py
+"""
+Keyword search over Job title and description through a full-text index.
+
+SQLite: an external-content FTS5 table (jobs_job_fts) mirroring jobs_job,
+kept in sync by AFTER INSERT/UPDATE/DELETE triggers. The triggers are SQL,
+so bulk_create and queryset.update() stay in sync too.
+PostgreSQL: a generated tsvector column (jobs_job.search_vector) with a GIN
+index; Postgres maintains it on every write.
+
+Both are created by migration 0014 and can be rebuilt with
+`manage.py rebuild_search_index`. SQLite drops a table's triggers whenever a
+migration rebuilds it, so they are reinstalled (and the index refreshed) on
+post_migrate, and the index only counts as available while they exist.
+Without an index (other backends, or a SQLite build lacking FTS5) search
+falls back to icontains.
+
+Query terms that match nothing in the index vocabulary are expanded with
+their closest spellings (jobs/spelling.py). The spelling index is built
+after ingestion (`update_speller()`) and stored for the web workers.
+Relevance ranking lives in jobs/ranking.py and the cached listing pages in
+jobs/searchcache.py.
+"""
+import os
+import pickle
+import re
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .gazetteer import location_ids
+from .spelling import SymSpell
+
+FTS_TABLE = "jobs_job_fts"
+VOCAB_TABLE = "jobs_job_fts_vocab"
+PG_INDEX = "jobs_job_search_idx"
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='jobs_job', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ai AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_job_fts_ad AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_job_fts_au AFTER UPDATE OF title, description ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Read-only view of the index's terms and document counts, for spelling suggestions
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {VOCAB_TABLE} USING fts5vocab({FTS_TABLE}, 'row')",
+]
+SQLITE_TRIGGERS = ("jobs_job_fts_ai", "jobs_job_fts_ad", "jobs_job_fts_au")
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS jobs_job_fts_ai",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_ad",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_au",
+    f"DROP TABLE IF EXISTS {VOCAB_TABLE}",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_SCHEMA = [
+    """ALTER TABLE jobs_job ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED""",
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON jobs_job USING GIN (search_vector)",
+]
+POSTGRES_DROP = [
+    f"DROP INDEX IF EXISTS {PG_INDEX}",
+    "ALTER TABLE jobs_job DROP COLUMN IF EXISTS search_vector",
+]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_available = set()
+_speller = {"index": None, "mtime": None, "checked": 0.0}
+
+
+def create_index(conn=None):
+    """Create the backend's index objects (idempotent); False if unsupported."""
+    conn = conn or connection
+    statements = {"sqlite": SQLITE_SCHEMA, "postgresql": POSTGRES_SCHEMA}.get(conn.vendor)
+    if statements is None:
+        return False
+    try:
+        with conn.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    except OperationalError as e:
+        # e.g. "no such module: fts5" on SQLite builds without FTS5
+        print(f"⚠️ Full-text index not created: {e}")
+        return False
+    return True
+
+
+def drop_index(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        for sql in {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(conn.vendor, []):
+            cursor.execute(sql)
+    _available.discard(conn.alias)
+
+
+def _sqlite_objects(conn):
+    """Names of the FTS table and sync triggers that exist."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s)"
+            f" OR (type = 'trigger' AND name IN ({', '.join(['%s'] * len(SQLITE_TRIGGERS))}))",
+            [FTS_TABLE, *SQLITE_TRIGGERS],
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+def index_available(conn=None):
+    conn = conn or connection
+    # Only a positive answer is remembered, so a later rebuild_search_index is picked up
+    if conn.alias in _available:
+        return True
+    if conn.vendor == "sqlite":
+        # Without its triggers the index silently goes stale, so it doesn't count
+        found = _sqlite_objects(conn) == {FTS_TABLE, *SQLITE_TRIGGERS}
+    elif conn.vendor == "postgresql":
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [PG_INDEX])
+            found = cursor.fetchone() is not None
+    else:
+        found = False
+    if found:
+        _available.add(conn.alias)
+    return found
+
+
+def rebuild_index(conn=None):
+    """Recreate missing objects and repopulate the index from jobs_job."""
+    conn = conn or connection
+    if not create_index(conn):
+        return False
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        else:
+            # The generated column is always current; rebuild the GIN index itself
+            cursor.execute(f"REINDEX INDEX {PG_INDEX}")
+    return True
+
+
+def restore_triggers(conn=None):
+    """
+    Recreate the SQLite sync triggers if the FTS table exists without them and
+    re-index; True if anything was repaired. Any later migration that rebuilds
+    jobs_job (AddField, AlterField, ...) drops them, so this runs on post_migrate.
+    """
+    conn = conn or connection
+    if conn.vendor != "sqlite":
+        return False
+    existing = _sqlite_objects(conn)
+    if FTS_TABLE not in existing or existing >= set(SQLITE_TRIGGERS):
+        return False
+    print("⚠️ Full-text index triggers were missing; recreating them and re-indexing jobs")
+    return rebuild_index(conn)
+
+
+def restore_triggers_after_migrate(using="default", **kwargs):
+    """post_migrate receiver, connected in JobsConfig.ready()."""
+    from django.db import connections
+
+    restore_triggers(connections[using])
+
+
+def query_terms(keyword):
+    return _WORD_RE.findall(keyword.lower())
+
+
+def vocabulary(conn=None):
+    """{term: number of jobs containing it} for index terms worth suggesting."""
+    conn = conn or connection
+    min_docs = getattr(settings, "SEARCH_SPELLING_MIN_DOCS", 2)
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            cursor.execute(f"SELECT term, doc FROM {VOCAB_TABLE} WHERE doc >= %s", [min_docs])
+        else:
+            # Lexemes are stemmed, which suits the stemmed, prefix-matched tsquery
+            cursor.execute("SELECT word, ndoc FROM ts_stat('SELECT search_vector FROM jobs_job') WHERE ndoc >= %s", [min_docs])
+        return {term: docs for term, docs in cursor.fetchall() if term.isalpha() and 3 <= len(term) <= 30}
+
+
+def speller_path():
+    return str(getattr(settings, "SEARCH_SPELLING_SNAPSHOT", settings.BASE_DIR / ".cache" / "speller.pickle"))
+
+
+def update_speller(conn=None):
+    """
+    Build the SymSpell index over vocabulary() and store it for the web
+    workers (run after ingestion); returns the number of words.
+    """
+    conn = conn or connection
+    index = SymSpell(vocabulary(conn) if index_available(conn) else {}, max_distance=2)
+    path = speller_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return len(index)
+
+
+def speller():
+    """
+    The stored SymSpell index, reloaded at most every
+    SEARCH_SPELLING_RELOAD_SECONDS if the file changed. Requests never build
+    it: until update_speller() has run there are no suggestions.
+    """
+    now = time.monotonic()
+    if _speller["index"] is not None and now - _speller["checked"] < getattr(settings, "SEARCH_SPELLING_RELOAD_SECONDS", 30):
+        return _speller["index"]
+    _speller["checked"] = now
+    try:
+        mtime = os.stat(speller_path()).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _speller["index"] is None or mtime != _speller["mtime"]:
+        index = None
+        if mtime is not None:
+            try:
+                with open(speller_path(), "rb") as f:
+                    index = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                index = None
+        _speller["index"] = index if isinstance(index, SymSpell) else SymSpell({})
+        _speller["mtime"] = mtime
+    return _speller["index"]
+
+
+def stemmed(terms, conn=None):
+    """
+    The terms as the index stores them: on Postgres the english_stem lexeme
+    ("developers" -> "develop"), so they compare with vocabulary(); stop words
+    and other backends keep the typed form.
+    """
+    conn = conn or connection
+    if conn.vendor != "postgresql" or not terms:
+        return list(terms)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce((ts_lexize('english_stem', term))[1], term)"
+            " FROM unnest(%s::text[]) WITH ORDINALITY AS t(term, n) ORDER BY n",
+            [list(terms)],
+        )
+        return [term for term, in cursor.fetchall()]
+
+
+def expand_terms(terms):
+    """
+    One list of alternatives per term: the term itself, plus its closest
+    spellings when no indexed word starts with it.
+    """
+    index = speller()
+    groups = []
+    for term, lexeme in zip(terms, stemmed(terms)):
+        if len(term) < 3 or term.isdigit() or index.has_prefix(lexeme):
+            groups.append([term])
+            continue
+        # One edit for short words, two for longer ones
+        suggestions = index.lookup(lexeme, max_distance=1 if len(lexeme) <= 5 else 2,
+                                   limit=getattr(settings, "SEARCH_SPELLING_SUGGESTIONS", 3))
+        groups.append([term] + suggestions)
+    return groups
+
+
+def fts5_query(groups):
+    """
+    Every group must match; the typed term is a quoted prefix ("develop"
+    finds "developer"), spelling suggestions are exact words.
+    """
+    clauses = []
+    for term, *suggestions in groups:
+        alternatives = [f'"{term}"*'] + [f'"{word}"' for word in suggestions]
+        clauses.append(alternatives[0] if len(alternatives) == 1 else f"({' OR '.join(alternatives)})")
+    return " AND ".join(clauses)
+
+
+def tsquery(groups):
+    clauses = []
+    for term, *suggestions in groups:
+        alternatives = [f"{term}:*"] + suggestions
+        clauses.append(alternatives[0] if len(alternatives) == 1 else f"({' | '.join(alternatives)})")
+    return " & ".join(clauses)
+
+
+def matching_ids(keyword):
+    """Subquery of Job ids matching `keyword`, or None when there's no usable index."""
+    terms = query_terms(keyword)
+    if not terms or not index_available():
+        return None
+    groups = expand_terms(terms)
+    if connection.vendor == "sqlite":
+        return RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [fts5_query(groups)])
+    return RawSQL("SELECT id FROM jobs_job WHERE search_vector @@ to_tsquery('english', %s)", [tsquery(groups)])
+
+
+def search_jobs(queryset, keyword):
+    """Narrow a Job queryset to postings matching `keyword` (ordering is left alone)."""
+    keyword = (keyword or "").strip()
+    if not keyword:
+        return queryset
+    ids = matching_ids(keyword)
+    if ids is None:
+        return queryset.filter(Q(title__icontains=keyword) | Q(description__icontains=keyword))
+    return queryset.filter(id__in=ids)
+
+
+def filter_jobs(queryset, keyword="", location="", category=""):
+    if keyword:
+        queryset = search_jobs(queryset, keyword)
+    if location:
+        # A known place matches itself and everything in it; unknown text is a substring
+        ids = location_ids(location)
+        if ids is None:
+            queryset = queryset.filter(location__icontains=location)
+        else:
+            queryset = queryset.filter(location_key__in=ids)
+    if category:
+        queryset = queryset.filter(category__icontains=category)
+    return queryset
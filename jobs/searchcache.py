@@ -0,0 +1,186 @@
+# jobs/searchcache.py
+"""
+Cached job listings for home and job_list.
+
+`search_page` normalizes keyword/location/category into a cache key and
+caches the ordered list of matching ids (up to JOB_SEARCH_CACHE_MAX_IDS)
+for JOB_SEARCH_CACHE_SECONDS, then loads only the rows of the requested
+page. Keys embed a version number (kept with the page generations in
+counter_cache()) that ingest and Job signals bump, so new jobs invalidate
+every cached search at once without clearing the rest of the cache.
+
+Keyword searches are listed by relevance (jobs/ranking.py) unless
+`sort=date`; their cursors are signed positions in the ranked id list.
+Only the SEARCH_RANK_CANDIDATES best matches are ranked; when more match,
+the page says so and links to the date order, which lists them all.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from .models import Job
+from .pagecache import counter_cache
+from .pagination import KeysetPage, KeysetPaginator, add_link_queries, decode_cursor
+from .ranking import rank_jobs, relevance_candidates
+from .search import filter_jobs
+
+VERSION_KEY = "jobsearch:version"
+RANK_CURSOR_SALT = "jobs.search.relevance"
+
+
+def normalize_params(params):
+    """(keyword, location, category), casefolded with single spaces; equal searches share a key."""
+    return tuple(
+        " ".join((params.get(name) or "").split()).casefold()
+        for name in ("keyword", "location", "category")
+    )
+
+
+def search_version():
+    return counter_cache().get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_search_version():
+    """Invalidate every cached search (old keys simply expire)."""
+    counters = counter_cache()
+    try:
+        counters.incr(VERSION_KEY)
+    except ValueError:
+        counters.set(VERSION_KEY, 1, None)
+
+
+def cached_job_ids(normalized, ordering):
+    """
+    (ids, complete): the first JOB_SEARCH_CACHE_MAX_IDS matching ids in
+    `ordering`, and whether that is the whole result.
+    """
+    raw = "|".join(normalized + tuple(ordering))
+    key = f"jobsearch:v{search_version()}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+    cached = cache.get(key)
+    if cached is None:
+        limit = getattr(settings, "JOB_SEARCH_CACHE_MAX_IDS", 500)
+        paginator = KeysetPaginator(filter_jobs(Job.objects.all(), *normalized), ordering)
+        ids = list(paginator.queryset.order_by(*paginator.order_by()).values_list("id", flat=True)[:limit + 1])
+        cached = (ids[:limit], len(ids) <= limit)
+        cache.set(key, cached, getattr(settings, "JOB_SEARCH_CACHE_SECONDS", 600))
+    return cached
+
+
+def ranked_job_ids(normalized):
+    """
+    (ids, truncated) for a keyword search, cached like cached_job_ids: the
+    SEARCH_RANK_CANDIDATES best matches in relevance order, and whether more
+    match than that. None without an index.
+    """
+    raw = "|".join(normalized + ("relevance",))
+    key = f"jobsearch:v{search_version()}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+    cached = cache.get(key)
+    if cached is None:
+        limit = getattr(settings, "SEARCH_RANK_CANDIDATES", 200)
+        # One extra row tells a full window from a result that just fits
+        candidates = relevance_candidates(*normalized, limit=limit + 1)
+        if candidates is None:
+            return None
+        cached = (rank_jobs(candidates[:limit]), len(candidates) > limit)
+        cache.set(key, cached, getattr(settings, "JOB_SEARCH_CACHE_SECONDS", 600))
+    return cached
+
+
+def _position(token):
+    if not token:
+        return None
+    try:
+        position = signing.loads(token, salt=RANK_CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    return position if isinstance(position, int) and position >= 0 else None
+
+
+def ranked_page(request, ids, queryset, per_page=10):
+    """A page of relevance-ranked ids; cursors are signed positions in the list."""
+    after = _position(request.GET.get("after"))
+    before = None if after is not None else _position(request.GET.get("before"))
+    if after is not None:
+        start = after
+    elif before is not None:
+        start = max(before - per_page, 0)
+    else:
+        start = 0
+    end = start + per_page
+    page_ids = ids[start:end]
+    rows = queryset.in_bulk(page_ids)
+    return KeysetPage(
+        [rows[job_id] for job_id in page_ids if job_id in rows],
+        has_next=end < len(ids),
+        has_previous=start > 0,
+        next_cursor=signing.dumps(end, salt=RANK_CURSOR_SALT),
+        previous_cursor=signing.dumps(start, salt=RANK_CURSOR_SALT),
+    )
+
+
+def add_sort_queries(request, page, ranked, truncated=False):
+    """
+    page.ranked and page.truncated (only the best matches are ranked) plus
+    relevance_query / date_query: the current search in either order, from page one.
+    """
+    page.ranked = ranked
+    page.truncated = truncated
+    for attr, sort in (("relevance_query", None), ("date_query", "date")):
+        params = request.GET.copy()
+        for key in ("after", "before", "page", "sort"):
+            params.pop(key, None)
+        if sort:
+            params["sort"] = sort
+        setattr(page, attr, params.urlencode())
+    return page
+
+
+def search_page(request, ordering, fields=None, per_page=10):
+    """
+    One KeysetPage of jobs matching the request's filters. Keyword searches
+    are ranked by relevance unless ?sort=date (or there is no index).
+    Otherwise cursors are the same as paginate_keyset's, so pages past the
+    cached ids (or after the cache turned over) continue with a keyset query.
+    """
+    normalized = normalize_params(request.GET)
+    queryset = Job.objects.only(*fields) if fields else Job.objects.all()
+    if normalized[0] and request.GET.get("sort") != "date":
+        ranked = ranked_job_ids(normalized)
+        if ranked is not None:
+            ids, truncated = ranked
+            page = ranked_page(request, ids, queryset, per_page)
+            return add_sort_queries(request, add_link_queries(request, page), ranked=True, truncated=truncated)
+
+    paginator = KeysetPaginator(filter_jobs(queryset, *normalized), ordering, per_page)
+    ids, complete = cached_job_ids(normalized, ordering)
+    positions = {job_id: i for i, job_id in enumerate(ids)}
+
+    after = decode_cursor(request.GET.get("after"), len(paginator.keys))
+    before = None if after else decode_cursor(request.GET.get("before"), len(paginator.keys))
+    # Cursors end with the (unique) id of the boundary row
+    start = end = None
+    if after:
+        position = positions.get(after[-1])
+        if position is not None:
+            start, end = position + 1, position + 1 + per_page
+    elif before:
+        end = positions.get(before[-1])
+        if end is not None:
+            start = max(end - per_page, 0)
+    else:
+        start, end = 0, per_page
+
+    if start is None or (end > len(ids) and not complete):
+        page = paginator.page(after=request.GET.get("after"), before=request.GET.get("before"))
+        return add_sort_queries(request, add_link_queries(request, page), ranked=False)
+
+    page_ids = ids[start:end]
+    rows = queryset.in_bulk(page_ids)
+    page = paginator.make_page(
+        [rows[job_id] for job_id in page_ids if job_id in rows],
+        has_next=end < len(ids) or not complete,
+        has_previous=start > 0,
+    )
+    return add_sort_queries(request, add_link_queries(request, page), ranked=False)
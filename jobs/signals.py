@@ -0,0 +1,60 @@
+# jobs/signals.py
+"""Model signal handlers, connected in JobsConfig.ready()."""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import prerender
+from .facets import FACET_FIELDS, record_change, record_jobs
+from .ingest import index_bands
+from .models import BlogPost, Job
+from .pagecache import invalidate
+from .searchcache import bump_search_version
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_facets(sender, instance, update_fields=None, **kwargs):
+    """Stash the stored category/location so an edit can move the job between facets."""
+    instance._facet_before = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(FACET_FIELDS):
+        return
+    instance._facet_before = Job.objects.filter(pk=instance.pk).values(*FACET_FIELDS).first()
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, **kwargs):
+    # Any change can move a job in or out of (or within) cached search results
+    bump_search_version()
+    invalidate("jobs", f"job:{instance.pk}")
+    if created:
+        # Hand-entered jobs (submit_job, admin) join the near-duplicate index like ingested ones
+        index_bands([instance])
+        record_jobs([instance])
+        prerender.invalidate(*prerender.FACET_PAGES)
+    elif getattr(instance, "_facet_before", None) is not None:
+        record_change(instance._facet_before, {field: getattr(instance, field) for field in FACET_FIELDS})
+        prerender.invalidate(*prerender.FACET_PAGES)
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    bump_search_version()
+    invalidate("jobs", f"job:{instance.pk}")
+    record_jobs([instance], sign=-1)
+    prerender.invalidate(*prerender.FACET_PAGES)
+
+
+@receiver(pre_save, sender=BlogPost)
+def remember_blog_slug(sender, instance, **kwargs):
+    """The stored slug, so a renamed post's old detail page is invalidated too."""
+    instance._slug_before = None
+    if not instance._state.adding and instance.pk is not None:
+        instance._slug_before = BlogPost.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def blog_changed(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, "_slug_before", None)} - {None, ""}
+    invalidate("blogs", *(f"blog:{slug}" for slug in slugs))
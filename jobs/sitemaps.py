@@ -1,12 +1,301 @@
-from django.contrib.sitemaps import Sitemap
-from .models import Job
+# jobs/sitemaps.py
+"""
+Sitemap index plus numbered sitemap parts for jobs and blog posts.
 
-class JobSitemap(Sitemap):
-    changefreq = "daily"
-    priority = 0.8
+/sitemap.xml is a sitemap index; each section ("jobs", "blog") is split into
+parts of SITEMAP_PART_SIZE ids (part 1 = ids 1..size, and so on), served at
+/sitemap-<section>-<part>.xml. Fixed id ranges keep every part under the
+protocol's 50,000-URL limit and mean a part only changes when its own rows
+do. Rows are read with values_list().iterator() (only the id/slug and the
+lastmod column) and written out as a streaming response.
 
-    def items(self):
-        return Job.objects.all()
+Every response carries an ETag and Last-Modified derived from one aggregate
+query (count, newest lastmod, id sum), so conditional requests get a 304
+without rendering anything.
 
-    def lastmod(self, obj):
-        return obj.created_at
+`manage.py build_sitemaps` (chained after fetch_jobs and fetch_job_news)
+writes the index and parts, plain and .gz, into SITEMAP_ROOT; only parts
+whose aggregate state changed since the last build are rewritten. While
+those files exist the views serve them without touching the database.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+from calendar import timegm
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Sum
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from .models import BlogPost, Job
+from .prerender import accepts_gzip
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+CHUNK_ROWS = 500
+
+
+def part_size():
+    return getattr(settings, "SITEMAP_PART_SIZE", 50000)
+
+
+class SitemapSection:
+    """
+    One kind of page: `field` is the column its URL is built from (reversing
+    `url_name` with `url_kwarg`), `lastmod_field` dates it.
+    """
+
+    def __init__(self, name, queryset, url_name, url_kwarg, field, lastmod_field, changefreq, priority):
+        self.name = name
+        self.queryset = queryset
+        self.url_name = url_name
+        self.url_kwarg = url_kwarg
+        self.field = field
+        self.lastmod_field = lastmod_field
+        self.changefreq = changefreq
+        self.priority = priority
+
+    def path_template(self):
+        """The URL path with "{}" for the row's value; reverse() once instead of per row."""
+        sentinel = "987654321" if self.field == "id" else "sitemap-sentinel"
+        return reverse(self.url_name, kwargs={self.url_kwarg: sentinel}).replace(sentinel, "{}")
+
+    def part_queryset(self, part):
+        size = part_size()
+        return self.queryset.filter(id__gt=(part - 1) * size, id__lte=part * size)
+
+    def parts(self):
+        """{part: (url count, newest lastmod, id sum)} for every non-empty part, in one query."""
+        rows = (
+            self.queryset.annotate(part=(F("id") - 1) / part_size() + 1)
+            .values("part")
+            .annotate(n=Count("id"), lastmod=Max(self.lastmod_field), ids=Sum("id"))
+            .order_by("part")
+        )
+        return {row["part"]: (row["n"], row["lastmod"], row["ids"]) for row in rows}
+
+    def part_state(self, part):
+        state = self.part_queryset(part).aggregate(n=Count("id"), lastmod=Max(self.lastmod_field), ids=Sum("id"))
+        return state["n"], state["lastmod"], state["ids"]
+
+    def urls(self, part):
+        """(path, lastmod) per row of `part`, streamed."""
+        template = self.path_template()
+        rows = self.part_queryset(part).order_by("id").values_list(self.field, self.lastmod_field)
+        for value, lastmod in rows.iterator(chunk_size=2000):
+            yield template.format(value), lastmod
+
+
+SECTIONS = {
+    "jobs": SitemapSection(
+        "jobs", Job.objects.all(), "job_detail", "job_id", "id", "created_at",
+        changefreq="daily", priority="0.8",
+    ),
+    "blog": SitemapSection(
+        "blog", BlogPost.objects.filter(is_published=True).exclude(slug=""), "blog_detail", "slug", "slug", "last_updated",
+        changefreq="weekly", priority="0.6",
+    ),
+}
+
+
+def _w3c(dt):
+    if timezone.is_aware(dt):
+        dt = dt.astimezone(datetime.timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def render_part(section, part, base_url):
+    """The urlset document for one part, as an iterator of text chunks."""
+    yield XML_HEADER + URLSET_OPEN
+    tail = f"<changefreq>{section.changefreq}</changefreq><priority>{section.priority}</priority></url>"
+    chunk = []
+    for path, lastmod in section.urls(part):
+        lastmod_tag = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+        chunk.append(f"<url><loc>{escape(base_url + path)}</loc>{lastmod_tag}{tail}\n")
+        if len(chunk) >= CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk) + "</urlset>\n"
+
+
+def index_entries():
+    """[(section name, part, (count, lastmod, id sum))] across all sections."""
+    return [
+        (name, part, state)
+        for name, section in SECTIONS.items()
+        for part, state in section.parts().items()
+    ]
+
+
+def render_index(entries, base_url):
+    yield XML_HEADER + INDEX_OPEN
+    for name, part, (_, lastmod, _) in entries:
+        loc = escape(f"{base_url}{reverse('sitemap_section', kwargs={'section': name, 'part': part})}")
+        lastmod_tag = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+        yield f"<sitemap><loc>{loc}</loc>{lastmod_tag}</sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def validators(key, states):
+    """(ETag, Last-Modified timestamp): the ETag hashes `key`, Last-Modified is the newest lastmod in `states`."""
+    etag = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+    lastmods = [lastmod for _, lastmod, _ in states if lastmod]
+    return quote_etag(etag), (timegm(max(lastmods).utctimetuple()) if lastmods else None)
+
+
+def _respond(request, etag, last_modified, content):
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = StreamingHttpResponse(content(), content_type="application/xml; charset=utf-8")
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def _base_url(request):
+    return f"{request.scheme}://{request.get_host()}"
+
+
+# --- Pre-generated files ---
+
+MANIFEST = "manifest.json"
+INDEX_FILE = "sitemap.xml"
+
+
+def sitemap_root():
+    return str(getattr(settings, "SITEMAP_ROOT", settings.BASE_DIR / ".cache" / "sitemaps"))
+
+
+def part_filename(section, part):
+    return f"sitemap-{section}-{part}.xml"
+
+
+def _state_key(state):
+    return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()[:32]
+
+
+def _write_atomic(path, chunks):
+    """Write `chunks` to `path` and `path`.gz via temp files renamed into place."""
+    tmp, gz_tmp = f"{path}.{os.getpid()}.tmp", f"{path}.gz.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as plain, open(gz_tmp, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as compressed:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8")
+                    plain.write(data)
+                    compressed.write(data)
+    except BaseException:
+        for leftover in (tmp, gz_tmp):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    os.replace(gz_tmp, f"{path}.gz")
+    os.replace(tmp, path)
+
+
+def write_sitemaps(base_url, force=False):
+    """
+    Bring SITEMAP_ROOT up to date; returns (parts written, parts unchanged,
+    parts removed). The index is rewritten last, so it never lists a part
+    that isn't on disk yet.
+    """
+    root = sitemap_root()
+    os.makedirs(root, exist_ok=True)
+    try:
+        with open(os.path.join(root, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    if force or manifest.get("base_url") != base_url:
+        manifest = {"base_url": base_url, "parts": {}}
+    previous = manifest.get("parts", {})
+
+    entries = index_entries()
+    current = {}
+    written = unchanged = 0
+    for name, part, state in entries:
+        filename = part_filename(name, part)
+        current[filename] = _state_key(state)
+        if previous.get(filename) == current[filename] and os.path.exists(os.path.join(root, filename)):
+            unchanged += 1
+            continue
+        _write_atomic(os.path.join(root, filename), render_part(SECTIONS[name], part, base_url))
+        written += 1
+
+    if written or current.keys() != previous.keys() or not os.path.exists(os.path.join(root, INDEX_FILE)):
+        _write_atomic(os.path.join(root, INDEX_FILE), render_index(entries, base_url))
+
+    removed = 0
+    for filename in previous.keys() - current.keys():
+        for path in (filename, f"{filename}.gz"):
+            try:
+                os.remove(os.path.join(root, path))
+            except FileNotFoundError:
+                pass
+        removed += 1
+
+    tmp = os.path.join(root, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"base_url": base_url, "parts": current}, f)
+    os.replace(tmp, os.path.join(root, MANIFEST))
+    return written, unchanged, removed
+
+
+def serve_pregenerated(request, filename):
+    """The built file (gzipped if accepted) with ETag/Last-Modified, or None if it isn't there."""
+    path = os.path.join(sitemap_root(), filename)
+    gzipped = accepts_gzip(request)
+    if gzipped and os.path.exists(f"{path}.gz"):
+        path = f"{path}.gz"
+    else:
+        gzipped = False
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(open(path, "rb"), content_type="application/xml; charset=utf-8")
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+@require_GET
+def sitemap_index(request):
+    response = serve_pregenerated(request, INDEX_FILE)
+    if response is not None:
+        return response
+    entries = index_entries()
+    etag, last_modified = validators(entries, [state for _, _, state in entries])
+    return _respond(request, etag, last_modified, lambda: render_index(entries, _base_url(request)))
+
+
+@require_GET
+def sitemap_section(request, section, part):
+    sitemap = SECTIONS.get(section)
+    if sitemap is None or part < 1:
+        raise Http404("No such sitemap")
+    response = serve_pregenerated(request, part_filename(section, part))
+    if response is not None:
+        return response
+    state = sitemap.part_state(part)
+    if not state[0]:
+        raise Http404("Empty sitemap part")
+    etag, last_modified = validators((section, part, state), [state])
+    return _respond(request, etag, last_modified, lambda: render_part(sitemap, part, _base_url(request)))
@@ -0,0 +1,286 @@
+# jobs/sources.py
+"""
+Job and news source adapters.
+
+Each adapter declares where to fetch from, how to parse the payload, how often
+the source is worth refreshing, and its concurrency/page budget. Adapters are
+kept in REGISTRY; the fetch commands only run the ones that are due.
+"""
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .fetcher import FetchTask, TokenBucket
+from .ingest import make_aware
+from .rss import iter_rss_items
+
+REGISTRY = {}
+
+
+def register(adapter):
+    """Add an adapter instance to the registry (names must be unique)."""
+    if adapter.name in REGISTRY:
+        raise ValueError(f"Source {adapter.name!r} is already registered")
+    REGISTRY[adapter.name] = adapter
+    return adapter
+
+
+def get_adapters(kind=None, names=None):
+    adapters = [a for a in REGISTRY.values() if kind is None or a.kind == kind]
+    if names:
+        adapters = [a for a in adapters if a.name in names]
+    return adapters
+
+
+class SourceAdapter:
+    """Base adapter: one source, fetched as `max_pages` requests."""
+
+    name = None
+    kind = "jobs"
+    url = None
+    refresh_interval = timedelta(hours=24)
+    max_concurrency = 1
+    max_pages = 1
+
+    def __init__(self, name=None, url=None, refresh_interval=None, max_concurrency=None, max_pages=None):
+        self.name = name or self.name
+        self.url = url or self.url
+        if refresh_interval is not None:
+            self.refresh_interval = refresh_interval
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if max_pages is not None:
+            self.max_pages = max_pages
+
+    def is_due(self, state, now=None):
+        """True if the source was never checked or its refresh interval has passed."""
+        if state.last_checked is None:
+            return True
+        return state.last_checked + self.refresh_interval <= (now or timezone.now())
+
+    def get_url(self):
+        return self.url
+
+    def tasks(self, headers=None, timeout=None, state=None):
+        """FetchTasks for one run; `headers` carries the conditional-GET validators."""
+        return [FetchTask(
+            self.name,
+            self.get_url(),
+            timeout=timeout or getattr(settings, "FETCH_TIMEOUT", 20),
+            headers=headers,
+            max_concurrency=self.max_concurrency,
+            meta={"adapter": self},
+        )]
+
+    def parse(self, result, add, watermark):
+        """Feed each new posting in `result` to `add(**job_fields)`."""
+        raise NotImplementedError
+
+    def next_tasks(self, result):
+        """Follow-up FetchTasks (e.g. the next page) once `result` has been parsed."""
+        return []
+
+
+class RssJobAdapter(SourceAdapter):
+    """Plain RSS 2.0 job feed."""
+
+    def __init__(self, name, url, company_default="Unknown", location="Nigeria", **kwargs):
+        super().__init__(name, url, **kwargs)
+        self.company_default = company_default
+        self.location = location
+
+    def parse(self, result, add, watermark):
+        for item in iter_rss_items(result.body):
+            title = (item["title"] or "").strip()
+            company = (item["author"] or self.company_default).strip()
+            link = (item["link"] or "").strip()
+            guid = (item["guid"] or "").strip() or link
+            pub_date = item["pubDate"]
+
+            try:
+                published = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %z") if pub_date else None
+            except Exception:
+                published = None
+
+            # Newest first: everything past the watermark was ingested last run
+            if watermark.reached(guid, published):
+                break
+            if watermark.seen(guid, published):
+                continue
+            watermark.observe(guid, published)
+
+            add(
+                title=title,
+                company=company,
+                location=self.location,
+                description=item["description"] or "",
+                url=link,
+                source=self.name,
+                category="",
+                date_posted=published or timezone.now(),
+            )
+
+
+class RemotiveAdapter(SourceAdapter):
+    name = "Remotive"
+    url = "https://remotive.com/api/remote-jobs"
+    refresh_interval = timedelta(hours=6)
+
+    def parse(self, result, add, watermark):
+        data = json.loads(result.content)
+        for job in data.get("jobs", []):
+            pub_date = job.get("publication_date")
+            date_posted = make_aware(datetime.fromisoformat(pub_date.replace('Z', '+00:00'))) if pub_date else None
+            # API order isn't guaranteed, so skip rather than stop
+            guid = str(job.get("id") or job.get("url") or "")
+            if watermark.reached(published=date_posted) or watermark.seen(guid, date_posted):
+                continue
+            watermark.observe(guid, date_posted)
+            add(
+                title=job.get("title"),
+                company=job.get("company_name"),
+                location=job.get("candidate_required_location", "Remote"),
+                description=job.get("description", ""),
+                url=job.get("url"),
+                source=self.name,
+                category=job.get("category", ""),
+                date_posted=date_posted,
+            )
+
+
+class AdzunaAdapter(SourceAdapter):
+    """
+    Paginated Adzuna search sorted newest first. Pages are fetched in a sliding
+    window of `max_concurrency`; each parsed page queues the next one until
+    the page budget runs out or a page reaches the `created` watermark.
+
+    The watermark only advances once every page down to it has been parsed.
+    A run that runs out of budget, or loses a page, pauses the watermark at
+    the first missing page and the next run resumes from there (new postings
+    push older ones onto later pages, so resuming never skips any).
+    """
+
+    name = "Adzuna"
+    refresh_interval = timedelta(hours=6)
+    results_per_page = 50
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_pages", getattr(settings, "ADZUNA_MAX_PAGES", 5))
+        kwargs.setdefault("max_concurrency", getattr(settings, "ADZUNA_CONCURRENCY", 2))
+        super().__init__(**kwargs)
+        # Shared by every run in this process so back-to-back runs respect the API quota
+        per_minute = getattr(settings, "ADZUNA_REQUESTS_PER_MINUTE", 25)
+        self.rate_limiter = TokenBucket(rate=per_minute / 60, capacity=self.max_concurrency)
+        self._first_page = 1
+        self._next_page = 1
+        self._last_page = self.max_pages
+        self._parsed = set()
+        # First page that reached the watermark (or the end of the results)
+        self._end_page = None
+        self._timeout = None
+
+    def get_url(self, page=1):
+        # Credentials come from settings, so build the URL at fetch time
+        return (
+            f"https://api.adzuna.com/v1/api/jobs/gb/search/{page}?"
+            f"app_id={settings.ADZUNA_APP_ID}&app_key={settings.ADZUNA_APP_KEY}"
+            f"&results_per_page={self.results_per_page}&what=remote&where=Nigeria&sort_by=date"
+        )
+
+    def _page_task(self, page):
+        return FetchTask(
+            self.name,
+            self.get_url(page),
+            timeout=self._timeout,
+            max_concurrency=self.max_concurrency,
+            rate_limiter=self.rate_limiter,
+            meta={"adapter": self, "page": page},
+        )
+
+    def tasks(self, headers=None, timeout=None, state=None):
+        # Search results change constantly; conditional headers don't apply
+        self._timeout = timeout or getattr(settings, "FETCH_TIMEOUT", 20)
+        self._first_page = (state.resume_page if state is not None else None) or 1
+        self._last_page = self._first_page + self.max_pages - 1
+        self._parsed = set()
+        self._end_page = None
+        first_wave = min(self.max_concurrency, self.max_pages)
+        self._next_page = self._first_page + first_wave
+        return [self._page_task(page) for page in range(self._first_page, self._next_page)]
+
+    def next_tasks(self, result):
+        if self._end_page is not None or self._next_page > self._last_page:
+            return []
+        page = self._next_page
+        self._next_page += 1
+        return [self._page_task(page)]
+
+    def parse(self, result, add, watermark):
+        page = result.task.meta["page"]
+        data = json.loads(result.content)
+        results = data.get("results", [])
+        # Sorted by date, so once a page hits the watermark every later page is older
+        reached = len(results) < self.results_per_page
+        for job in results:
+            created = job.get("created")
+            date_posted = make_aware(datetime.strptime(created, "%Y-%m-%dT%H:%M:%SZ")) if created else None
+            guid = str(job.get("id") or "")
+            if watermark.reached(published=date_posted):
+                reached = True
+                continue
+            if watermark.seen(guid, date_posted):
+                continue
+            watermark.observe(guid, date_posted)
+            add(
+                title=job.get("title"),
+                company=job.get("company", {}).get("display_name", "Unknown"),
+                location=job.get("location", {}).get("display_name", "Nigeria"),
+                description=job.get("description", ""),
+                url=job.get("redirect_url"),
+                source=self.name,
+                category=job.get("category", {}).get("label", ""),
+                date_posted=date_posted,
+            )
+
+        self._parsed.add(page)
+        if reached and (self._end_page is None or page < self._end_page):
+            self._end_page = page
+        missing = self._first_page
+        while missing in self._parsed:
+            missing += 1
+        if self._end_page is not None and missing > self._end_page:
+            watermark.finish()
+        else:
+            watermark.pause(missing)
+
+
+class NewsFeedAdapter(SourceAdapter):
+    """Career-news feed turned into BlogPosts by fetch_job_news (parsed with feedparser)."""
+
+    kind = "news"
+
+    def __init__(self, name, url, category, max_entries=5, **kwargs):
+        super().__init__(name, url, **kwargs)
+        self.category = category
+        self.max_entries = max_entries
+
+
+# 🔹 Job sources
+register(RemotiveAdapter())
+register(AdzunaAdapter())
+register(RssJobAdapter("ReliefWeb", "https://reliefweb.int/jobs/rss.xml?country=175", refresh_interval=timedelta(hours=12)))
+register(RssJobAdapter("HotNigerianJobs", "http://www.hotnigerianjobs.com/feed/rss.xml", refresh_interval=timedelta(hours=2)))
+register(RssJobAdapter("NGOJobsInAfrica", "https://ngojobsinafrica.com/job-location/nigeria/feed/", refresh_interval=timedelta(hours=12)))
+register(RssJobAdapter("Jobzilla", "https://www.jobzilla.ng/feed/", refresh_interval=timedelta(hours=2)))
+register(RssJobAdapter("Careerjet", "https://www.careerjet.com.ng/rss/", refresh_interval=timedelta(hours=3)))
+register(RssJobAdapter("UN Jobs", "https://unjobs.org/themes/development.rss", refresh_interval=timedelta(hours=12)))
+register(RssJobAdapter("Devex", "https://www.devex.com/jobs/search.rss", refresh_interval=timedelta(hours=24)))
+
+# 🔹 News sources (BlogPosts)
+register(NewsFeedAdapter('TechCrunch - Jobs', 'https://techcrunch.com/category/jobs/feed/', 'Tech Jobs', refresh_interval=timedelta(hours=6)))
+register(NewsFeedAdapter('The Guardian - Careers', 'https://www.theguardian.com/careers/rss', 'Career Advice', refresh_interval=timedelta(hours=12)))
+register(NewsFeedAdapter('Glassdoor Blog', 'https://www.glassdoor.com/blog/feed/', 'Job Market', refresh_interval=timedelta(days=3)))
+register(NewsFeedAdapter('Nairaland - Jobs', 'https://www.nairaland.com/jobs/feed', 'Nigeria Jobs', refresh_interval=timedelta(hours=2)))
+register(NewsFeedAdapter('Remote OK - Jobs', 'https://remoteok.com/feeds/remote-jobs.rss', 'Remote Jobs', refresh_interval=timedelta(hours=1)))
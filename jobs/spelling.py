@@ -0,0 +1,81 @@
+# jobs/spelling.py
+"""
+Typo tolerance for keyword search (SymSpell-style).
+
+SymSpell precomputes, for every vocabulary word, the strings reachable by
+deleting up to `max_distance` characters from its first `prefix_length`
+characters. A misspelled query term is looked up by generating its own
+deletes: any word sharing one is a candidate, confirmed with a real
+Damerau-Levenshtein distance. That makes a lookup a few dict probes instead
+of a scan of the vocabulary.
+
+The vocabulary ({term: document frequency}) comes from the full-text index
+(see jobs.search.vocabulary).
+"""
+from bisect import bisect_left
+from collections import defaultdict
+
+
+def _deletes(word, max_distance):
+    """Every string made by deleting 1..max_distance characters (never the empty string)."""
+    out = set()
+    level = {word}
+    for _ in range(max_distance):
+        level = {w[:i] + w[i + 1:] for w in level if len(w) > 1 for i in range(len(w))}
+        out |= level
+    return out
+
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein (optimal string alignment) distance, or limit + 1 once it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SymSpell:
+    def __init__(self, words, max_distance=2, prefix_length=7):
+        """`words` is {word: frequency}."""
+        self.words = words
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.sorted_words = sorted(words)
+        self.deletes = defaultdict(list)
+        for word in words:
+            for deleted in _deletes(word[:prefix_length], max_distance) | {word[:prefix_length]}:
+                self.deletes[deleted].append(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def has_prefix(self, term):
+        """True if some vocabulary word starts with `term` (search terms are prefix matches)."""
+        i = bisect_left(self.sorted_words, term)
+        return i < len(self.sorted_words) and self.sorted_words[i].startswith(term)
+
+    def lookup(self, term, max_distance=None, limit=3):
+        """The closest words to `term`: smallest distance first, then most frequent."""
+        max_distance = min(self.max_distance if max_distance is None else max_distance, self.max_distance)
+        prefix = term[:self.prefix_length]
+        candidates = set()
+        for probe in _deletes(prefix, max_distance) | {prefix}:
+            candidates.update(self.deletes.get(probe, ()))
+        found = []
+        for word in candidates:
+            distance = edit_distance(term, word, max_distance)
+            if distance <= max_distance:
+                found.append((distance, -self.words[word], word))
+        found.sort()
+        return [word for _, _, word in found[:limit]]
@@ -0,0 +1,208 @@
+# jobs/summarizer.py
+"""
+BART summarization for fetch_job_news.
+
+The transformers pipeline is expensive (seconds and gigabytes to load), so it
+is only built the first time a text actually needs summarizing. When
+SUMMARIZER_WORKER_ADDRESS is set, texts go to a long-lived worker process
+(`manage.py run_summarizer_worker`) that keeps the model loaded between cron
+runs; if that worker can't be reached we fall back to truncation.
+
+`summarize_texts` is the batch entry point: it answers what it can from the
+SummaryCache table (keyed by a hash of the normalized text), runs the rest
+through the model in batches, and reports how long that took.
+"""
+import hashlib
+import re
+import threading
+import time
+from multiprocessing.connection import Client
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .models import SummaryCache
+
+MODEL_NAME = "facebook/bart-large-cnn"
+MIN_LENGTH_TO_SUMMARIZE = 100
+MAX_INPUT_CHARS = 1024
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_pipeline = None
+_pipeline_error = None
+_lock = threading.Lock()
+
+
+def fallback_summary(text):
+    return Truncator(text).words(25)
+
+
+def get_pipeline():
+    """Build the summarization pipeline on first use; None if torch/transformers are unavailable."""
+    global _pipeline, _pipeline_error
+    with _lock:
+        if _pipeline is None and _pipeline_error is None:
+            try:
+                import torch  # noqa: F401
+                from transformers import pipeline
+
+                _pipeline = pipeline("summarization", model=MODEL_NAME, device=-1, framework="pt")
+                print("✅ Summarizer ready (CPU mode)")
+            except Exception as e:
+                _pipeline_error = e
+                print(f"⚠️ Summarizer disabled: {e}")
+        return _pipeline
+
+
+def default_batch_size():
+    return getattr(settings, "SUMMARIZER_BATCH_SIZE", 8)
+
+
+def summarize_locally(texts, batch_size=None):
+    """Summarize in this process, `batch_size` texts per model call; truncation on errors."""
+    summarizer = get_pipeline()
+    texts = list(texts)
+    if summarizer is None:
+        return [fallback_summary(text) for text in texts]
+
+    batch_size = batch_size or default_batch_size()
+    summaries = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        try:
+            results = summarizer(
+                [text[:MAX_INPUT_CHARS] for text in batch],
+                max_length=100,
+                min_length=30,
+                do_sample=False,
+                batch_size=len(batch),
+                truncation=True,
+            )
+            summaries.extend(result["summary_text"] for result in results)
+        except Exception as e:
+            print(f"Summarization failed: {e}")
+            summaries.extend(fallback_summary(text) for text in batch)
+    return summaries
+
+
+def worker_address():
+    return getattr(settings, "SUMMARIZER_WORKER_ADDRESS", None)
+
+
+def worker_authkey():
+    """The shared secret from the environment (see settings); None when unset."""
+    return getattr(settings, "SUMMARIZER_WORKER_AUTHKEY", None)
+
+
+def summarize_via_worker(texts, batch_size=None, timeout=None):
+    """Send texts to the worker; None if it is unreachable or too slow."""
+    timeout = timeout or getattr(settings, "SUMMARIZER_WORKER_TIMEOUT", 120)
+    if not worker_authkey():
+        print("⚠️ SUMMARIZER_WORKER_AUTHKEY is not set; not contacting the summarizer worker")
+        return None
+    try:
+        with Client(worker_address(), authkey=worker_authkey()) as conn:
+            conn.send(("summarize", (list(texts), batch_size)))
+            if not conn.poll(timeout):
+                print(f"⚠️ Summarizer worker timed out after {timeout}s")
+                return None
+            return conn.recv()
+    except Exception as e:
+        print(f"⚠️ Summarizer worker unavailable: {e}")
+        return None
+
+
+def _summarize_uncached(texts, batch_size):
+    if worker_address():
+        summaries = summarize_via_worker(texts, batch_size=batch_size)
+        return summaries if summaries else [fallback_summary(text) for text in texts]
+    return summarize_locally(texts, batch_size=batch_size)
+
+
+def text_hash(text):
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def trim_cache(max_entries=None):
+    """Evict least recently used summaries beyond `max_entries`."""
+    max_entries = max_entries or getattr(settings, "SUMMARY_CACHE_MAX_ENTRIES", 5000)
+    stale = SummaryCache.objects.order_by("-last_used").values_list("id", flat=True)[max_entries:]
+    return SummaryCache.objects.filter(id__in=list(stale)).delete()[0]
+
+
+class SummaryStats:
+    def __init__(self):
+        self.requested = 0
+        self.short = 0
+        self.cached = 0
+        self.summarized = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        per_text = self.seconds / self.summarized if self.summarized else 0.0
+        return (
+            f"{self.requested} texts: {self.cached} cached, {self.short} too short, "
+            f"{self.summarized} summarized in {self.seconds:.2f}s ({per_text:.2f}s/text)"
+        )
+
+
+def summarize_texts(texts, batch_size=None, stats=None):
+    """
+    Summaries for `texts`, in order. Short texts pass through, cached ones come
+    from SummaryCache, and the rest are summarized in batches and cached.
+    """
+    stats = stats if stats is not None else SummaryStats()
+    texts = list(texts)
+    batch_size = batch_size or default_batch_size()
+    stats.requested += len(texts)
+    results = [None] * len(texts)
+
+    # hash -> indices needing that summary (identical bodies are summarized once)
+    wanted = {}
+    for i, text in enumerate(texts):
+        if len(text) < MIN_LENGTH_TO_SUMMARIZE:
+            results[i] = text
+            stats.short += 1
+        else:
+            wanted.setdefault(text_hash(text), []).append(i)
+    if not wanted:
+        return results
+
+    now = timezone.now()
+    cached = dict(SummaryCache.objects.filter(text_hash__in=list(wanted)).values_list("text_hash", "summary"))
+    if cached:
+        SummaryCache.objects.filter(text_hash__in=list(cached)).update(last_used=now)
+    for key, summary in cached.items():
+        for i in wanted.pop(key):
+            results[i] = summary
+            stats.cached += 1
+
+    if wanted:
+        keys = list(wanted)
+        started = time.monotonic()
+        summaries = _summarize_uncached([texts[wanted[key][0]] for key in keys], batch_size)
+        stats.seconds += time.monotonic() - started
+        stats.summarized += len(keys)
+
+        # Truncation fallbacks aren't cached, so they get a real summary once the model is back
+        SummaryCache.objects.bulk_create(
+            [
+                SummaryCache(text_hash=key, summary=summary, last_used=now)
+                for key, summary in zip(keys, summaries)
+                if summary != fallback_summary(texts[wanted[key][0]])
+            ],
+            ignore_conflicts=True,
+        )
+        for key, summary in zip(keys, summaries):
+            for i in wanted[key]:
+                results[i] = summary
+        trim_cache()
+    return results
+
+
+def auto_summary(text):
+    """Generate summary safely, fallback to truncation."""
+    return summarize_texts([text])[0]
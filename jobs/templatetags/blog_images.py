@@ -0,0 +1,33 @@
+# jobs/templatetags/blog_images.py
+from django import template
+from django.utils.html import format_html
+
+from jobs.derivatives import srcset as build_srcset, variant_urls
+
+register = template.Library()
+
+DEFAULT_SIZES = "(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw"
+
+
+@register.filter
+def srcset(post, fmt="jpeg"):
+    """{{ post|srcset:"webp" }} -> "url 320w, url 640w, ..." """
+    return build_srcset(post, fmt)
+
+
+@register.simple_tag
+def responsive_image(post, alt="", css_class="", sizes=DEFAULT_SIZES, loading="lazy"):
+    """
+    <picture> for a BlogPost's featured image: a WebP source plus a JPEG <img>
+    srcset, falling back to the original file when no variants exist yet.
+    """
+    if not post.featured_image:
+        return ""
+    fallback = variant_urls(post, "jpeg")
+    src = fallback[-1][0] if fallback else post.featured_image.url
+    webp = build_srcset(post, "webp")
+    source = format_html('<source type="image/webp" srcset="{}" sizes="{}">', webp, sizes) if webp else ""
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="{}"></picture>',
+        source, src, build_srcset(post, "jpeg"), sizes, css_class, alt, loading,
+    )
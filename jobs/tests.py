@@ -1,3 +1,1085 @@
-from django.test import TestCase
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import socket
+import threading
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import urlsplit
+import xml.etree.ElementTree as ET
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.models import F
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .api import API_FIELDS, job_api
+from .dedup import NUM_BANDS, is_same_posting, posting_bands
+from .facets import rebuild_facets
+from .feeds import Watermark, get_state
+from .fetcher import FetchEngine, FetchResult, FetchTask, ResponseTooLarge
+from .gazetteer import location_ids, resolve
+from .images import download_images
+from .ingest import JobIngestor
+from . import autocomplete, derivatives, pagecache, prerender, search, sitemaps, views
+from .models import BlogPost, Job, JobLocation, JobMinhashBand, StoredImage, Subscriber, SummaryCache
+from .ranking import rank_jobs
+from .rss import iter_rss_items
+from .sources import AdzunaAdapter, get_adapters
+from .spelling import SymSpell
+from .summarizer import fallback_summary, summarize_texts, summarize_via_worker
+from .search import filter_jobs, search_jobs
+from .pagination import KeysetPaginator, encode_cursor
+from .searchcache import bump_search_version, cached_job_ids, normalize_params, ranked_job_ids, search_page, search_version
+
+_TMP = tempfile.mkdtemp(prefix="workbank-tests-")
+
+# Caches and generated files stay out of the project's .cache directory
+TEST_SETTINGS = dict(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests-default"},
+        "pages": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests-pages"},
+        "counters": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests-counters"},
+    },
+    PRERENDER_ROOT=f"{_TMP}/prerendered",
+    SITEMAP_ROOT=f"{_TMP}/sitemaps",
+    AUTOCOMPLETE_SNAPSHOT=f"{_TMP}/autocomplete.json",
+    SEARCH_SPELLING_SNAPSHOT=f"{_TMP}/speller.pickle",
+)
+
+
+
+def signing_key():
+    """SECRET_KEY comes from the environment and may be empty here; cursors are signed with a test key."""
+    return mock.patch("django.core.signing.settings", SimpleNamespace(SECRET_KEY="tests", SECRET_KEY_FALLBACKS=[]))
+
+
+@override_settings(**TEST_SETTINGS)
+class SearchIndexTests(TestCase):
+    def test_job_created_after_migrate_is_searchable(self):
+        # The test database is built by running every migration
+        job = Job.objects.create(title="Data Analyst", company="Acme", description="SQL and dashboards")
+        self.assertEqual(list(search_jobs(Job.objects.all(), "analyst")), [job])
+        self.assertEqual(list(search_jobs(Job.objects.all(), "dashboards")), [job])
+
+    def test_missing_triggers_are_restored(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER jobs_job_fts_ai")
+        search._available.clear()
+        self.assertFalse(search.index_available())
+        job = Job.objects.create(title="Data Analyst", company="Acme", description="SQL and dashboards")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(search.restore_triggers())
+        self.assertTrue(search.index_available())
+        self.assertEqual(list(search_jobs(Job.objects.all(), "analyst")), [job])
+
+
+class GazetteerTests(SimpleTestCase):
+    def test_most_specific_place(self):
+        self.assertEqual(resolve("Ikeja, Lagos, Nigeria"), "af/ng/la/ikeja")
+
+    def test_remote_is_scoped_by_country(self):
+        self.assertEqual(resolve("Remote - Nigeria"), "remote/af/ng")
+
+    def test_alternatives_resolve_to_their_common_ancestor(self):
+        self.assertEqual(resolve("Lagos or Abuja"), "af/ng")
+
+    def test_unknown_text(self):
+        self.assertEqual(resolve("Flexible, see description"), "")
+        self.assertIsNone(location_ids("Flexible, see description"))
+
+    def test_filter_covers_descendants_and_remote(self):
+        ids = location_ids("Nigeria")
+        self.assertIn("af/ng/la/ikeja", ids)
+        self.assertIn("remote/af/ng", ids)
+        self.assertEqual(location_ids("Ikeja"), ["af/ng/la/ikeja"])
+
+
+@override_settings(**TEST_SETTINGS)
+class LocationFilterTests(TestCase):
+    def test_region_filter_matches_jobs_inside_it(self):
+        ikeja = Job.objects.create(title="Cashier", company="Acme", location="Ikeja, Lagos, Nigeria")
+        remote = Job.objects.create(title="Writer", company="Acme", location="Remote - Nigeria")
+        Job.objects.create(title="Nurse", company="Acme", location="Nairobi, Kenya")
+        self.assertEqual(ikeja.location_key, "af/ng/la/ikeja")
+        self.assertEqual(set(filter_jobs(Job.objects.all(), location="nigeria")), {ikeja, remote})
+        self.assertEqual(list(filter_jobs(Job.objects.all(), location="lagos")), [ikeja])
+
+    def test_unknown_location_is_a_substring_match(self):
+        job = Job.objects.create(title="Cashier", company="Acme", location="Flexible, see description")
+        self.assertEqual(list(filter_jobs(Job.objects.all(), location="see desc")), [job])
+
+
+@override_settings(**TEST_SETTINGS)
+class LocationFacetTests(TestCase):
+    def counts(self):
+        return dict(JobLocation.objects.filter(job_count__gt=0).values_list("name", "job_count"))
+
+    def test_facets_count_what_their_filter_returns(self):
+        Job.objects.create(title="Cashier", company="Acme", location="Lagos, Nigeria")
+        Job.objects.create(title="Driver", company="Acme", location="Lagos")
+        job = Job.objects.create(title="Clerk", company="Acme", location="Ikeja")
+        Job.objects.create(title="Writer", company="Acme", location="Remote - Nigeria")
+        Job.objects.create(title="Guide", company="Acme", location="Somewhere Else")
+        counts = self.counts()
+        self.assertEqual(counts["Lagos"], 3)
+        self.assertEqual(counts["Ikeja"], 1)
+        self.assertEqual(counts["Nigeria"], 4)
+        self.assertEqual(counts["Remote (Nigeria)"], 1)
+        self.assertEqual(counts["Somewhere Else"], 1)
+        for name, count in counts.items():
+            self.assertEqual(filter_jobs(Job.objects.all(), location=name).count(), count, name)
+
+        job.location = "Abuja"
+        job.save()
+        counts = self.counts()
+        self.assertEqual((counts["Lagos"], counts["Nigeria"], counts["Abuja (FCT)"]), (2, 4, 1))
+        self.assertNotIn("Ikeja", counts)
+
+    def test_rebuild_and_migration_agree_with_live_counts(self):
+        from importlib import import_module
+
+        from django.apps import apps
+
+        for location in ("Ikeja, Lagos, Nigeria", "Remote - Nigeria", "Lagos or Abuja", "Atlantis"):
+            Job.objects.create(title=f"Job in {location}", company="Acme", location=location)
+        live = self.counts()
+        rebuild_facets()
+        self.assertEqual(self.counts(), live)
+        import_module("jobs.migrations.0022_location_facets_by_place").recount_locations(apps, None)
+        self.assertEqual(self.counts(), live)
+
+
+class SymSpellTests(SimpleTestCase):
+    words = {"developer": 40, "develop": 5, "engineer": 30, "administrator": 8, "bat": 9, "hat": 4, "cat": 1}
+
+    def test_closest_word_first(self):
+        self.assertEqual(SymSpell(self.words).lookup("devloper")[0], "developer")
+
+    def test_transposition_is_one_edit(self):
+        self.assertEqual(SymSpell(self.words).lookup("enigneer", max_distance=1), ["engineer"])
+
+    def test_typo_past_the_prefix(self):
+        self.assertEqual(SymSpell(self.words).lookup("administartor", max_distance=1), ["administrator"])
+
+    def test_equal_distance_prefers_frequent_words(self):
+        index = SymSpell(self.words)
+        self.assertEqual(index.lookup("rat", max_distance=1), ["bat", "hat", "cat"])
+        self.assertEqual(index.lookup("rat", max_distance=1, limit=2), ["bat", "hat"])
+
+    def test_nothing_within_distance(self):
+        self.assertEqual(SymSpell(self.words).lookup("plumber"), [])
+
+    def test_distance_is_capped_by_the_index(self):
+        self.assertEqual(SymSpell(self.words, max_distance=1).lookup("dvlper", max_distance=2), [])
+
+
+@override_settings(**TEST_SETTINGS)
+class SpellingIndexTests(TestCase):
+    def setUp(self):
+        search._speller.update(index=None, mtime=None, checked=0.0)
+        self.addCleanup(search._speller.update, index=None, mtime=None, checked=0.0)
+        if os.path.exists(search.speller_path()):
+            os.remove(search.speller_path())
+
+    def test_requests_never_build_the_index(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(len(search.speller()), 0)
+
+    def test_index_built_after_ingestion_is_picked_up(self):
+        for n in range(2):
+            Job.objects.create(title=f"Python Developer {n}", company="Acme", description="Django")
+        search.speller()
+        self.assertGreater(search.update_speller(), 0)
+        search._speller["checked"] = 0.0
+        self.assertEqual(len(search_jobs(Job.objects.all(), "devloper")), 2)
+
+    def test_terms_are_looked_up_as_stored_lexemes(self):
+        # Postgres vocabularies hold stems; the typed word stays the prefix query
+        index = SymSpell({"develop": 5, "analyst": 3})
+        stems = {"developers": "develop", "devlopers": "devlop"}
+        with mock.patch.object(search, "speller", return_value=index), \
+                mock.patch.object(search, "stemmed", side_effect=lambda terms: [stems[t] for t in terms]):
+            self.assertEqual(search.expand_terms(["developers"]), [["developers"]])
+            self.assertEqual(search.expand_terms(["devlopers"]), [["devlopers", "develop"]])
+
+
+@override_settings(**TEST_SETTINGS)
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        autocomplete._state.update(indexes=None, mtime=None, checked=0.0)
+        self.addCleanup(autocomplete._state.update, indexes=None, mtime=None, checked=0.0)
+        if os.path.exists(autocomplete.snapshot_path()):
+            os.remove(autocomplete.snapshot_path())
+
+    def test_requests_never_build_the_snapshot(self):
+        Job.objects.create(title="Python Developer", company="Acme")
+        with self.assertNumQueries(0):
+            self.assertEqual(autocomplete.suggest("keyword", "pyth"), [])
+        self.assertFalse(os.path.exists(autocomplete.snapshot_path()))
+
+    def test_snapshot_built_after_ingestion_is_picked_up(self):
+        autocomplete.suggest("keyword", "pyth")
+        Job.objects.create(title="Python Developer", company="Acme")
+        self.assertEqual(autocomplete.update_snapshot(), (1, 2))
+        autocomplete._state["checked"] = 0.0
+        self.assertEqual(autocomplete.suggest("keyword", "pyth"), ["Python Developer"])
+
+
+@override_settings(**TEST_SETTINGS, SEARCH_RANK_CANDIDATES=2)
+class RelevanceWindowTests(TestCase):
+    def test_truncated_ranking_is_flagged(self):
+        jobs = [Job.objects.create(title=f"Python Developer {n}", company="Acme") for n in range(3)]
+        ids, truncated = ranked_job_ids(("python", "", ""))
+        self.assertTrue(truncated)
+        self.assertEqual(len(ids), 2)
+        self.assertLessEqual(set(ids), {job.id for job in jobs})
+
+    def test_complete_ranking_is_not_flagged(self):
+        for n in range(2):
+            Job.objects.create(title=f"Python Developer {n}", company="Acme")
+        self.assertEqual(ranked_job_ids(("python", "", ""))[1], False)
+
+
+@override_settings(**TEST_SETTINGS, SEARCH_RECENCY_WEIGHT=0.2, SEARCH_RECENCY_HALF_LIFE_DAYS=14, SEARCH_PAID_BOOST=0.1)
+class RankJobsTests(TestCase):
+    now = datetime(2026, 1, 31, tzinfo=dt_timezone.utc)
+
+    def job(self, days_old, is_paid=False):
+        return Job.objects.create(
+            title=f"Job {days_old} {is_paid}", company="Acme", is_paid=is_paid,
+            date_posted=None if days_old is None else self.now - timedelta(days=days_old),
+        ).id
+
+    def test_relevance_outweighs_recency(self):
+        old, new = self.job(60), self.job(0)
+        self.assertEqual(rank_jobs([(old, 9.0), (new, 1.0)], now=self.now), [old, new])
+
+    def test_recency_breaks_equal_relevance(self):
+        old, new, undated = self.job(30), self.job(1), self.job(None)
+        self.assertEqual(rank_jobs([(old, 2.0), (undated, 2.0), (new, 2.0)], now=self.now), [new, old, undated])
+
+    def test_paid_boost(self):
+        free, paid = self.job(1), self.job(1, is_paid=True)
+        self.assertEqual(rank_jobs([(free, 2.0), (paid, 2.0)], now=self.now), [paid, free])
+
+    def test_ties_go_to_the_newer_id(self):
+        first, second = self.job(None), self.job(None)
+        self.assertEqual(rank_jobs([(first, 1.0), (second, 1.0)], now=self.now), [second, first])
+
+    def test_no_candidates(self):
+        self.assertEqual(rank_jobs([]), [])
+        self.assertEqual(rank_jobs(None), [])
+
+
+@override_settings(**TEST_SETTINGS)
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = io.StringIO()
+        call_command("audit_query_plans", stdout=out)
+        self.assertIn("✅ job_list: place filter\n", out.getvalue())
+        self.assertIn("✅ search: keyword (sorted:", out.getvalue())
+
+
+@override_settings(**TEST_SETTINGS)
+@signing_key()
+class KeysetPaginationTests(TestCase):
+    ordering = ("-is_paid", "-date_posted", "-id")
+
+    def setUp(self):
+        day = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+        # Ties on date_posted and NULL dates in both the paid and unpaid groups
+        dates = [day, None, day, day - timedelta(days=1), None, day, None]
+        for n, date in enumerate(dates):
+            Job.objects.create(title=f"Job {n}", company="Acme", date_posted=date, is_paid=n % 3 == 0)
+        self.paginator = KeysetPaginator(Job.objects.all(), self.ordering, per_page=3)
+        self.expected = list(Job.objects.order_by(*self.paginator.order_by()).values_list("id", flat=True))
+
+    def test_next_and_previous_cursors_round_trip(self):
+        pages, after = [], None
+        while True:
+            page = self.paginator.page(after=after)
+            pages.append([job.id for job in page])
+            if not page.has_next:
+                break
+            after = page.next_cursor
+        self.assertEqual([job_id for ids in pages for job_id in ids], self.expected)
+        self.assertEqual(len(pages), 3)
+
+        # Back from the last page with before= gives the same pages
+        back, page = [], self.paginator.page(after=after)
+        self.assertFalse(page.has_next)
+        while page.has_previous:
+            page = self.paginator.page(before=page.previous_cursor)
+            back.append([job.id for job in page])
+        self.assertEqual(back, pages[-2::-1])
+        self.assertFalse(page.has_previous)
+
+    def test_bad_cursors_fall_back_to_the_first_page(self):
+        first = [job.id for job in self.paginator.page()]
+        for token in ("garbage", encode_cursor([1, 2]), self.paginator.page().next_cursor[:-2] + "xx"):
+            self.assertEqual([job.id for job in self.paginator.page(after=token)], first)
+
+    def test_search_page_cursors_continue_past_the_cached_ids(self):
+        request = RequestFactory().get("/jobs/")
+        with override_settings(JOB_SEARCH_CACHE_MAX_IDS=4):
+            seen, page = [], search_page(request, self.ordering, per_page=3)
+            seen += [job.id for job in page]
+            while page.has_next:
+                page = search_page(RequestFactory().get(f"/jobs/?{page.next_query}"), self.ordering, per_page=3)
+                seen += [job.id for job in page]
+        self.assertEqual(seen, self.expected)
+
+
+@override_settings(**TEST_SETTINGS)
+@signing_key()
+class SearchCacheTests(TestCase):
+    ordering = ("-is_paid", "-date_posted", "-id")
+
+    def setUp(self):
+        bump_search_version()
+        for n in range(5):
+            Job.objects.create(title=f"Remote Engineer {n}", company="Acme", location="Remote - Nigeria", category="IT")
+        Job.objects.create(title="Accountant", company="Acme", location="Lagos", category="Finance")
+
+    def test_equal_searches_share_cached_ids(self):
+        ids, complete = cached_job_ids(normalize_params({"keyword": "remote", "category": "it"}), self.ordering)
+        self.assertEqual((len(ids), complete), (5, True))
+        with self.assertNumQueries(0):
+            again = cached_job_ids(normalize_params({"keyword": "  REMOTE ", "category": "IT"}), self.ordering)
+        self.assertEqual(again, (ids, complete))
+
+    def test_only_the_requested_page_is_loaded(self):
+        request = RequestFactory().get("/jobs/?category=IT")
+        search_page(request, self.ordering, per_page=2)
+        # Ids come from the cache; one query loads the page's rows
+        with self.assertNumQueries(1):
+            page = search_page(request, self.ordering, per_page=2)
+        self.assertEqual(len(page), 2)
+        self.assertTrue(page.has_next)
+
+    def test_new_jobs_invalidate_cached_searches(self):
+        normalized = normalize_params({"category": "finance"})
+        self.assertEqual(len(cached_job_ids(normalized, self.ordering)[0]), 1)
+        ingestor = JobIngestor()
+        ingestor.add(title="Auditor", company="Globex", category="Finance")
+        ingestor.flush()
+        self.assertEqual(len(cached_job_ids(normalized, self.ordering)[0]), 2)
+
+
+@override_settings(**TEST_SETTINGS, API_MAX_LIMIT=50)
+@signing_key()
+class JobApiTests(TestCase):
+    def get(self, query="", **headers):
+        response = job_api(RequestFactory().get(f"/api/jobs/?{query}", headers=headers))
+        if response.status_code == 200:
+            content = b"".join(response.streaming_content)
+            if response.get("Content-Encoding") == "gzip":
+                content = gzip.decompress(content)
+            response.data = json.loads(content)
+        else:
+            response.data = json.loads(response.content)
+        return response
+
+    def test_after_cursor_walks_every_job_once(self):
+        day = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+        for n, date in enumerate([day, None, day, day - timedelta(days=1), None]):
+            Job.objects.create(title=f"Job {n}", company="Acme", date_posted=date, description="long text")
+        seen, query = [], "fields=title,date_posted&limit=2"
+        while query is not None:
+            data = self.get(query).data
+            self.assertTrue(all(set(row) == {"title", "date_posted"} for row in data["results"]))
+            seen += [row["title"] for row in data["results"]]
+            query = data["next"].split("?", 1)[1] if data["next"] else None
+        expected = Job.objects.order_by(F("date_posted").desc(nulls_last=True), "-id").values_list("title", flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_last_page_has_no_cursor(self):
+        Job.objects.create(title="Only", company="Acme")
+        data = self.get("limit=1").data
+        self.assertEqual([row["title"] for row in data["results"]], ["Only"])
+        self.assertEqual((data["next_cursor"], data["next"]), (None, None))
+        self.assertEqual(list(data["results"][0]), list(API_FIELDS))
+
+    def test_invalid_parameters_are_rejected(self):
+        for query, param in (
+            ("fields=title,salary", "fields"), ("limit=0", "limit"), ("limit=51", "limit"), ("limit=ten", "limit"),
+            ("after=garbage", "after"), (f"after={encode_cursor([1])}", "after"),
+        ):
+            response = self.get(query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertTrue(response.data["error"].startswith(param), query)
+
+    def test_only_get_is_allowed(self):
+        self.assertEqual(job_api(RequestFactory().post("/api/jobs/")).status_code, 405)
+
+    def test_response_is_gzipped_on_request(self):
+        Job.objects.create(title="Compressed", company="Acme")
+        response = self.get("fields=title", accept_encoding="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response.data["results"], [{"title": "Compressed"}])
+
+
+@override_settings(**TEST_SETTINGS)
+class SnippetBackfillTests(TestCase):
+    def backfill(self):
+        out = io.StringIO()
+        call_command("backfill_job_snippets", stdout=out)
+        return out.getvalue()
+
+    def test_each_job_is_processed_once(self):
+        Job.objects.create(title="Cashier", company="Acme", description="<p>Handle <b>cash</b></p>")
+        Job.objects.create(title="Clerk", company="Acme", description="<p></p>")
+        Job.objects.update(snippet=None)
+        version = search_version()
+        self.assertIn("for 2 jobs", self.backfill())
+        self.assertEqual(sorted(Job.objects.values_list("snippet", flat=True)), ["", "Handle cash"])
+        self.assertGreater(search_version(), version)
+        self.assertIn("for 0 jobs", self.backfill())
+
+
+@override_settings(**TEST_SETTINGS)
+class JobDedupKeyTests(TestCase):
+    def test_saved_job_gets_dedup_key_and_canonical_url(self):
+        job = Job.objects.create(title="Data Analyst", company="Acme", url="https://www.acme.com/jobs/1/?utm_source=x")
+        self.assertEqual(job.dedup_key, Job.make_dedup_key("Data Analyst", "Acme"))
+        self.assertEqual(job.canonical_url, "acme.com/jobs/1")
+
+    def test_feed_run_skips_job_entered_by_hand(self):
+        Job.objects.create(title="Data Analyst", company="Acme")
+        ingestor = JobIngestor()
+        ingestor.add(title="data analyst", company="ACME", location="Lagos", source="feed")
+        ingestor.flush()
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(ingestor.new_jobs, [])
+
+    def test_taken_dedup_key_is_left_empty(self):
+        Job.objects.create(title="Data Analyst", company="Acme")
+        second = Job.objects.create(title="Data Analyst", company="Acme")
+        self.assertIsNone(second.dedup_key)
+
+    def test_flush_returns_only_new_rows(self):
+        Job.objects.create(title="Data Analyst", company="Acme")
+        ingestor = JobIngestor()
+        ingestor.add(title="Backend Engineer", company="Globex", location="Abuja")
+        created = ingestor.flush()
+        self.assertEqual([job.title for job in created], ["Backend Engineer"])
+
+
+class RssParsingTests(SimpleTestCase):
+    FEED = (
+        b'<?xml version="1.0"?><rss xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+        b'<item><title>Data Analyst</title><atom:link href="x"/><link>https://a.example/1</link><guid>1</guid></item>'
+        b'<item><title>Backend Engineer</title><link>https://a.example/2</link><guid>2</guid></item>'
+        b'<item><title>Designer</title><link>https://a.exa'
+    )
+
+    def test_truncated_tail_keeps_the_complete_items(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            items = list(iter_rss_items(io.BytesIO(self.FEED)))
+        self.assertEqual([item["title"] for item in items], ["Data Analyst", "Backend Engineer"])
+        self.assertEqual(items[0]["link"], "https://a.example/1")
+        self.assertEqual(items[1]["description"], None)
+        self.assertIn("truncated after 2 items", out.getvalue())
+
+    def test_feed_broken_from_the_start_raises(self):
+        with self.assertRaises(ET.ParseError):
+            list(iter_rss_items(io.BytesIO(b'<?xml version="1.0"?><rss><channel><item><title>Data')))
+
+
+class FakeResponse:
+    def __init__(self, chunks, headers=None, status_code=200, delay=0.0):
+        self.chunks = chunks
+        self.headers = headers or {}
+        self.status_code = status_code
+        self.delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+
+
+class FakeSession:
+    """Serves `responses` {url: FakeResponse}, recording the most concurrent requests per host."""
+
+    def __init__(self, responses, hold=0.0):
+        self.responses = responses
+        self.hold = hold
+        self.active = Counter()
+        self.peak = Counter()
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        host = urlsplit(url).netloc
+        with self.lock:
+            self.active[host] += 1
+            self.peak[host] = max(self.peak[host], self.active[host])
+        time.sleep(self.hold)
+        with self.lock:
+            self.active[host] -= 1
+        return self.responses[url]
+
+
+class FetchEngineTests(SimpleTestCase):
+    def fetch(self, session, tasks, **kwargs):
+        with FetchEngine(session=session, **kwargs) as engine:
+            for task in tasks:
+                engine.submit(task)
+            return {result.task.url: result for result in engine.results()}
+
+    def test_requests_per_host_are_limited(self):
+        urls = [f"https://{host}/{n}" for host in ("a.example", "b.example") for n in range(4)]
+        session = FakeSession({url: FakeResponse([b"ok"]) for url in urls}, hold=0.05)
+        tasks = [FetchTask(f"source {n}", url, max_concurrency=4) for n, url in enumerate(urls)]
+        results = self.fetch(session, tasks, max_workers=8, per_host=2)
+        self.assertTrue(all(result.content == b"ok" for result in results.values()))
+        self.assertEqual(session.peak, {"a.example": 2, "b.example": 2})
+
+    def test_requests_per_source_are_limited(self):
+        urls = [f"https://{host}.example/" for host in "abcd"]
+        session = FakeSession({url: FakeResponse([b"ok"]) for url in urls}, hold=0.05)
+        started = time.monotonic()
+        self.fetch(session, [FetchTask("Feed", url, max_concurrency=1) for url in urls], max_workers=4)
+        # One at a time despite four hosts and four workers
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_slow_body_hits_the_total_deadline(self):
+        url = "https://slow.example/feed"
+        session = FakeSession({url: FakeResponse([b"x"] * 20, delay=0.02)})
+        result = self.fetch(session, [FetchTask("Slow", url, timeout=0.1)])[url]
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, TimeoutError)
+        self.assertIsNone(result.body)
+
+    def test_bodies_over_max_bytes_are_rejected(self):
+        declared, streamed, small = "https://x.example/declared", "https://x.example/streamed", "https://x.example/small"
+        session = FakeSession({
+            declared: FakeResponse([b"x" * 10], headers={"Content-Length": "1000"}),
+            streamed: FakeResponse([b"x" * 60, b"x" * 60]),
+            small: FakeResponse([b"x" * 60, b"x" * 40], headers={"Content-Length": "100"}),
+        })
+        results = self.fetch(session, [FetchTask("X", url, max_bytes=100, max_concurrency=3)
+                                       for url in (declared, streamed, small)])
+        self.assertIsInstance(results[declared].error, ResponseTooLarge)
+        self.assertIsInstance(results[streamed].error, ResponseTooLarge)
+        self.assertEqual(results[small].content, b"x" * 100)
+
+    def test_follow_up_tasks_submitted_mid_run_are_yielded(self):
+        urls = ["https://api.example/1", "https://api.example/2"]
+        session = FakeSession({url: FakeResponse([url.encode()]) for url in urls})
+        seen = []
+        with FetchEngine(session=session) as engine:
+            engine.submit(FetchTask("API", urls[0]))
+            for result in engine.results():
+                seen.append(result.content)
+                if len(seen) == 1:
+                    engine.submit(FetchTask("API", urls[1]))
+        self.assertEqual(seen, [url.encode() for url in urls])
+
+
+class WatermarkTests(TestCase):
+    def run_feed(self, entries):
+        """Ingest (guid, published) entries, newest first, like RssJobAdapter; returns the new guids."""
+        watermark = Watermark(get_state("feed"))
+        new = []
+        for guid, published in entries:
+            if watermark.reached(guid, published):
+                break
+            if watermark.seen(guid, published):
+                continue
+            watermark.observe(guid, published)
+            new.append(guid)
+        watermark.save()
+        return new
+
+    def test_entries_sharing_the_watermark_timestamp_are_not_lost(self):
+        noon = datetime(2026, 10, 1, 12, tzinfo=dt_timezone.utc)
+        earlier = datetime(2026, 10, 1, 9, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.run_feed([("a", noon), ("b", earlier)]), ["a", "b"])
+        # "c" appeared later with the same timestamp as "a"; "b" is behind the watermark
+        self.assertEqual(self.run_feed([("c", noon), ("a", noon), ("b", earlier)]), ["c"])
+        self.assertEqual(sorted(get_state("feed").last_published_guids), ["a", "c"])
+        self.assertEqual(self.run_feed([("c", noon), ("a", noon)]), [])
+
+
+@override_settings(**TEST_SETTINGS)
+class NewsFeedStateTests(TestCase):
+    def fetch(self, feed):
+        import feedparser
+
+        source = get_adapters(kind="news")[0].name
+        state = get_state(source)
+        state.etag, state.last_modified, state.last_status = '"abc"', "Mon, 01 Jun 2026 00:00:00 GMT", 200
+        state.save()
+        with mock.patch("feedparser.parse", return_value=feedparser.FeedParserDict(feed)):
+            call_command("fetch_job_news", source=[source], force=True, skip_images=True, skip_sitemaps=True,
+                         stdout=io.StringIO(), stderr=io.StringIO())
+        state.refresh_from_db()
+        return state
+
+    def test_network_error_keeps_validators(self):
+        state = self.fetch({"bozo": 1, "bozo_exception": OSError("timed out"), "entries": []})
+        self.assertEqual((state.etag, state.last_status), ('"abc"', 200))
+        self.assertEqual(state.last_checked, None)
+
+    def test_unparsable_feed_keeps_validators(self):
+        state = self.fetch({"bozo": 1, "bozo_exception": ValueError("not xml"), "status": 200, "entries": [],
+                            "etag": '"new"'})
+        self.assertEqual(state.etag, '"abc"')
+
+    def test_fetched_feed_stores_new_validators(self):
+        state = self.fetch({"bozo": 0, "status": 200, "entries": [], "etag": '"new"'})
+        self.assertEqual((state.etag, state.last_modified), ('"new"', None))
+        self.assertIsNotNone(state.last_checked)
+
+
+@override_settings(**TEST_SETTINGS, ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key")
+class AdzunaResumeTests(TestCase):
+    start = datetime(2026, 10, 1, 12, tzinfo=dt_timezone.utc)
+
+    def page(self, first, count=AdzunaAdapter.results_per_page):
+        """One result page, newest first, starting `first` hours before `start`."""
+        return [
+            {
+                "id": n,
+                "title": hashlib.md5(f"title {n}".encode()).hexdigest(),
+                "company": {"display_name": hashlib.md5(f"company {n}".encode()).hexdigest()},
+                "created": (self.start - timedelta(hours=n)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            for n in range(first, first + count)
+        ]
+
+    def run_adzuna(self, adapter, pages):
+        """Run the adapter like fetch_jobs; `pages` maps page number -> results (missing = request failed)."""
+        state = get_state(adapter.name)
+        watermark = Watermark(state)
+        ingestor = JobIngestor()
+        queue = adapter.tasks(state=state)
+        while queue:
+            task = queue.pop(0)
+            if task.meta["page"] not in pages:
+                continue
+            body = io.BytesIO(json.dumps({"results": pages[task.meta["page"]]}).encode())
+            result = FetchResult(task, status_code=200, body=body)
+            adapter.parse(result, ingestor.add, watermark)
+            queue += adapter.next_tasks(result)
+            ingestor.flush()
+            watermark.save()
+        return get_state(adapter.name)
+
+    def test_watermark_waits_until_the_run_reaches_it(self):
+        state = get_state("Adzuna")
+        state.last_published = self.start - timedelta(hours=200)
+        state.save()
+        adapter = AdzunaAdapter(max_pages=2, max_concurrency=1)
+
+        # Budget spent before reaching the watermark: it stays put, page 3 is next
+        state = self.run_adzuna(adapter, {1: self.page(0), 2: self.page(50)})
+        self.assertEqual(state.last_published, self.start - timedelta(hours=200))
+        self.assertEqual(state.resume_page, 3)
+
+        # Page 3 fails: the next run starts there again
+        state = self.run_adzuna(adapter, {4: self.page(150)})
+        self.assertEqual(state.resume_page, 3)
+
+        # Pages 3 and 4 get back to the watermark, which moves to the newest job seen
+        state = self.run_adzuna(adapter, {3: self.page(100), 4: self.page(150, count=60)})
+        self.assertIsNone(state.resume_page)
+        self.assertEqual(state.last_published, self.start)
+        # Hours 0..200: the job posted exactly at the old watermark is new too
+        self.assertEqual(Job.objects.count(), 201)
+
+
+@override_settings(**TEST_SETTINGS)
+class NewsletterTests(TestCase):
+    def test_job_ingested_today_with_an_old_pubdate_is_sent(self):
+        Subscriber.objects.create(email="reader@example.com")
+        ingestor = JobIngestor()
+        ingestor.add(title="Data Analyst", company="Acme", date_posted=datetime(2026, 1, 5, tzinfo=dt_timezone.utc))
+        ingestor.flush()
+        call_command("send_daily_newsletter", stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Data Analyst", mail.outbox[0].body)
+
+
+@override_settings(**TEST_SETTINGS)
+class NearDuplicateTests(TestCase):
+    def test_same_posting_needs_a_named_company(self):
+        self.assertTrue(is_same_posting("Senior Accountant", "Acme Ltd", "Senior Accountant (Lagos)", "ACME"))
+        self.assertFalse(is_same_posting("Senior Accountant", "Unknown", "Senior Accountant (Lagos)", "Unknown"))
+        self.assertFalse(is_same_posting("Senior Accountant", "", "Senior Accountant", None))
+
+    def test_feed_default_company_does_not_merge_similar_titles(self):
+        ingestor = JobIngestor()
+        ingestor.add(title="Project Officer", company="Unknown", location="Nigeria", description="Health programme")
+        ingestor.add(title="Project Officer II", company="Unknown", location="Nigeria", description="Health programme")
+        self.assertEqual(len(ingestor.flush()), 2)
+
+    def test_bands_are_computed_once_per_candidate(self):
+        ingestor = JobIngestor()
+        with mock.patch("jobs.ingest.posting_bands", wraps=posting_bands) as bands:
+            ingestor.add(title="Data Analyst", company="Acme")
+            ingestor.add(title="Backend Engineer", company="Globex")
+            ingestor.flush()
+        self.assertEqual(bands.call_count, 2)
+        self.assertEqual(JobMinhashBand.objects.count(), 2 * NUM_BANDS)
+
+    def test_rows_from_a_concurrent_run_are_not_claimed(self):
+        ingestor = JobIngestor()
+        ingestor.add(title="Data Analyst", company="Acme", location="Lagos")
+        ingestor.add(title="Backend Engineer", company="Globex", location="Abuja")
+        other = JobIngestor()
+        drop = ingestor._drop_near_duplicates
+
+        def race(candidates):
+            kept = drop(candidates)
+            # The other run commits the same posting between our checks and our insert
+            other.add(title="Data Analyst", company="Acme", location="Lagos")
+            other.flush()
+            return kept
+
+        with mock.patch.object(ingestor, "_drop_near_duplicates", side_effect=race):
+            created = ingestor.flush()
+        self.assertEqual([job.title for job in created], ["Backend Engineer"])
+        self.assertEqual([job.title for job in other.new_jobs], ["Data Analyst"])
+        self.assertEqual(JobMinhashBand.objects.count(), 2 * NUM_BANDS)
+        self.assertEqual(JobLocation.objects.get(key="af/ng/la").job_count, 1)
+
+
+class SummaryCacheTests(TestCase):
+    def text(self, n):
+        return f"Article {n}: " + "the newsroom filed a long report on hiring. " * 5
+
+    def summarize(self, texts, **kwargs):
+        fake = mock.Mock(side_effect=lambda texts, batch_size: [f"summary of {text[:9]}" for text in texts])
+        with mock.patch("jobs.summarizer._summarize_uncached", fake), override_settings(**kwargs):
+            return summarize_texts(texts), fake
+
+    def test_identical_texts_are_summarized_once_and_cached(self):
+        text = self.text(1)
+        summaries, fake = self.summarize([text, "  " + text.upper(), "short"])
+        self.assertEqual(summaries, ["summary of Article 1", "summary of Article 1", "short"])
+        self.assertEqual(len(fake.call_args.args[0]), 1)
+        summaries, fake = self.summarize([text])
+        self.assertEqual(summaries, ["summary of Article 1"])
+        fake.assert_not_called()
+
+    def test_least_recently_used_summaries_are_trimmed(self):
+        for n in range(3):
+            self.summarize([self.text(n)])
+        # Reading 0 makes 1 the least recently used entry
+        self.summarize([self.text(0)])
+        self.summarize([self.text(3)], SUMMARY_CACHE_MAX_ENTRIES=3)
+        self.assertEqual(SummaryCache.objects.count(), 3)
+        kept = set(SummaryCache.objects.values_list("summary", flat=True))
+        self.assertEqual(kept, {"summary of Article 0", "summary of Article 2", "summary of Article 3"})
+
+    def test_truncation_fallbacks_are_not_cached(self):
+        fallback = mock.Mock(side_effect=lambda texts, batch_size: [fallback_summary(text) for text in texts])
+        with mock.patch("jobs.summarizer._summarize_uncached", fallback):
+            summarize_texts([self.text(1)])
+        self.assertFalse(SummaryCache.objects.exists())
+
+
+class SummarizerWorkerTests(TestCase):
+    def free_port(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    @override_settings(SUMMARIZER_WORKER_ADDRESS=("127.0.0.1", 6011), SUMMARIZER_WORKER_AUTHKEY=None)
+    def test_refuses_to_start_without_an_authkey(self):
+        with self.assertRaises(CommandError):
+            call_command("run_summarizer_worker")
+
+    def test_idle_client_does_not_block_others(self):
+        address = ("127.0.0.1", self.free_port())
+        with override_settings(SUMMARIZER_WORKER_ADDRESS=address, SUMMARIZER_WORKER_AUTHKEY=b"test-secret"), \
+                mock.patch("jobs.management.commands.run_summarizer_worker.get_pipeline", return_value=None), \
+                mock.patch("jobs.management.commands.run_summarizer_worker.summarize_locally",
+                           side_effect=lambda texts, batch_size=None: [text.upper() for text in texts]):
+            threading.Thread(
+                target=call_command, args=("run_summarizer_worker",), kwargs={"stdout": io.StringIO(), "stderr": io.StringIO()},
+                daemon=True,
+            ).start()
+            for _ in range(50):
+                try:
+                    idle = socket.create_connection(address)
+                    break
+                except ConnectionRefusedError:
+                    threading.Event().wait(0.1)
+            with idle:
+                self.assertEqual(summarize_via_worker(["hello"], timeout=5), ["HELLO"])
+
+
+@override_settings(**TEST_SETTINGS, MEDIA_ROOT=f"{_TMP}/media")
+class BlogImageVariantTests(TestCase):
+    def test_page_cached_while_variants_are_built_is_refreshed(self):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 400), "teal").save(buffer, "JPEG")
+        image = SimpleUploadedFile("cover.jpg", buffer.getvalue(), content_type="image/jpeg")
+        post = BlogPost(title="Variant race", content="Body", featured_image=image)
+
+        def get_page():
+            request = RequestFactory().get(f"/blogs/{post.slug}/")
+            request.user = AnonymousUser()
+            return views.blog_detail(request, slug=post.slug)
+
+        def refresh_after_a_request(post):
+            # A reader hits the page between post_save and the variants update
+            get_page()
+            return derivatives.refresh_variants(post)
+
+        with mock.patch("jobs.models.refresh_variants", side_effect=refresh_after_a_request):
+            post.save()
+        self.assertTrue(post.image_variants["variants"])
+        self.assertContains(get_page(), "640w")
+
+
+@override_settings(**TEST_SETTINGS, MEDIA_ROOT=f"{_TMP}/media")
+class ImageDownloadTests(TestCase):
+    def download(self, posts, responses):
+        session = FakeSession(responses)
+        with mock.patch("jobs.images.build_session", return_value=session), \
+                contextlib.redirect_stdout(io.StringIO()):
+            counts = download_images(posts, host_interval=0)
+        return counts, session
+
+    def test_same_bytes_are_stored_once(self):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 20), "teal").save(buffer, "JPEG")
+        jpeg = {"Content-Type": "image/jpeg"}
+        posts = [BlogPost.objects.create(title=f"Post {n}", content="Body") for n in range(4)]
+        urls = ["https://cdn.example/a.jpg", "https://mirror.example/a-copy", "https://cdn.example/page.html"]
+        counts, session = self.download(
+            [(posts[0], urls[0]), (posts[1], urls[1]), (posts[2], urls[0]), (posts[3], urls[2])],
+            {
+                urls[0]: FakeResponse([buffer.getvalue()], headers=jpeg),
+                urls[1]: FakeResponse([buffer.getvalue()], headers=jpeg),
+                urls[2]: FakeResponse([b"<html></html>"], headers={"Content-Type": "text/html"}),
+            },
+        )
+        self.assertEqual(counts, {"downloaded": 2, "reused": 1, "failed": 1})
+        self.assertEqual(StoredImage.objects.count(), 1)
+        path = StoredImage.objects.get().path
+        for post in posts[:3]:
+            post.refresh_from_db()
+            self.assertEqual(post.featured_image.name, path)
+
+        # A URL stored before is attached without a request
+        later = BlogPost.objects.create(title="Later", content="Body")
+        counts, session = self.download([(later, urls[0])], {})
+        self.assertEqual(counts, {"downloaded": 0, "reused": 1, "failed": 0})
+        self.assertEqual(session.peak, {})
+
+
+@override_settings(**TEST_SETTINGS, SITEMAP_PART_SIZE=2)
+class SitemapTests(TestCase):
+    def setUp(self):
+        # No pre-generated files: the views render from the database
+        shutil.rmtree(sitemaps.sitemap_root(), ignore_errors=True)
+        for job_id in (1, 2, 3, 5):
+            Job.objects.create(id=job_id, title=f"Job {job_id}", company="Acme")
+        BlogPost.objects.create(title="Hiring trends", content="Body")
+
+    def get(self, view, *args, **headers):
+        response = view(RequestFactory().get("/sitemap.xml", headers=headers), *args)
+        if response.status_code == 200:
+            response.xml = b"".join(response.streaming_content).decode()
+        return response
+
+    def test_parts_follow_fixed_id_ranges(self):
+        index = self.get(sitemaps.sitemap_index).xml
+        for name in ("jobs-1", "jobs-2", "jobs-3", "blog-1"):
+            self.assertIn(f"http://testserver/sitemap-{name}.xml", index)
+        self.assertNotIn("sitemap-jobs-4.xml", index)
+        self.assertEqual(re.findall(r"/job/(\d+)/", self.get(sitemaps.sitemap_section, "jobs", 1).xml), ["1", "2"])
+        self.assertEqual(re.findall(r"/job/(\d+)/", self.get(sitemaps.sitemap_section, "jobs", 3).xml), ["5"])
+        self.assertIn("/blogs/hiring-trends/", self.get(sitemaps.sitemap_section, "blog", 1).xml)
+        for section, part in (("jobs", 4), ("jobs", 0), ("news", 1)):
+            with self.assertRaises(Http404):
+                sitemaps.sitemap_section(RequestFactory().get("/"), section, part)
+
+    def test_conditional_requests_get_304_until_the_part_changes(self):
+        first = self.get(sitemaps.sitemap_section, "jobs", 3)
+        etag, last_modified = first["ETag"], first["Last-Modified"]
+        self.assertEqual(self.get(sitemaps.sitemap_section, "jobs", 3, if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(sitemaps.sitemap_section, "jobs", 3, if_modified_since=last_modified).status_code, 304)
+        index_etag = self.get(sitemaps.sitemap_index)["ETag"]
+
+        Job.objects.create(id=6, title="Job 6", company="Acme")
+        self.assertEqual(self.get(sitemaps.sitemap_section, "jobs", 3, if_none_match=etag).status_code, 200)
+        # Other parts keep their validators
+        part_one = self.get(sitemaps.sitemap_section, "jobs", 1)["ETag"]
+        Job.objects.create(id=4, title="Job 4", company="Acme")
+        self.assertEqual(self.get(sitemaps.sitemap_section, "jobs", 1, if_none_match=part_one).status_code, 304)
+        self.assertNotEqual(self.get(sitemaps.sitemap_index)["ETag"], index_etag)
+
+
+@override_settings(**TEST_SETTINGS, SITEMAP_PART_SIZE=2)
+class PregeneratedSitemapTests(TestCase):
+    base_url = "https://workbank.example"
+
+    def setUp(self):
+        shutil.rmtree(sitemaps.sitemap_root(), ignore_errors=True)
+        for job_id in (1, 2, 3):
+            Job.objects.create(id=job_id, title=f"Job {job_id}", company="Acme")
+
+    def path(self, filename):
+        return os.path.join(sitemaps.sitemap_root(), filename)
+
+    def read(self, filename):
+        with open(self.path(filename), encoding="utf-8") as f:
+            return f.read()
+
+    def test_only_changed_parts_are_rewritten(self):
+        self.assertEqual(sitemaps.write_sitemaps(self.base_url), (2, 0, 0))
+        with gzip.open(self.path("sitemap-jobs-1.xml.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), self.read("sitemap-jobs-1.xml"))
+        self.assertIn(f"{self.base_url}/sitemap-jobs-2.xml", self.read("sitemap.xml"))
+        self.assertEqual(sitemaps.write_sitemaps(self.base_url), (0, 2, 0))
+
+        Job.objects.create(id=4, title="Job 4", company="Acme")
+        mtime = os.stat(self.path("sitemap-jobs-1.xml")).st_mtime_ns
+        self.assertEqual(sitemaps.write_sitemaps(self.base_url), (1, 1, 0))
+        self.assertEqual(os.stat(self.path("sitemap-jobs-1.xml")).st_mtime_ns, mtime)
+        self.assertIn("/job/4/", self.read("sitemap-jobs-2.xml"))
+
+        Job.objects.filter(id__in=[3, 4]).delete()
+        self.assertEqual(sitemaps.write_sitemaps(self.base_url), (0, 1, 1))
+        self.assertFalse(os.path.exists(self.path("sitemap-jobs-2.xml")))
+        self.assertFalse(os.path.exists(self.path("sitemap-jobs-2.xml.gz")))
+        self.assertNotIn("sitemap-jobs-2.xml", self.read("sitemap.xml"))
+        # A different site URL rewrites everything
+        self.assertEqual(sitemaps.write_sitemaps("https://other.example"), (1, 0, 0))
+
+    def test_failed_build_leaves_the_previous_files(self):
+        sitemaps.write_sitemaps(self.base_url)
+        before = self.read("sitemap-jobs-2.xml"), self.read(sitemaps.MANIFEST)
+        Job.objects.create(id=4, title="Job 4", company="Acme")
+
+        def broken(section, part, base_url):
+            yield sitemaps.XML_HEADER
+            raise OSError("disk full")
+
+        with mock.patch("jobs.sitemaps.render_part", broken), self.assertRaises(OSError):
+            sitemaps.write_sitemaps(self.base_url)
+        self.assertEqual((self.read("sitemap-jobs-2.xml"), self.read(sitemaps.MANIFEST)), before)
+        self.assertFalse([name for name in os.listdir(sitemaps.sitemap_root()) if name.endswith(".tmp")])
+        # The manifest still describes the old part, so the next build retries it
+        self.assertEqual(sitemaps.write_sitemaps(self.base_url), (1, 1, 0))
+        self.assertIn("/job/4/", self.read("sitemap-jobs-2.xml"))
+
+    def test_built_files_are_served_without_queries(self):
+        sitemaps.write_sitemaps(self.base_url)
+        with self.assertNumQueries(0):
+            plain = sitemaps.sitemap_section(RequestFactory().get("/"), "jobs", 2)
+            compressed = sitemaps.sitemap_index(RequestFactory().get("/", headers={"accept-encoding": "gzip"}))
+        self.assertEqual(b"".join(plain.streaming_content).decode(), self.read("sitemap-jobs-2.xml"))
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(compressed.streaming_content)).decode(), self.read("sitemap.xml"))
+        plain.close()
+        compressed.close()
+        self.assertEqual(compressed["Vary"], "Accept-Encoding")
+        refused = sitemaps.sitemap_index(RequestFactory().get("/", headers={"accept-encoding": "gzip;q=0"}))
+        self.assertFalse(refused.has_header("Content-Encoding"))
+        refused.close()
+        etag = plain["ETag"]
+        with self.assertNumQueries(0):
+            response = sitemaps.sitemap_section(RequestFactory().get("/", headers={"if-none-match": etag}), "jobs", 2)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+
+@override_settings(**TEST_SETTINGS)
+class PrerenderTests(TestCase):
+    def test_page_is_stored(self):
+        page = prerender.render_page("about")
+        self.assertEqual(prerender.load_page("about").etag, page.etag)
+        self.assertIn(b'data-csrf-cookie', page.content)
+
+    def test_error_response_is_not_stored(self):
+        failing = mock.Mock(return_value=HttpResponse(status=500))
+        with mock.patch.dict(prerender.PAGES, {"about": failing}):
+            with self.assertRaises(prerender.RenderError):
+                prerender.render_page("about")
+        self.assertFalse(os.path.exists(prerender._path("about")))
+
+    def serve(self, **headers):
+        request = RequestFactory().get("/about/", headers=headers)
+        return prerender.serve(request, prerender.render_page("about"))
+
+    def test_gzip_needs_a_nonzero_quality(self):
+        self.assertEqual(self.serve(accept_encoding="gzip, deflate")["Content-Encoding"], "gzip")
+        self.assertEqual(self.serve(accept_encoding="br;q=1.0, *;q=0.5")["Content-Encoding"], "gzip")
+        for refused in ("gzip;q=0", "deflate", "*;q=0", "gzip;q=0, *;q=1", ""):
+            self.assertFalse(self.serve(accept_encoding=refused).has_header("Content-Encoding"), refused)
+
+    def test_not_modified_varies_on_encoding(self):
+        etag = self.serve(accept_encoding="gzip")["ETag"]
+        response = self.serve(accept_encoding="gzip", if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(self.serve(accept_encoding="gzip;q=0", if_none_match=etag).status_code, 200)
+
+    def test_base_url_host_must_be_allowed(self):
+        with override_settings(PRERENDER_BASE_URL="https://elsewhere.example"):
+            with self.assertRaises(ImproperlyConfigured):
+                prerender.render_page("about")
+
+
+@override_settings(**TEST_SETTINGS)
+class PageCacheTests(TestCase):
+    def get(self, path, view, **kwargs):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        return view(request, **kwargs)
+
+    def test_counters_outlive_the_caches_they_invalidate(self):
+        pagecache.invalidate("jobs")
+        bump_search_version()
+        generation, version = pagecache.counter_cache().get("pagecache:gen:jobs"), search_version()
+        # What culling does to a full cache
+        caches["pages"].clear()
+        caches["default"].clear()
+        self.assertEqual(pagecache.counter_cache().get("pagecache:gen:jobs"), generation)
+        self.assertEqual(search_version(), version)
+
+    def test_canonical_url_is_the_normalized_url(self):
+        post = BlogPost.objects.create(title="Canonical", content="Body", is_published=True)
+        first = self.get(f"/blogs/{post.slug}/?utm_source=mail&b=2&a=1&fbclid=x", views.blog_detail, slug=post.slug)
+        again = self.get(f"/blogs/{post.slug}/?a=1&b=2", views.blog_detail, slug=post.slug)
+        self.assertEqual(again["X-Page-Cache"], "hit")
+        canonical = f'<link rel="canonical" href="http://testserver/blogs/{post.slug}/?a=1&amp;b=2">'
+        self.assertContains(first, canonical)
+        self.assertContains(again, canonical)
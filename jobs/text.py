@@ -0,0 +1,19 @@
+# jobs/text.py
+import html
+import re
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+SNIPPET_WORDS = 50
+SNIPPET_MAX_LENGTH = 500
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def make_snippet(description, words=SNIPPET_WORDS, max_length=SNIPPET_MAX_LENGTH):
+    """Plain-text, length-bounded preview of a (possibly HTML) job description."""
+    if not description:
+        return ""
+    text = _WHITESPACE_RE.sub(" ", html.unescape(strip_tags(description))).strip()
+    return Truncator(Truncator(text).words(words)).chars(max_length)
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # Core pages
@@ -28,4 +28,8 @@ urlpatterns = [
     path('submit-job/', views.submit_job, name='submit_job'),
     path('payment-callback/', views.payment_callback, name='payment_callback'),
     path('subscribe/', views.subscribe_newsletter, name='subscribe_newsletter'),
+    path('autocomplete/', views.autocomplete, name='autocomplete'),
+
+    # JSON API
+    path('api/jobs/', api.job_api, name='api_jobs'),
 ]
@@ -1,23 +1,35 @@
 # jobs/views.py
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q
-from django.core.paginator import Paginator
 from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest
 from django.core.mail import send_mail, BadHeaderError
 from django.contrib import messages
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_GET, require_http_methods
 from django.http import Http404
 
 from paystackapi.transaction import Transaction
 
-from .models import Job, Subscriber, BlogPost
+from .models import Job, JobCategory, JobLocation, Subscriber, BlogPost
+from .autocomplete import FIELDS as AUTOCOMPLETE_FIELDS, suggest
+from .facets import top_facets
 from .forms import JobSubmissionForm, SubscriberForm
+from .pagecache import cached_page
+from .pagination import CachedCountPaginator
+from .prerender import prerendered
+from .searchcache import search_page
 
 # Initialize Paystack (already in settings)
 paystack_secret_key = settings.PAYSTACK_SECRET_KEY
 
+# Columns the job list templates render; keeps the large `description` out of list queries
+JOB_LIST_FIELDS = ("id", "title", "company", "location", "category", "url", "snippet", "date_posted", "is_paid")
+# Keyset pagination keys (the trailing id makes them unique)
+HOME_ORDERING = ("-is_paid", "-date_posted", "-id")
+JOB_LIST_ORDERING = ("-date_posted", "-id")
+# Facets shown in the home page sidebar
+SIDEBAR_FACETS = 8
+
 
 # Newsletter subscription (supports AJAX + fallback; handles GET now)
 def subscribe_newsletter(request):
@@ -50,48 +62,22 @@ def subscribe_newsletter(request):
 
 
 # ✅ Homepage (job list with search filters) — extends base.html
+@cached_page("jobs")
 def home(request):
-    queryset = Job.objects.all().order_by("-is_paid", "-date_posted")
-
-    keyword = request.GET.get("keyword", "").strip()
-    location = request.GET.get("location", "").strip()
-    category = request.GET.get("category", "").strip()
-
-    if keyword:
-        queryset = queryset.filter(Q(title__icontains=keyword) | Q(description__icontains=keyword))
-    if location:
-        queryset = queryset.filter(location__icontains=location)
-    if category:
-        queryset = queryset.filter(category__icontains=category)
-
-    paginator = Paginator(queryset, 10)
-    page_number = request.GET.get("page")
-    jobs = paginator.get_page(page_number)
+    jobs = search_page(request, HOME_ORDERING, fields=JOB_LIST_FIELDS)
 
     return render(request, "jobs/home.html", {
         "jobs": jobs,
+        "top_categories": top_facets(JobCategory, limit=SIDEBAR_FACETS),
+        "top_locations": top_facets(JobLocation, limit=SIDEBAR_FACETS),
         "active_page": "home"
     })
 
 
 # ✅ Full Job List Page — extends base.html
+@cached_page("jobs")
 def job_list(request):
-    queryset = Job.objects.all().order_by("-date_posted")
-
-    keyword = request.GET.get("keyword", "").strip()
-    location = request.GET.get("location", "").strip()
-    category = request.GET.get("category", "").strip()
-
-    if keyword:
-        queryset = queryset.filter(Q(title__icontains=keyword) | Q(description__icontains=keyword))
-    if location:
-        queryset = queryset.filter(location__icontains=location)
-    if category:
-        queryset = queryset.filter(category__icontains=category)
-
-    paginator = Paginator(queryset, 10)
-    page_number = request.GET.get("page")
-    jobs = paginator.get_page(page_number)
+    jobs = search_page(request, JOB_LIST_ORDERING, fields=JOB_LIST_FIELDS)
 
     return render(request, "jobs/job_list.html", {
         "jobs": jobs,
@@ -100,9 +86,11 @@ def job_list(request):
 
 
 # ✅ Blog List
+@cached_page("blogs")
 def blog_list(request):
     blogs = BlogPost.objects.filter(is_published=True).order_by("-date_posted")
-    paginator = Paginator(blogs, 10)
+    # The blog page shows "Page X of Y", so it keeps numbered pages (count cached)
+    paginator = CachedCountPaginator(blogs, 10)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
     return render(request, "jobs/blogs.html", {
@@ -112,6 +100,7 @@ def blog_list(request):
 
 
 # ✅ Blog Detail (by slug) — MAIN ENTRY POINT
+@cached_page("blog:{slug}")
 def blog_detail(request, slug):
     post = get_object_or_404(BlogPost, slug=slug, is_published=True)
     return render(request, 'jobs/blog_detail.html', {
@@ -127,29 +116,54 @@ def blog_detail_by_id(request, id):
 
 
 # ✅ Static Pages
+@prerendered("about")
 def about(request):
     return render(request, "jobs/about.html", {"active_page": "about"})
 
+@prerendered("privacy")
 def privacy(request):
     return render(request, "jobs/privacy.html", {"active_page": "privacy"})
 
+@prerendered("terms")
 def terms(request):
     return render(request, "jobs/terms.html", {"active_page": "terms"})
 
+@prerendered("partners")
 def partners(request):
     return render(request, 'jobs/partners.html', {'active_page': 'partners'})
 
+@prerendered("disclaimer")
 def disclaimer(request):
     return render(request, "jobs/disclaimer.html", {"active_page": "disclaimer"})
 
+@prerendered("jobseekers")
 def jobseekers(request):
     return render(request, "jobs/jobseekers.html", {"active_page": "jobseekers"})
 
+@prerendered("categories")
 def categories(request):
-    return render(request, "jobs/categories.html", {"active_page": "categories"})
+    return render(request, "jobs/categories.html", {
+        "categories": top_facets(JobCategory),
+        "active_page": "categories",
+    })
 
+@prerendered("locations")
 def locations(request):
-    return render(request, "jobs/locations.html", {"active_page": "locations"})
+    return render(request, "jobs/locations.html", {
+        "locations": top_facets(JobLocation),
+        "active_page": "locations",
+    })
+
+@require_GET
+def autocomplete(request):
+    """Suggestions for a search box: ?field=keyword|location|category&q=<prefix>."""
+    field = request.GET.get("field", "keyword")
+    if field not in AUTOCOMPLETE_FIELDS:
+        return JsonResponse({"error": f"field must be one of: {', '.join(AUTOCOMPLETE_FIELDS)}"}, status=400)
+    response = JsonResponse({"suggestions": suggest(field, request.GET.get("q", "")[:100])})
+    response["Cache-Control"] = "public, max-age=300"
+    return response
+
 
 def contact(request):
     if request.method == "POST":
@@ -264,6 +278,7 @@ def payment_callback(request):
 
 
 # ✅ Job Detail
+@cached_page("job:{job_id}")
 def job_detail(request, job_id):
     job = get_object_or_404(Job, id=job_id)
     return render(request, "jobs/job_detail.html", {
@@ -28,9 +28,12 @@ SECRET_KEY = os.environ.get('2RbHpWf13U7Pq5qts-jdUdzmiXwq7M82bYVoWEH_dCWp9QCvvlK
 DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 ALLOWED_HOSTS = ["workbank-1.onrender.com"]
 
+# fetch_* only hit the sources whose refresh interval has passed (see jobs/sources.py),
+# so they can tick often; subscribers get one digest a day.
 CRONJOBS = [
-    ('0 9 * * *', 'django.core.management.call_command', ['fetch_jobs']),  # Runs every day at 9 AM
-    ('0 0 * * *', 'django.core.management.call_command', ['fetch_job_news']),
+    ('*/15 * * * *', 'django.core.management.call_command', ['fetch_jobs'], {'skip_newsletter': True}),
+    ('*/30 * * * *', 'django.core.management.call_command', ['fetch_job_news']),
+    ('0 9 * * *', 'django.core.management.call_command', ['send_daily_newsletter']),  # Runs every day at 9 AM
 ]
 
 # Application definition
@@ -78,6 +81,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'jobs.context_processors.canonical_url',
             ],
         },
     },
@@ -138,6 +142,68 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # Creates a 'staticfiles' folder in your
 # === STATIC FILES ===
 STATIC_URL = '/static/'
 
+# === CACHES ===
+# 'file' (default) is shared by every process on the host, so a cron ingest
+# invalidates pages the web workers serve; 'locmem' is per process (single
+# process dev servers only). No external cache server either way.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file')
+# 'counters' holds only the page generations and the search version. A full
+# cache deletes random entries, and a lost counter would restart at zero and
+# revive pages/searches it had invalidated, so its limit is never reached.
+if CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'workbank-default',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'workbank-pages',
+            'OPTIONS': {'MAX_ENTRIES': 1000},
+        },
+        'counters': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'workbank-counters',
+            'OPTIONS': {'MAX_ENTRIES': 10 ** 7},
+        },
+    }
+else:
+    CACHES = {
+        # Mostly search id lists (two per distinct search every JOB_SEARCH_CACHE_SECONDS),
+        # listing counts and the spelling vocabulary
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache' / 'default',
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        },
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache' / 'pages',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'counters': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache' / 'counters',
+            'OPTIONS': {'MAX_ENTRIES': 10 ** 7},
+        },
+    }
+
+# Rendered home / job_list / blog_list / job_detail / blog_detail (jobs/pagecache.py)
+PAGE_CACHE_ALIAS = 'pages'
+COUNTER_CACHE_ALIAS = 'counters'
+PAGE_CACHE_SECONDS = 60 * 60
+
+# === MEDIA (uploads and fetched blog images) ===
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Responsive variants of blog featured images (jobs/derivatives.py).
+# Names are content-hashed, so the web server can serve MEDIA_URL + 'blog/derived/'
+# with "Cache-Control: public, max-age=31536000, immutable".
+IMAGE_VARIANT_WIDTHS = (320, 640, 1024)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+
 # For development only (DEBUG=True)
 if DEBUG:
     STATICFILES_DIRS = [
@@ -171,3 +237,70 @@ NEWS_API_KEY = '4a5462d784544ca8bad5f21d391d56c3'  # Replace with the key from N
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
+
+# Job ingestion (fetch_jobs)
+FETCH_MAX_WORKERS = 8        # sources downloaded in parallel
+FETCH_PER_HOST_LIMIT = 2     # concurrent requests per host
+FETCH_TIMEOUT = 20           # per-source download budget (seconds)
+JOB_INGEST_BATCH_SIZE = 200  # new jobs per bulk_create
+
+ADZUNA_MAX_PAGES = 5               # page budget per run; a run that ends early resumes next time
+ADZUNA_CONCURRENCY = 2             # pages in flight at once
+ADZUNA_REQUESTS_PER_MINUTE = 25    # API rate limit (token bucket)
+
+# Summarizer for fetch_job_news: set an address to use a long-lived
+# `manage.py run_summarizer_worker` process instead of loading BART per run.
+# The worker binds to 127.0.0.1 unless started with --host, and refuses to start
+# without SUMMARIZER_WORKER_AUTHKEY in the environment (requests are pickled).
+SUMMARIZER_WORKER_ADDRESS = None   # e.g. ('127.0.0.1', 6011)
+SUMMARIZER_WORKER_AUTHKEY = os.environ.get('SUMMARIZER_WORKER_AUTHKEY', '').encode() or None
+SUMMARIZER_WORKER_IDLE_TIMEOUT = 30  # seconds a client gets to authenticate and send
+SUMMARIZER_WORKER_TIMEOUT = 120    # seconds to wait for a batch
+SUMMARIZER_BATCH_SIZE = 8          # texts per model call
+SUMMARY_CACHE_MAX_ENTRIES = 5000   # LRU-trimmed SummaryCache rows
+
+# Featured-image downloads (fetch_job_news)
+IMAGE_FETCH_WORKERS = 4
+IMAGE_FETCH_PER_HOST = 1
+IMAGE_FETCH_HOST_INTERVAL = 1.0    # seconds between requests to one host
+IMAGE_MAX_BYTES = 5 * 1024 * 1024  # larger images are abandoned mid-download
+
+# Numbered pagination (blog list) caches its COUNT(*) for this long
+PAGINATION_COUNT_CACHE_SECONDS = 300
+
+# Cached job search (home / job_list): ordered id lists per normalized query
+JOB_SEARCH_CACHE_SECONDS = 600
+JOB_SEARCH_CACHE_MAX_IDS = 500     # deeper pages fall back to keyset queries
+
+# Prerendered informational pages (`manage.py prerender_pages` on deploy)
+PRERENDER_ROOT = BASE_DIR / '.cache' / 'prerendered'
+PRERENDER_BASE_URL = f'https://{ALLOWED_HOSTS[0]}'  # host used for canonical URLs
+
+# JSON API (/api/jobs/) page sizes
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 100
+
+# Search-box autocomplete (/autocomplete/); the snapshot is updated by fetch_jobs
+AUTOCOMPLETE_SNAPSHOT = BASE_DIR / '.cache' / 'autocomplete.json'
+AUTOCOMPLETE_LIMIT = 8
+AUTOCOMPLETE_RELOAD_SECONDS = 30   # how often workers check for a newer snapshot
+
+# Keyword search ranking (default order for keyword searches; ?sort=date for newest first)
+SEARCH_RANK_CANDIDATES = 200        # matches scored per query, best by text relevance
+SEARCH_TITLE_WEIGHT = 5.0           # bm25 weight of title relative to description
+SEARCH_RECENCY_WEIGHT = 0.2         # added for a brand-new job, halving every half-life
+SEARCH_RECENCY_HALF_LIFE_DAYS = 14
+SEARCH_PAID_BOOST = 0.1
+# Typo tolerance: misspelled terms are expanded with close index terms
+SEARCH_SPELLING_MIN_DOCS = 2        # terms in fewer jobs are never suggested
+SEARCH_SPELLING_SUGGESTIONS = 3
+SEARCH_SPELLING_SNAPSHOT = BASE_DIR / '.cache' / 'speller.pickle'  # built by fetch_jobs
+SEARCH_SPELLING_RELOAD_SECONDS = 30  # how often workers check for a newer index
+
+# Location gazetteer behind Job.location_key and the location filter
+LOCATION_GAZETTEER = BASE_DIR / 'jobs' / 'data' / 'locations.json'
+
+# Sitemap parts: ids 1..N, N+1..2N, ... (the protocol allows 50,000 URLs per file)
+SITEMAP_PART_SIZE = 50000
+SITEMAP_ROOT = BASE_DIR / '.cache' / 'sitemaps'   # `manage.py build_sitemaps` output, served as-is
+SITEMAP_BASE_URL = PRERENDER_BASE_URL
@@ -1,16 +1,18 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from django.contrib.sitemaps.views import sitemap
-from jobs.sitemaps import JobSitemap
+from jobs.sitemaps import sitemap_index, sitemap_section
 from django.views.generic import TemplateView
 
-sitemaps = {
-    'jobs': JobSitemap,
-}
-
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('jobs.urls')),  # Routes all to jobs app
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', sitemap_index, name='sitemap_index'),
+    path('sitemap-<str:section>-<int:part>.xml', sitemap_section, name='sitemap_section'),
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
-]
\ No newline at end of file
+]
+
+# Uploaded and fetched media; in production the web server serves MEDIA_ROOT
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)